@@ -0,0 +1,12 @@
+"""
+parseplot benchmark suite.
+
+Times each stage of turning an expression into a plot - parsing,
+sampling, rendering and exporting - over representative expressions and
+numbers of points, recording peak memory, and compares results between
+revisions.
+
+    python -m benchmarks run -o before.json
+    python -m benchmarks run -o after.json
+    python -m benchmarks compare before.json after.json --threshold 0.1
+"""
@@ -0,0 +1,102 @@
+"""Command line interface of the benchmark suite, see benchmarks/__init__.py"""
+import argparse
+import sys
+from typing import Sequence
+
+from benchmarks.cases import EXPRESSIONS, SIZES, STAGES, benchmarks
+from benchmarks.harness import (Result,
+                                compare,
+                                format_comparison,
+                                format_result,
+                                load_results,
+                                run_benchmarks,
+                                save_results,
+                                )
+
+QUICK_SIZES = (10 ** 2, 10 ** 3, 10 ** 4)
+
+
+def _names(argument: str) -> list[str]:
+    return [name.strip() for name in argument.split(',') if name.strip()]
+
+
+def _sizes(argument: str) -> list[int]:
+    return [int(float(size)) for size in _names(argument)]  # Accept eg 1e5.
+
+
+def _arguments(argv: Sequence[str]|None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run benchmarks.')
+    run.add_argument('--stages', type=_names, help='Comma separated stages, default all.')
+    run.add_argument('--expressions', type=_names, help='Comma separated expressions, default all.')
+    run.add_argument('--sizes', type=_sizes, default=SIZES,
+                     help=f"Comma separated numbers of points, default {','.join(map(str, SIZES))}.")
+    run.add_argument('--quick', action='store_const', dest='sizes', const=QUICK_SIZES,
+                     help=f"Run sizes {','.join(map(str, QUICK_SIZES))} only.")
+    run.add_argument('--repeat', type=int, default=5, help='Maximum timed runs of each benchmark.')
+    run.add_argument('--max-time', type=float, default=1.0,
+                     help='Seconds after which to stop repeating a benchmark.')
+    run.add_argument('--no-memory', action='store_false', dest='memory', help='Skip measuring peak memory.')
+    run.add_argument('--browser', action='store_true', help='Include stages needing a browser.')
+    run.add_argument('--no-size-limits', action='store_false', dest='size_limits',
+                     help='Run slow stages at every size.')
+    run.add_argument('-o', '--output', help='Save results as JSON to this file.')
+
+    compare_command = commands.add_parser('compare', help='Compare saved results.')
+    compare_command.add_argument('base', help='Results file of the baseline revision.')
+    compare_command.add_argument('head', help='Results file of the revision compared.')
+    compare_command.add_argument('--threshold', type=float, default=0.1,
+                                 help='Fraction slower than base counted as a regression, default 0.1.')
+    compare_command.add_argument('--memory-threshold', type=float,
+                                 help='Fraction more peak memory than base counted as a regression.')
+
+    commands.add_parser('list', help='List stages and expressions.')
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str]|None = None) -> int:
+    """
+    Run command line, returning exit status: 1 if compare found a
+    regression, else 0.
+
+    :param argv: Sequence[str] arguments, default sys.argv[1:]
+    :return: int
+    """
+    args = _arguments(argv)
+    if args.command == 'list':
+        for stage in STAGES:
+            print(f"stage {stage.name}{' (browser)' if stage.browser else ''}")
+        for name, expression in EXPRESSIONS.items():
+            print(f"expression {name}: {expression}")
+        return 0
+
+    if args.command == 'run':
+        try:
+            selected = list(benchmarks(args.stages, args.expressions, args.sizes,
+                                       browser=args.browser, size_limits=args.size_limits))
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 2
+
+        def progress(result: Result) -> None:
+            print(format_result(result), flush=True)
+
+        results = run_benchmarks(selected, repeat=args.repeat, max_time=args.max_time, memory=args.memory,
+                                 progress=progress)
+        if args.output:
+            print(f"Saved {save_results(results, args.output)}")
+        return 0
+
+    comparisons = compare(load_results(args.base), load_results(args.head),
+                          threshold=args.threshold, memory_threshold=args.memory_threshold)
+    for comparison in comparisons:
+        print(format_comparison(comparison))
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    print(f"{len(regressions)} of {len(comparisons)} benchmarks regressed.")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Benchmarked expressions, stages and sample sizes"""
+import tempfile
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Sequence
+
+from src.parseplot.parse.compiled import CompiledExpression
+from src.parseplot.parse.curve import Curve
+from src.parseplot.parse.parser import Parser
+from src.parseplot.parse.pre_parse import pre_parse_translate
+from src.parseplot.plot.bokeh.bokeh_plotter import BokehPlotter
+from src.parseplot.plot.native_renderer import render_svg
+
+EXPRESSIONS = {
+    'polynomial': '3*x^3 - 2*x^2 + x - 7',
+    'trig': 'sin(x)*cos(x/2) + tan(x/10)',
+    'nested': 'ln(1 + abs(sin(cos(x/3)) * x))^2 / (1 + x^2)',
+    'piecewise': 'x < -1 ? -x : x < 1 ? x^2 : x > 5 ? 5 : x',
+}
+
+SIZES = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+
+# Domain sampled by every benchmark.
+X_MIN, X_MAX = -10, 10
+
+# Expression whose points are rendered and exported. Rendering cost
+# depends on the number of points, not the expression plotted.
+PLOTTED_EXPRESSION = 'trig'
+
+Run = Callable[[], object]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A benchmarked operation.
+
+    setup(expression, size) prepares its inputs, untimed, and returns the
+    function timed. Stages without expression or size take None for it.
+    """
+    name: str
+    setup: Callable[[str|None, int|None], Run]
+    per_expression: bool = True
+    sized: bool = True
+    # Largest size run by default, for stages too slow to run at every size.
+    max_size: int|None = None
+    # Whether the stage needs a browser, so is only run if requested.
+    browser: bool = False
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A stage, for one expression and size."""
+    stage: Stage
+    expression: str|None
+    size: int|None
+
+    @property
+    def name(self) -> str:
+        parameters = [str(parameter) for parameter in (self.expression, self.size) if parameter is not None]
+        return f"{self.stage.name}[{','.join(parameters)}]" if parameters else self.stage.name
+
+    def setup(self) -> Run:
+        return self.stage.setup(self.expression and EXPRESSIONS[self.expression], self.size)
+
+
+def _parse(expression: str|None, _: int|None) -> Run:
+    assert expression is not None
+    return lambda: CompiledExpression(pre_parse_translate(expression))
+
+
+def _float_range(_: str|None, size: int|None) -> Run:
+    assert size is not None
+    return lambda: deque(Parser.float_range(0, size, 1), maxlen=0)
+
+
+def _sample(expression: str|None, size: int|None) -> Run:
+    assert expression is not None
+    parser = Parser(expression)
+    parser.plot(0, 0)  # Compile, untimed.
+    return lambda: parser.plot(X_MIN, X_MAX, n=size, incremental=False)
+
+
+def _sample_columnar(expression: str|None, size: int|None) -> Run:
+    assert expression is not None
+    parser = Parser(expression)
+    parser.plot(0, 0)
+    return lambda: parser.plot(X_MIN, X_MAX, n=size, columnar=True, incremental=False)
+
+
+def _sample_arrays(expression: str|None, size: int|None) -> Run:
+    assert expression is not None
+    parser = Parser(expression)
+    parser.plot_arrays(0, 0)
+    return lambda: parser.plot_arrays(X_MIN, X_MAX, n=size)
+
+
+def _plotted_curve(size: int|None) -> Curve:
+    """Returns size points of PLOTTED_EXPRESSION, to be rendered."""
+    xs, ys = Parser(EXPRESSIONS[PLOTTED_EXPRESSION]).plot_arrays(X_MIN, X_MAX, n=size)
+    return Curve(xs, ys)
+
+
+def _add_line(_: str|None, size: int|None) -> Run:
+    points = _plotted_curve(size).points()
+    return lambda: BokehPlotter().add_line(points)
+
+
+def _add_line_columnar(_: str|None, size: int|None) -> Run:
+    curve = _plotted_curve(size)
+    return lambda: BokehPlotter().add_line(curve)
+
+
+def _plotter(size: int|None) -> BokehPlotter:
+    plotter = BokehPlotter(title='Benchmark', x_axis_label='x', y_axis_label='y')
+    plotter.add_line(_plotted_curve(size), legend_label=EXPRESSIONS[PLOTTED_EXPRESSION])
+    return plotter
+
+
+def _render_native(_: str|None, size: int|None) -> Run:
+    plotter = _plotter(size)
+    return lambda: render_svg(plotter.native_chart())
+
+
+def _export(method: str, **kwargs: str) -> Callable[[str|None, int|None], Run]:
+    """Returns setup of stage saving a plot with BokehPlotter method."""
+    def setup(_: str|None, size: int|None) -> Run:
+        plotter = _plotter(size)
+        out_dir = tempfile.TemporaryDirectory(prefix='parseplot_benchmark_')  # Removed with the closure.
+        return lambda: getattr(plotter, method)(Path(out_dir.name) / 'plot', **kwargs)
+    return setup
+
+
+STAGES = [
+    Stage('parse', _parse, sized=False),
+    Stage('float_range', _float_range, per_expression=False),
+    Stage('sample', _sample, max_size=10 ** 5),
+    Stage('sample_columnar', _sample_columnar, max_size=10 ** 5),
+    Stage('sample_arrays', _sample_arrays),
+    Stage('add_line', _add_line, per_expression=False),
+    Stage('add_line_columnar', _add_line_columnar, per_expression=False),
+    Stage('render_native', _render_native, per_expression=False),
+    Stage('export_html', _export('save_html_to_file'), per_expression=False),
+    Stage('export_svg_native', _export('save_as_svg', renderer='native'), per_expression=False),
+    Stage('export_png_native', _export('save_as_png', renderer='native'), per_expression=False),
+    Stage('export_png_bokeh', _export('save_as_png', renderer='bokeh'), per_expression=False,
+          max_size=10 ** 4, browser=True),
+]
+
+
+def benchmarks(stages: Sequence[str]|None = None,
+               expressions: Sequence[str]|None = None,
+               sizes: Sequence[int] = SIZES,
+               *,
+               browser: bool = False,
+               size_limits: bool = True,
+               ) -> Iterator[Benchmark]:
+    """
+    Yields benchmarks of each stage, for each expression and size.
+
+    :param stages: Sequence[str] names of stages, defaulting to all
+                                 not needing a browser
+    :param expressions: Sequence[str] names of expressions, defaulting to
+                                      all
+    :param sizes: Sequence[int] numbers of points
+    :param browser: bool whether to include stages needing a browser
+    :param size_limits: bool whether to skip sizes above stages' max_size
+    :return: Iterator[Benchmark]
+    """
+    unknown = set(stages or ()) - {stage.name for stage in STAGES} | set(expressions or ()) - set(EXPRESSIONS)
+    if unknown:
+        raise ValueError(f"Unknown stage(s) or expression(s): {', '.join(sorted(unknown))}")
+    for stage in STAGES:
+        if stages is not None and stage.name not in stages or stages is None and stage.browser and not browser:
+            continue
+        stage_expressions: list[str|None] = [None]
+        if stage.per_expression:
+            stage_expressions = list(expressions or EXPRESSIONS)
+        stage_sizes: list[int|None] = list(sizes) if stage.sized else [None]
+        for expression in stage_expressions:
+            for size in stage_sizes:
+                if size is not None and size_limits and stage.max_size is not None and size > stage.max_size:
+                    continue
+                yield Benchmark(stage, expression, size)
@@ -0,0 +1,242 @@
+"""Timing, memory measurement, and comparison of benchmark results"""
+import datetime
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Union
+
+from benchmarks.cases import Benchmark
+
+# Version of the results file format.
+FORMAT_VERSION = 1
+
+
+@dataclass
+class Result:
+    """Timings and peak memory of a benchmark."""
+    name: str
+    stage: str
+    expression: str|None
+    size: int|None
+    seconds: float  # Fastest run.
+    mean_seconds: float
+    runs: int
+    peak_memory: int|None  # Bytes allocated above the baseline, at peak.
+
+
+@dataclass
+class Comparison:
+    """A benchmark's results in two runs."""
+    name: str
+    base_seconds: float
+    head_seconds: float
+    base_memory: int|None
+    head_memory: int|None
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        """Head time as a multiple of base time."""
+        return self.head_seconds / self.base_seconds if self.base_seconds else float('inf')
+
+    @property
+    def memory_ratio(self) -> float|None:
+        """Head peak memory as a multiple of base peak memory."""
+        if self.base_memory is None or self.head_memory is None:
+            return None
+        return self.head_memory / self.base_memory if self.base_memory else float('inf')
+
+
+def measure(benchmark: Benchmark,
+            *,
+            repeat: int = 5,
+            max_time: float = 1.0,
+            memory: bool = True,
+            ) -> Result:
+    """
+    Time benchmark, excluding its setup.
+
+    Runs up to repeat times, stopping early once runs have taken max_time
+    in total, so slow benchmarks run once. The fastest run is reported, as
+    the least disturbed by other activity on the machine.
+
+    Peak memory is measured with tracemalloc in a further run, as tracing
+    allocations slows them.
+
+    :param benchmark: Benchmark
+    :param repeat: int maximum number of timed runs
+    :param max_time: float seconds after which to stop repeating
+    :param memory: bool whether to measure peak memory
+    :return: Result
+    """
+    run = benchmark.setup()
+    times: list[float] = []
+    while len(times) < repeat and sum(times) < max_time:
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return Result(benchmark.name, benchmark.stage.name, benchmark.expression, benchmark.size,
+                  seconds=min(times),
+                  mean_seconds=sum(times) / len(times),
+                  runs=len(times),
+                  peak_memory=_peak_memory(run) if memory else None,
+                  )
+
+
+def _peak_memory(run: Callable[[], object]) -> int:
+    """Returns peak bytes allocated during run, above those allocated before."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        run()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(benchmarks: Iterable[Benchmark],
+                   *,
+                   repeat: int = 5,
+                   max_time: float = 1.0,
+                   memory: bool = True,
+                   progress: Callable[[Result], None]|None = None,
+                   ) -> dict[str, Any]:
+    """
+    Measure each of benchmarks, returning results with a description of
+    the machine and revision they were measured on, as saved by
+    save_results.
+
+    :param benchmarks: Iterable[Benchmark]
+    :param repeat: int maximum number of timed runs of each benchmark
+    :param max_time: float seconds after which to stop repeating
+    :param memory: bool whether to measure peak memory
+    :param progress: Callable[[Result], None] called with each result
+    :return: dict[str, Any]
+    """
+    results = []
+    for benchmark in benchmarks:
+        result = measure(benchmark, repeat=repeat, max_time=max_time, memory=memory)
+        if progress:
+            progress(result)
+        results.append(asdict(result))
+    return {'format': FORMAT_VERSION,
+            'meta': _metadata(),
+            'results': results,
+            }
+
+
+def _metadata() -> dict[str, Any]:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                  capture_output=True, text=True, check=True,
+                                  cwd=Path(__file__).parent,
+                                  ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {'revision': revision,
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            }
+
+
+def save_results(results: dict[str, Any], filepath: Union[str, Path]) -> Path:
+    """
+    Save results as JSON.
+
+    :param results: dict[str, Any] as returned by run_benchmarks
+    :param filepath: Union[str, Path]
+    :return: Path
+    """
+    filepath = Path(filepath)
+    filepath.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+    return filepath
+
+
+def load_results(filepath: Union[str, Path]) -> dict[str, Any]:
+    """
+    Load results saved by save_results.
+
+    :param filepath: Union[str, Path]
+    :return: dict[str, Any]
+    """
+    results = json.loads(Path(filepath).read_text(encoding='utf-8'))
+    if results.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{filepath} is not a version {FORMAT_VERSION} benchmark results file")
+    return results
+
+
+def compare(base: dict[str, Any],
+            head: dict[str, Any],
+            threshold: float = 0.1,
+            memory_threshold: float|None = None,
+            ) -> list[Comparison]:
+    """
+    Compare results of benchmarks in both base and head.
+
+    A benchmark has regressed if head's time exceeds base's by more than
+    threshold, as a fraction of base's time, or its peak memory exceeds
+    base's by more than memory_threshold, if given.
+
+    :param base: dict[str, Any] results, as returned by load_results
+    :param head: dict[str, Any] results
+    :param threshold: float eg 0.1 allows 10% slower
+    :param memory_threshold: float eg 0.1 allows 10% more memory
+    :return: list[Comparison] in head's order
+    """
+    base_results = {result['name']: result for result in base['results']}
+    comparisons = []
+    for result in head['results']:
+        base_result = base_results.get(result['name'])
+        if base_result is None:
+            continue
+        comparison = Comparison(result['name'],
+                                base_seconds=base_result['seconds'],
+                                head_seconds=result['seconds'],
+                                base_memory=base_result['peak_memory'],
+                                head_memory=result['peak_memory'],
+                                regressed=False)
+        memory_ratio = comparison.memory_ratio
+        comparison.regressed = (comparison.ratio > 1 + threshold
+                                or memory_threshold is not None
+                                and memory_ratio is not None
+                                and memory_ratio > 1 + memory_threshold)
+        comparisons.append(comparison)
+    return comparisons
+
+
+def format_result(result: Result) -> str:
+    memory = '' if result.peak_memory is None else f"{format_bytes(result.peak_memory):>10}"
+    return f"{result.name:<44} {format_seconds(result.seconds):>10} {result.runs:>4} runs {memory}".rstrip()
+
+
+def format_comparison(comparison: Comparison) -> str:
+    memory_ratio = comparison.memory_ratio
+    memory = '' if memory_ratio is None else f" memory {memory_ratio:6.2f}x"
+    flag = '  REGRESSED' if comparison.regressed else ''
+    return (f"{comparison.name:<44} {format_seconds(comparison.base_seconds):>10}"
+            f" -> {format_seconds(comparison.head_seconds):>10} {comparison.ratio:6.2f}x{memory}{flag}")
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def format_bytes(size: int) -> str:
+    for unit, scale in (('GiB', 2 ** 30), ('MiB', 2 ** 20), ('KiB', 2 ** 10)):
+        if size >= scale:
+            return f"{size / scale:.3g} {unit}"
+    return f"{size} B"
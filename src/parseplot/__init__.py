@@ -1,10 +1,26 @@
 """Parseplot module"""
-from .plot import BokehPlotter
-from .plot import BokehPlotter as Plotter  # Default plotter
-from .parse import Parser
+from typing import TYPE_CHECKING
+
+from .parse import Curve, Parser, plot_many
+from .util.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .plot import BokehPlotter, export_many  # pragma: no cover
+    from .plot import BokehPlotter as Plotter  # pragma: no cover
+
+# Plotting imports Bokeh and PIL, so is imported on first use, keeping
+# importing the package, eg only to Parse, fast.
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "BokehPlotter": (".plot.bokeh.bokeh_plotter", "BokehPlotter"),
+    "export_many": (".plot.export", "export_many"),
+    "Plotter": (".plot.bokeh.bokeh_plotter", "BokehPlotter"),  # Default plotter
+}, globals())
 
 __all__ = [
     "BokehPlotter",  # Default plotter
+    "Curve",
+    "export_many",
     "Parser",
     "Plotter",
+    "plot_many",
 ]
@@ -1,6 +1,10 @@
 """Parse module"""
+from .batch import plot_many
+from .curve import Curve
 from .parser import Parser
 
 __all__ = [
+    "Curve",
     "Parser",
+    "plot_many",
 ]
@@ -0,0 +1,88 @@
+"""Adaptive sampling"""
+import heapq
+import math
+from array import array
+from typing import Any, Callable, Union
+
+from .curve import Curve
+
+# Initial uniform samples, before refinement.
+INITIAL_POINTS = 65
+# Maximum number of times an initial interval may be halved.
+MAX_DEPTH = 16
+
+
+def sample_adaptive(evaluate: Callable[[float], Any],
+                    x_min: Union[int, float],
+                    x_max: Union[int, float],
+                    *,
+                    tolerance: float = 1e-3,
+                    max_points: int = 5000,
+                    initial_points: int = INITIAL_POINTS,
+                    ) -> Curve:
+    """
+    Sample evaluate over x_min to x_max, concentrating points where the
+    curve bends.
+
+    Starts from initial_points evenly spaced points, then repeatedly
+    halves the interval whose midpoint deviates furthest from a straight
+    line between its ends, until every interval is within tolerance or
+    max_points points have been evaluated. Deviation is relative to the
+    height of the initial samples, so tolerance is a fraction of the plot
+    height.
+
+    Intervals with both finite and non-finite values are halved until
+    MAX_DEPTH, to locate the edges of where the curve is defined.
+
+    :param evaluate: Callable[[float], Any] returning y for x
+    :param x_min: Union[int, float]
+    :param x_max: Union[int, float]
+    :param tolerance: float maximum deviation, as fraction of plot height
+    :param max_points: int maximum number of evaluations
+    :param initial_points: int number of evenly spaced starting points
+    :return: Curve of evaluated points, in x order
+    """
+    if initial_points < 2:
+        raise ValueError(f"initial_points must be at least 2, not {initial_points!r}")
+    if max_points < 2:
+        raise ValueError(f"max_points must be at least 2, not {max_points!r}")
+    initial_points = min(initial_points, max_points)
+
+    step = (x_max - x_min) / (initial_points - 1)
+    x0 = float(x_min)
+    points = {x: float(evaluate(x)) for x in (x0 + i * step for i in range(initial_points))}
+
+    finite_ys = [y for y in points.values() if math.isfinite(y)]
+    y_scale = (max(finite_ys) - min(finite_ys)) if finite_ys else 0.0
+    y_scale = y_scale or 1.0
+
+    # Max heap of intervals to halve, by deviation of their midpoint.
+    intervals: list[tuple[float, int, tuple[float, float, float, float, float, float]]] = []
+
+    def add_interval(xa: float, ya: float, xb: float, yb: float, depth: int) -> None:
+        if len(points) >= max_points or depth > MAX_DEPTH:
+            return
+        xm = (xa + xb) / 2
+        ym = float(evaluate(xm))
+        points[xm] = ym
+        finite = [math.isfinite(y) for y in (ya, ym, yb)]
+        if all(finite):
+            deviation = abs(ym - (ya + yb) / 2) / y_scale
+        elif any(finite):  # Edge of where curve is defined.
+            deviation = math.inf
+        else:
+            deviation = 0.0
+        if deviation > tolerance:
+            heapq.heappush(intervals, (-deviation, depth, (xa, ya, xm, ym, xb, yb)))
+
+    initial = sorted(points.items())
+    for (xa, ya), (xb, yb) in zip(initial, initial[1:]):
+        add_interval(xa, ya, xb, yb, 1)
+
+    while intervals and len(points) < max_points:
+        _, depth, (xa, ya, xm, ym, xb, yb) = heapq.heappop(intervals)
+        add_interval(xa, ya, xm, ym, depth + 1)
+        add_interval(xm, ym, xb, yb, depth + 1)
+
+    xs = array('d', sorted(points))
+    return Curve(xs, array('d', (points[x] for x in xs)))
@@ -0,0 +1,68 @@
+"""Batch plotting of many expressions"""
+from array import array
+from concurrent.futures import Executor
+from typing import Iterable, Union
+
+from .curve import Curve
+from .parallel import evaluate_domain
+from .parser import Parser
+from .pre_parse import pre_parse_translate
+
+
+def plot_many(expressions: Iterable[str],
+              domain: Iterable[Union[int, float]]|None = None,
+              *,
+              x_min: int = -500,
+              x_max: int = 500,
+              n: int|None = None,
+              smooth: bool = False,
+              very_smooth: bool = False,
+              processes: int|None = None,
+              executor: Executor|None = None,
+              ) -> dict[str, Curve]:
+    """
+    Plot many expressions over a shared domain.
+
+    The domain is built once and shared by every returned Curve.
+    Expressions which are identical after pre_parse_translate are
+    evaluated only once.
+
+    domain: x values to evaluate each expression at. If not given, the
+    domain is sampled as Parser.plot does, from x_min, x_max, n, smooth
+    and very_smooth.
+
+    processes/executor: evaluate expressions in parallel, on executor if
+    given, otherwise on a ProcessPoolExecutor of processes workers.
+    Otherwise expressions are evaluated serially, in this process.
+
+    :param expressions: Iterable[str]
+    :param domain: Iterable[Union[int, float]]
+    :param x_min: int
+    :param x_max: int
+    :param n: int
+    :param smooth: bool
+    :param very_smooth: bool
+    :param processes: int
+    :param executor: Executor
+    :return: dict[str, Curve] keyed by expression, in input order
+    """
+    if domain is None:
+        step = Parser._step(x_min, x_max, n, smooth, very_smooth)
+        domain = Parser.float_range(x_min, x_max + step, step)
+    xs = array('d', domain)
+
+    translated = {expression: pre_parse_translate(expression) for expression in expressions}
+    unique = list(dict.fromkeys(translated.values()))
+
+    if executor is not None:
+        results = list(executor.map(evaluate_domain, unique, [xs] * len(unique)))
+    elif processes:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(evaluate_domain, unique, [xs] * len(unique)))
+    else:
+        results = [evaluate_domain(expression, xs) for expression in unique]
+
+    curves = {expression: Curve(xs, ys) for expression, ys in zip(unique, results)}
+    return {expression: curves[translation] for expression, translation in translated.items()}
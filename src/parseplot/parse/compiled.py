@@ -0,0 +1,130 @@
+"""Compiled expressions"""
+import re
+import threading
+from typing import Any, Iterable, Union
+
+from plusminus import ArithmeticParser
+
+from .fast_path import FastPath, compile_fast_path, round_to_epsilon
+from .polynomial import Polynomial, detect_polynomial
+from ..util.metrics import metrics
+
+# Matches an assignment prefix such as "y=" or "f <- ", but not "==".
+_ASSIGNMENT_PREFIX = re.compile(r"^\s*[^\W\d]\w*\s*(?:<-|←|=(?!=))\s*")
+
+# Whether expressions are evaluated by the fast path where supported, by
+# default. Expressions already compiled keep the setting they were
+# compiled with, so clear the expression cache after changing it.
+FAST_PATH = True
+# Whether polynomials are evaluated by Horner's scheme, by default.
+HORNER = True
+
+
+class CompiledExpression:
+    """
+    Expression parsed once into a reusable plusminus evaluation tree.
+
+    Evaluating the tree for a new x only rebinds the x variable, rather
+    than formatting and re-parsing the expression string for every
+    point.
+
+    Evaluation rebinds x on the expression's own ArithmeticParser, so
+    calls are serialised with a lock, allowing an instance to be shared
+    between threads.
+
+    Expressions using only numbers, x, arithmetic operators and functions
+    - nearly all plotted expressions - are also lowered to a single
+    Python function of x, the fast path, which computes the same results
+    as the tree, without walking it or taking the lock. Anything else,
+    eg comparisons, is evaluated by plusminus.
+
+    Polynomials, eg 3*x**3 - 2*x**2 + x - 7, are detected once when
+    compiled, and evaluated by Horner's scheme from their coefficients,
+    without exponentiation. Results may differ from plusminus' in the last
+    few bits, and are inf rather than raising OverflowError where
+    plusminus deems them too large.
+    """
+
+    def __init__(self, expression: str, fast_path: bool|None = None, horner: bool|None = None):
+        """
+        Parse expression into an evaluation tree.
+
+        An assignment form such as "y=x**2" is compiled as its right
+        hand side, as plusminus evaluates assignments while parsing.
+
+        :param expression: str translated expression, as returned by
+                               pre_parse_translate
+        :param fast_path: bool whether to evaluate by the fast path where
+                               supported, defaulting to FAST_PATH
+        :param horner: bool whether to evaluate polynomials by Horner's
+                            scheme, defaulting to HORNER
+        :return: None
+        """
+        self.expression = expression
+        self.fast_path = FAST_PATH if fast_path is None else fast_path
+        self.horner = HORNER if horner is None else horner
+        self._parser = ArithmeticParser()
+        self._parser['x'] = 0
+        self._tree = self._parser.parse(_ASSIGNMENT_PREFIX.sub('', expression, count=1),
+                                        parseAll=True)
+        self._lock = threading.Lock()
+        self.polynomial: Polynomial|None = detect_polynomial(self._tree) if self.horner else None
+        self._fast: FastPath|None
+        if self.polynomial is not None:
+            evaluate_polynomial = self.polynomial.evaluate
+            self._fast = lambda x: round_to_epsilon(evaluate_polynomial(x))
+        elif self.fast_path:
+            self._fast = compile_fast_path(self._tree, self._parser.vars())
+        else:
+            self._fast = None
+
+    @property
+    def is_fast(self) -> bool:
+        """Whether expression is evaluated without plusminus' interpreter."""
+        return self._fast is not None
+
+    def evaluate(self, x: Union[int, float]) -> Any:
+        """
+        Evaluate expression for a single value of x.
+
+        :param x: Union[int, float]
+        :return: Any
+        """
+        if self._fast is not None:
+            return self._fast(x)
+        with self._lock:
+            self._parser['x'] = x
+            return self._tree.evaluate()
+
+    def evaluate_many(self, xs: Iterable[Union[int, float]]) -> list[Any]:
+        """
+        Evaluate expression for each value of x in xs.
+
+        :param xs: Iterable[Union[int, float]]
+        :return: list[Any]
+        """
+        with metrics.stage('parse.evaluate') as span:
+            if self._fast is not None:
+                ys = list(map(self._fast, xs))
+            else:
+                ys = self._evaluate_tree(xs)
+            span.points = len(ys)
+        return ys
+
+    def _evaluate_tree(self, xs: Iterable[Union[int, float]]) -> list[Any]:
+        """Evaluate expression for each value of x in xs, by plusminus."""
+        parser = self._parser
+        evaluate = self._tree.evaluate
+        ys = []
+        with self._lock:
+            for x in xs:
+                parser['x'] = x
+                ys.append(evaluate())
+        return ys
+
+    def __reduce__(self):
+        """Pickle as the expression text, recompiling when unpickled."""
+        return self.__class__, (self.expression, self.fast_path, self.horner)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.expression!r})"
@@ -0,0 +1,68 @@
+"""Columnar point storage"""
+from array import array
+from typing import Any, Iterator, Sequence, Union
+
+
+class Curve:
+    """
+    Points of a plotted line, stored as separate x and y columns.
+
+    xs and ys are contiguous float buffers - array('d') or NumPy float64
+    arrays - so a curve costs 16 bytes per point, rather than a tuple and
+    two float objects per point.
+
+    Supports len, indexing and iteration as (x, y) tuples, so it may be
+    used in place of a list of points.
+    """
+    __slots__ = ('xs', 'ys')
+
+    def __init__(self, xs: Union[array, Any], ys: Union[array, Any]):
+        """
+        :param xs: array('d')|np.ndarray x values
+        :param ys: array('d')|np.ndarray y values, same length as xs
+        :return: None
+        """
+        if len(xs) != len(ys):
+            raise ValueError(f"xs and ys differ in length: {len(xs)} != {len(ys)}")
+        self.xs = xs
+        self.ys = ys
+
+    @classmethod
+    def from_points(cls, points: Sequence[tuple[Union[int, float], Union[int, float]]]) -> 'Curve':
+        """
+        Construct Curve from a sequence of (x, y) tuples.
+
+        :param points: Sequence[tuple[Union[int, float], Union[int, float]]]
+        :return: Curve
+        """
+        return cls(array('d', (x for x, _ in points)), array('d', (y for _, y in points)))
+
+    def points(self) -> list[tuple[float, float]]:
+        """
+        Returns curve as a list of (x, y) tuples.
+
+        :return: list[tuple[float, float]]
+        """
+        return list(zip(self.xs, self.ys))
+
+    @property
+    def nbytes(self) -> int:
+        """Returns memory used by the x and y buffers, in bytes."""
+        return sum(column.itemsize * len(column) for column in (self.xs, self.ys))
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, index: int) -> tuple[float, float]:
+        return self.xs[index], self.ys[index]
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        return zip(self.xs, self.ys)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Curve):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(<{len(self)} points>)"
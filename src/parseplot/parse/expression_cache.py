@@ -0,0 +1,115 @@
+"""Process-wide cache of compiled expressions"""
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .compiled import CompiledExpression
+from ..util.metrics import metrics
+
+
+class CacheInfo(NamedTuple):
+    """Expression cache statistics."""
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class ExpressionCache:
+    """
+    Size bounded LRU cache of CompiledExpressions, keyed by translated
+    expression text.
+
+    Compiling builds a new plusminus ArithmeticParser, which is far more
+    expensive than evaluating an expression, so expressions seen before
+    are served from the cache.
+
+    Compiled expressions serialise their own evaluation, so may be
+    shared by Parsers in different threads.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        :param maxsize: int maximum number of compiled expressions kept
+        :return: None
+        """
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be a positive integer, not {maxsize!r}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._compiled: OrderedDict[str, CompiledExpression] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, expression: str) -> CompiledExpression:
+        """
+        Returns compiled expression, compiling and caching it if not
+        already cached.
+
+        Expressions which fail to compile are not cached.
+
+        :param expression: str translated expression
+        :return: CompiledExpression
+        """
+        key = expression.strip()
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self.hits += 1
+                metrics.count('expression_cache.hits')
+                return compiled
+            self.misses += 1
+        metrics.count('expression_cache.misses')
+
+        # Compile outside the lock, so a slow compile doesn't block hits.
+        with metrics.stage('parse.compile'):
+            compiled = CompiledExpression(key)
+
+        with self._lock:
+            compiled = self._compiled.setdefault(key, compiled)
+            self._compiled.move_to_end(key)
+            while len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+                self.evictions += 1
+        return compiled
+
+    def info(self) -> CacheInfo:
+        """
+        Returns cache statistics.
+
+        :return: CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._compiled))
+
+    def clear(self) -> None:
+        """
+        Empty the cache and reset statistics.
+
+        :return: None
+        """
+        with self._lock:
+            self._compiled.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __contains__(self, expression: str) -> bool:
+        return expression.strip() in self._compiled
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+
+compiled_expressions = ExpressionCache()
+
+
+def compile_expression(expression: str) -> CompiledExpression:
+    """
+    Returns compiled expression from the process-wide cache.
+
+    :param expression: str translated expression
+    :return: CompiledExpression
+    """
+    return compiled_expressions.get(expression)
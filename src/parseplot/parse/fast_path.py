@@ -0,0 +1,221 @@
+"""Fast path evaluation of compiled expressions, bypassing plusminus' interpreter"""
+import ast
+import math
+import operator
+from typing import Any, Callable
+
+from plusminus import plusminus as pm
+
+from .simplify import simplify
+
+FastPath = Callable[[Any], Any]
+
+# plusminus binary operator functions with an equivalent Python operator,
+# for numeric operands.
+_BINARY_OPERATORS: dict[Callable, type[ast.operator]] = {
+    operator.add: ast.Add,
+    operator.sub: ast.Sub,
+    pm.safe_str_mult: ast.Mult,
+    operator.truediv: ast.Div,
+    operator.floordiv: ast.FloorDiv,
+    operator.mod: ast.Mod,
+}
+
+_IDENTITY = pm.ArithmeticUnaryOp.opns_map['+']
+
+# Functions whose results may not be numeric.
+_EXCLUDED_FUNCTIONS = frozenset({'str'})
+# Functions returning different results for the same arguments.
+IMPURE_FUNCTIONS = frozenset({'rnd', 'randint'})
+
+
+def round_to_epsilon(ret: Any) -> Any:
+    """
+    Round result as plusminus' RoundToEpsilon node does: discarding
+    negligible imaginary or real parts, and returning an int for values
+    within epsilon of one.
+
+    :param ret: Any
+    :return: Any
+    """
+    if type(ret) is float:  # The common case, short cut.
+        if -8 < ret < 8:
+            ret = round(ret, 15)
+            if -1e-15 <= ret <= 1e-15:
+                return 0
+        elif not -1e15 < ret < 1e15:  # Including inf and nan.
+            return ret
+        # Floats of magnitude 8 or more are spaced more than 1e-15 apart,
+        # so are unchanged by rounding to 15 places.
+        integer = int(ret)
+        if ret == integer or math.isclose(ret, integer, abs_tol=1e-15):
+            return integer
+        return ret
+    if isinstance(ret, (float, complex)):
+        if math.isclose(ret.imag, 0, abs_tol=1e-15):
+            ret = round(ret.real, 15)
+        if math.isclose(ret.real, 0, abs_tol=1e-15):
+            if ret.imag:
+                ret = complex(0, ret.imag)
+            else:
+                ret = 0
+        if (
+            not isinstance(ret, complex)
+            and abs(ret) < 1e15
+            and math.isclose(ret, int(ret), abs_tol=1e-15)
+        ):
+            return int(ret)
+    return ret
+
+
+class _Lowering:
+    """
+    Translation of a plusminus evaluation tree to a Python expression.
+
+    Operators with a Python equivalent become Python operators, and
+    everything else a call to the function plusminus itself would call,
+    so results, and exceptions, are the same as evaluating the tree.
+    """
+
+    def __init__(self, variables: dict[str, Any]) -> None:
+        self.variables = variables
+        self.namespace: dict[str, Any] = {'__builtins__': {}}
+        self.impure: set[str] = set()
+
+    def name(self, value: Any) -> ast.Name:
+        """Returns name bound to value in the compiled function's namespace."""
+        for name, bound in self.namespace.items():
+            if bound is value:
+                return ast.Name(name, ast.Load())
+        name = f'_{len(self.namespace)}'
+        self.namespace[name] = value
+        return ast.Name(name, ast.Load())
+
+    def call(self, fn: Any, args: list[ast.expr]) -> ast.Call:
+        return ast.Call(self.name(fn), args, [])
+
+    def lower(self, node: Any) -> ast.expr:
+        """
+        Recursively lower a plusminus node to a Python expression of x.
+
+        Raises TypeError if node is not in the supported subset.
+
+        :param node: plusminus evaluation tree node
+        :return: ast.expr
+        """
+        if isinstance(node, pm.RoundToEpsilon):
+            return self.call(round_to_epsilon, [self.lower(node._result[0])])
+        if isinstance(node, pm.LiteralNode):
+            return self.lower_literal(node.tokens)
+        if isinstance(node, pm.BaseArithmeticParser.IdentifierNode):
+            return self.lower_identifier(node.name)
+        if isinstance(node, pm.ExponentBinaryOp):
+            return self.call(pm.safe_pow, [self.lower(operand) for operand in node.tokens[::2]])
+        if isinstance(node, pm.ArithmeticFunction):
+            return self.lower_function(node)
+        if isinstance(node, pm.ArithmeticUnaryOp):
+            *opers, operand = node.tokens
+            return self.lower_unary(opers, type(node).opns_map, self.lower(operand))
+        if isinstance(node, pm.ArithmeticUnaryPostOp):
+            operand, *opers = node.tokens
+            return self.lower_unary(opers, type(node).opns_map, self.lower(operand))
+        if isinstance(node, pm.ArithmeticBinaryOp):
+            return self.lower_binary(node)
+        raise TypeError(f"no fast path for {type(node).__name__} node {node!r}")
+
+    @staticmethod
+    def lower_literal(value: Any) -> ast.expr:
+        if not isinstance(value, (int, float)):
+            raise TypeError(f"no fast path for non-numeric literal {value!r}")
+        return ast.Constant(value)
+
+    def lower_identifier(self, name: str) -> ast.expr:
+        if name == 'x':
+            return ast.Name('x', ast.Load())
+        value = self.variables.get(name)
+        if not isinstance(value, (int, float)):
+            raise TypeError(f"no fast path for variable {name!r}")
+        return ast.Constant(value)
+
+    def lower_function(self, node: Any) -> ast.expr:
+        fn_name, *fn_args = node.tokens
+        fn_spec = node.fn_map.get(fn_name)
+        if fn_spec is None or fn_name in _EXCLUDED_FUNCTIONS:
+            raise TypeError(f"no fast path for function {fn_name!r}")
+        arity = fn_spec.arity
+        if arity is not ... and len(fn_args) not in (arity if isinstance(arity, tuple) else (arity,)):
+            raise TypeError(f"no fast path for {fn_name!r} with {len(fn_args)} args")
+        name = self.name(fn_spec.method)
+        if fn_name in IMPURE_FUNCTIONS:
+            self.impure.add(name.id)
+        return ast.Call(name, [self.lower(arg) for arg in fn_args], [])
+
+    def lower_unary(self, opers: list[str], opns_map: dict[str, Callable], value: ast.expr) -> ast.expr:
+        for oper in opers:  # Applied in token order, as plusminus does.
+            fn = opns_map[oper]
+            if fn is operator.neg:
+                value = ast.UnaryOp(ast.USub(), value)
+            elif fn is _IDENTITY:
+                pass
+            else:
+                value = self.call(fn, [value])
+        return value
+
+    def lower_binary(self, node: Any) -> ast.expr:
+        opns_map = type(node).opns_map
+        value = self.lower(node.tokens[0])
+        for oper, operand in zip(node.tokens[1::2], node.tokens[2::2]):  # Left associative.
+            fn = opns_map[oper]
+            if fn in _BINARY_OPERATORS:
+                value = ast.BinOp(value, _BINARY_OPERATORS[fn](), self.lower(operand))
+            else:
+                value = self.call(fn, [value, self.lower(operand)])
+        return value
+
+
+def lower_fast_path(tree: Any,
+                    variables: dict[str, Any],
+                    simplified: bool = True,
+                    ) -> tuple[ast.Expression, dict[str, Any]]:
+    """
+    Lower a plusminus evaluation tree to a Python lambda of x, and the
+    namespace it must be compiled in.
+
+    Raises TypeError if the tree uses syntax outside the supported subset
+    of numeric literals, variables, arithmetic operators and functions.
+
+    :param tree: plusminus evaluation tree
+    :param variables: dict[str, Any] values of the plusminus parser's
+                                     variables, other than x
+    :param simplified: bool whether to simplify the lambda's expression
+    :return: tuple[ast.Expression, dict[str, Any]]
+    """
+    lowering = _Lowering(variables)
+    body = lowering.lower(tree)
+    if simplified:
+        body = simplify(body, lowering.namespace, lowering.impure)
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg('x')], kwonlyargs=[], kw_defaults=[], defaults=[])
+    expression = ast.Expression(ast.Lambda(arguments, body))
+    return ast.fix_missing_locations(expression), lowering.namespace
+
+
+def compile_fast_path(tree: Any, variables: dict[str, Any]) -> FastPath|None:
+    """
+    Returns Python function of x evaluating a plusminus evaluation tree,
+    or None if the tree uses syntax outside the supported subset.
+
+    The function computes the same values, raising the same exceptions,
+    as evaluating the tree, but as a single compiled Python expression,
+    rather than by walking the tree. It names nothing but x and the
+    functions plusminus would call, so is as safe to evaluate as the tree.
+
+    :param tree: plusminus evaluation tree
+    :param variables: dict[str, Any] values of the plusminus parser's
+                                     variables, other than x
+    :return: Callable[[Any], Any]|None
+    """
+    try:
+        expression, namespace = lower_fast_path(tree, variables)
+    except TypeError:
+        return None
+    return eval(compile(expression, '<fast path>', 'eval'), namespace)
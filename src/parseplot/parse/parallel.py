@@ -0,0 +1,135 @@
+"""Multi-process evaluation of large domains"""
+import os
+from array import array
+from concurrent.futures import Executor
+from typing import Union
+
+from .curve import Curve
+from .expression_cache import compile_expression
+
+# Fewest points worth the overhead of sending to a worker process.
+MIN_CHUNK_SIZE = 2048
+# Chunks per worker, so faster workers pick up the slack of slower ones.
+CHUNKS_PER_WORKER = 4
+
+
+def evaluate_parallel(expression: str,
+                      start: Union[int, float],
+                      end: Union[int, float],
+                      step: Union[int, float] = 1.0,
+                      *,
+                      processes: int|None = None,
+                      executor: Executor|None = None,
+                      ) -> Curve:
+    """
+    Evaluate expression over float_range(start, end, step) in worker
+    processes.
+
+    The domain is partitioned into contiguous index ranges, each worker
+    generating and evaluating its own x values with its own compiled
+    expression, from the worker's compiled expression cache. Results are reassembled in domain order.
+
+    Uses executor if given, otherwise a ProcessPoolExecutor of processes
+    workers (defaulting to os.cpu_count()), shut down on return.
+
+    :param expression: str translated expression
+    :param start: Union[int, float]
+    :param end: Union[int, float]
+    :param step: Union[int, float]
+    :param processes: int number of worker processes
+    :param executor: Executor to submit chunks to
+    :return: Curve
+    """
+    from .parser import Parser
+
+    workers = processes or os.cpu_count() or 1
+    bounds = partition(Parser.float_range_length(start, end, step), workers)
+
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(processes) as executor:
+            chunks = list(executor.map(evaluate_chunk, *_chunk_args(expression, start, step, bounds)))
+    else:
+        chunks = list(executor.map(evaluate_chunk, *_chunk_args(expression, start, step, bounds)))
+
+    xs = array('d')
+    ys = array('d')
+    for chunk_xs, chunk_ys in chunks:
+        xs.extend(chunk_xs)
+        ys.extend(chunk_ys)
+    return Curve(xs, ys)
+
+
+def partition(length: int, workers: int) -> list[tuple[int, int]]:
+    """
+    Split range(length) into contiguous (start, stop) index ranges.
+
+    Aims for CHUNKS_PER_WORKER chunks per worker, but no chunk smaller
+    than MIN_CHUNK_SIZE, other than a domain shorter than that.
+
+    :param length: int number of points
+    :param workers: int number of workers
+    :return: list[tuple[int, int]]
+    """
+    chunk_count = max(1, min(workers * CHUNKS_PER_WORKER, length // MIN_CHUNK_SIZE))
+    chunk_size, remainder = divmod(length, chunk_count)
+    bounds = []
+    first = 0
+    for i in range(chunk_count):
+        stop = first + chunk_size + (i < remainder)
+        bounds.append((first, stop))
+        first = stop
+    return bounds
+
+
+def evaluate_chunk(expression: str,
+                   start: Union[int, float],
+                   step: Union[int, float],
+                   first: int,
+                   stop: int,
+                   ) -> tuple[array, array]:
+    """
+    Evaluate points first to stop (exclusive) of a float_range.
+
+    x values are computed as in Parser.float_range, so are identical to
+    those of a serial plot. Runs in worker processes.
+
+    :param expression: str translated expression
+    :param start: Union[int, float] float_range start
+    :param step: Union[int, float] float_range step
+    :param first: int index of first point
+    :param stop: int index after last point
+    :return: tuple[array, array] of x and y values
+    """
+    x0 = float(start)
+    xs = array('d', (x0 + i * step for i in range(first, stop)))
+    return xs, array('d', compile_expression(expression).evaluate_many(xs))
+
+
+def evaluate_domain(expression: str, xs: array) -> array:
+    """
+    Evaluate expression at each x in xs.
+
+    Runs in worker processes, or serially.
+
+    :param expression: str translated expression
+    :param xs: array('d') x values
+    :return: array('d') of y values
+    """
+    return array('d', compile_expression(expression).evaluate_many(xs))
+
+
+def _chunk_args(expression: str,
+                start: Union[int, float],
+                step: Union[int, float],
+                bounds: list[tuple[int, int]],
+                ) -> tuple[list, ...]:
+    """Arguments of evaluate_chunk per chunk, arranged for Executor.map."""
+    count = len(bounds)
+    return ([expression] * count,
+            [start] * count,
+            [step] * count,
+            [first for first, _ in bounds],
+            [stop for _, stop in bounds],
+            )
@@ -1,8 +1,35 @@
-from typing import Union, Generator
-
-from plusminus import ArithmeticParser
+import math
+from array import array
+from concurrent.futures import Executor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Generator, Iterable, NamedTuple, Optional, TYPE_CHECKING, Union
 
+from .compiled import CompiledExpression
+from .curve import Curve
+from .expression_cache import compile_expression
+from .point_file import write_point_file
 from .pre_parse import pre_parse_translate
+from ..util.metrics import metrics
+from ..util.filepath_helpers import ensure_extension
+
+if TYPE_CHECKING:
+    import numpy as np  # pragma: no cover
+    from .result_cache import ResultCache  # pragma: no cover
+    from .vectorize import VectorizedExpression  # pragma: no cover
+
+# Number of points evaluated per batch when building a Curve.
+_CHUNK_SIZE = 4096
+
+
+class _Segment(NamedTuple):
+    """
+    Points of the last plot, retained to be reused by the next: y values
+    as floats if it was columnar, otherwise as evaluated.
+    """
+    step: Union[int, float]
+    xs: array
+    ys: Union[array, list[Any]]
 
 
 class Parser:
@@ -12,7 +39,6 @@ class Parser:
 
     def __init__(self, expression: str):
         self.expression = expression
-        self._parser = ArithmeticParser()
 
     @property
     def expression(self):
@@ -25,20 +51,45 @@ class Parser:
         Reassigns ._readable_expression, ._expression
 
         Internal representation ._expression set to validated/translated
-        form.
+        form. Compilation of the translated form is deferred until the
+        expression is first evaluated, and shared with other Parsers of
+        the same expression via the compiled expression cache.
 
         :param new_expression: str
         :return: None
         """
         self._readable_expression = new_expression
         self._expression = pre_parse_translate(new_expression)
+        self._compiled_expression: CompiledExpression|None = None
+        self._vectorized_expression: VectorizedExpression|None = None
+        self._segment: _Segment|None = None
+
+    @property
+    def _compiled(self) -> CompiledExpression:
+        """Returns the compiled expression, from the cache on first use."""
+        if self._compiled_expression is None:
+            self._compiled_expression = compile_expression(self._expression)
+        return self._compiled_expression
+
+    @property
+    def _vectorized(self) -> 'VectorizedExpression':
+        """Returns the NumPy lowered expression, lowering it on first use."""
+        if self._vectorized_expression is None:
+            from .vectorize import VectorizedExpression
+            self._vectorized_expression = VectorizedExpression(self._compiled)
+        return self._vectorized_expression
 
     def plot(self, x_min: int = -500,
              x_max: int = 500,
              n: int|None = None,
              smooth: bool = False,
-             very_smooth: bool = False
-             ) -> list[tuple[float, Union[int, float]]]:
+             very_smooth: bool = False,
+             *,
+             columnar: bool = False,
+             processes: int|None = None,
+             cache: Optional['ResultCache'] = None,
+             incremental: bool = True,
+             ) -> Union[list[tuple[float, Union[int, float]]], Curve]:
         """
         Plot expression.
 
@@ -56,31 +107,386 @@ class Parser:
         NB if n>0 is passed, smooth/very_smooth are ignored, with smooth
         evaluated before very_smooth and taking precedence.
 
+        columnar: return a Curve of x and y float buffers, rather than a
+        list of (x, y) tuples, avoiding per-point tuple allocation.
+
+        processes: evaluate the domain in chunks across this many worker
+        processes. Worth it only for large numbers of points, as each
+        worker must start up and compile the expression.
+
+        cache: ResultCache to look the points up in, or store them in.
+        Cached y values are floats, and cached Curves are read only.
+
+        incremental: retain the plotted points, and when the next plot has
+        the same step, evaluate only the x values it doesn't share with
+        this one, so panning costs in proportion to the newly revealed
+        domain. y values are only reused for bit-identical x values, and
+        by a list of points only if they were plotted as one, so points
+        are the same as a fresh plot's, down to their types. Retained
+        points cost 16 bytes each, more for points plotted as a list,
+        until the next plot; pass False to neither reuse nor retain points.
+
         :param x_min: int
         :param x_max: int
         :param n: int
         :param smooth: bool
         :param very_smooth: bool
-        :return: list[tuple[float, Union[int, float]]]
+        :param columnar: bool
+        :param processes: int
+        :param cache: ResultCache
+        :param incremental: bool
+        :return: Union[list[tuple[float, Union[int, float]]], Curve]
         """
-        if n:
-            step = (x_max - x_min) / (n - 1)
-        elif smooth:
-            step = (x_max - x_min) / (500 - 1)
-        elif very_smooth:
-            step = (x_max - x_min) / (5000 - 1)
-        else:
-            step = 1
-        domain = self.float_range(x_min, x_max + step, step)
+        step = self._step(x_min, x_max, n, smooth, very_smooth)
+        if cache is not None:
+            key = cache.key(self._expression, x_min, x_max + step, step)
+            curve = cache.get(key)
+            if curve is None:
+                curve = cache.put(key, self._plot_curve(x_min, x_max + step, step, processes))
+            return curve if columnar else curve.points()
+        if processes or (columnar and not incremental):
+            curve = self._plot_curve(x_min, x_max + step, step, processes)
+            return curve if columnar else curve.points()
+        if incremental:
+            return self._plot_incremental(x_min, x_max + step, step, columnar)
 
-        self._parser.evaluate("x=0")
+        domain = list(self.float_range(x_min, x_max + step, step))
 
-        xy_points = [(x, self._get_y_coord(x)) for x in domain]
+        xy_points = list(zip(domain, self._compiled.evaluate_many(domain)))
         return xy_points
 
+    def _plot_incremental(self, start: Union[int, float],
+                          end: Union[int, float],
+                          step: Union[int, float],
+                          columnar: bool = False,
+                          ) -> Union[list[tuple[float, Union[int, float]]], Curve]:
+        """
+        Evaluate float_range(start, end, step), reusing y values of the
+        retained segment where the domains overlap, and retain the result.
+
+        :param start: Union[int, float]
+        :param end: Union[int, float]
+        :param step: Union[int, float]
+        :param columnar: bool
+        :return: Union[list[tuple[float, Union[int, float]]], Curve]
+        """
+        xs = array('d', self.float_range(start, end, step))
+        first, stop, shared_ys, stale = self._overlap(xs, step, columnar)
+        for index, y in zip(stale, self._compiled.evaluate_many([xs[first + index] for index in stale])):
+            shared_ys[index] = y
+
+        if columnar:
+            ys = array('d')
+            for _, chunk_ys in self._evaluate_chunks(xs[:first]):
+                ys.extend(chunk_ys)
+            ys.extend(shared_ys)
+            for _, chunk_ys in self._evaluate_chunks(xs[stop:]):
+                ys.extend(chunk_ys)
+            self._segment = _Segment(step, array('d', xs), array('d', ys))
+            return Curve(xs, ys)
+
+        y_values = self._compiled.evaluate_many(xs[:first])
+        y_values.extend(shared_ys)
+        y_values.extend(self._compiled.evaluate_many(xs[stop:]))
+        self._segment = _Segment(step, xs, y_values)
+        return list(zip(xs, y_values))
+
+    def _overlap(self, xs: array,
+                 step: Union[int, float],
+                 columnar: bool = False,
+                 ) -> tuple[int, int, Union[array, list[Any]], list[int]]:
+        """
+        Returns indices first to stop of xs which the retained segment
+        holds y values for, a copy of those y values, as floats if
+        columnar, and the indices in that copy whose retained x values
+        aren't bit-identical to xs', which are stale, and must be
+        evaluated again.
+
+        Values are only shared if the segment has the same step, and its
+        x values lie on the same grid as xs, and with a list of points
+        only if the segment retained the y values as evaluated.
+
+        :param xs: array('d')
+        :param step: Union[int, float]
+        :param columnar: bool
+        :return: tuple[int, int, Union[array, list[Any]], list[int]]
+        """
+        none: tuple[int, int, Union[array, list[Any]], list[int]] = (len(xs), len(xs),
+                                                                     array('d') if columnar else [], [])
+        segment = self._segment
+        if segment is None or not xs or not math.isclose(segment.step, step, rel_tol=1e-9):
+            return none
+        if not columnar and isinstance(segment.ys, array):  # Types of the y values evaluated are lost.
+            return none
+        retained_xs, retained_ys = segment.xs, segment.ys
+        offset = round((xs[0] - retained_xs[0]) / step)
+        if not math.isclose(retained_xs[0] + offset * step, xs[0], rel_tol=1e-12, abs_tol=abs(step) * 1e-9):
+            return none
+        first = max(0, -offset)
+        stop = min(len(xs), len(retained_xs) - offset)
+        if first >= stop:
+            return none
+        shared_xs = retained_xs[first + offset:stop + offset]
+        shared_ys = retained_ys[first + offset:stop + offset]
+        if columnar and not isinstance(shared_ys, array):
+            try:
+                shared_ys = array('d', shared_ys)
+            except TypeError:  # Non-real y values, eg complex.
+                return none
+        stale = [index for index, (x, retained_x) in enumerate(zip(xs[first:stop], shared_xs)) if x != retained_x]
+        return first, stop, shared_ys, stale
+
+    async def aplot(self, x_min: int = -500,
+                    x_max: int = 500,
+                    n: int|None = None,
+                    smooth: bool = False,
+                    very_smooth: bool = False,
+                    *,
+                    columnar: bool = False,
+                    processes: int|None = None,
+                    cache: Optional['ResultCache'] = None,
+                    incremental: bool = True,
+                    executor: Executor|None = None,
+                    ) -> Union[list[tuple[float, Union[int, float]]], Curve]:
+        """
+        Plot expression without blocking the event loop.
+
+        Takes the same arguments as .plot, which is run in executor,
+        subject to the concurrency limit of util.asynchronous.
+
+        :param x_min: int
+        :param x_max: int
+        :param n: int
+        :param smooth: bool
+        :param very_smooth: bool
+        :param columnar: bool
+        :param processes: int
+        :param cache: ResultCache
+        :param incremental: bool
+        :param executor: Executor, defaulting to util.asynchronous's
+        :return: Union[list[tuple[float, Union[int, float]]], Curve]
+        """
+        from ..util.asynchronous import run_blocking
+
+        return await run_blocking(self.plot, x_min, x_max, n, smooth, very_smooth,
+                                  columnar=columnar, processes=processes, cache=cache,
+                                  incremental=incremental, executor=executor)
+
+    def _plot_curve(self, start: Union[int, float],
+                    end: Union[int, float],
+                    step: Union[int, float],
+                    processes: int|None = None,
+                    ) -> Curve:
+        """
+        Evaluate float_range(start, end, step) into a Curve.
+
+        Points are evaluated in worker processes if processes is given,
+        otherwise in batches, so no more than _CHUNK_SIZE y values are
+        held as Python objects at once.
+
+        :param start: Union[int, float]
+        :param end: Union[int, float]
+        :param step: Union[int, float]
+        :param processes: int
+        :return: Curve
+        """
+        if processes:
+            from .parallel import evaluate_parallel
+
+            return evaluate_parallel(self._expression, start, end, step, processes=processes)
+
+        xs = array('d')
+        ys = array('d')
+        for chunk_xs, chunk_ys in self._evaluate_chunks(self.float_range(start, end, step)):
+            xs.extend(chunk_xs)
+            ys.extend(chunk_ys)
+        return Curve(xs, ys)
+
+    def save_plot(self, filepath: Union[str, Path],
+                  x_min: int = -500,
+                  x_max: int = 500,
+                  n: int|None = None,
+                  smooth: bool = False,
+                  very_smooth: bool = False,
+                  *,
+                  processes: int|None = None,
+                  ) -> Path:
+        """
+        Plot expression to a point file, to be read back memory-mapped.
+
+        Takes the same domain arguments as .plot. The file records the
+        expression and sampled domain alongside the points.
+
+        Appends .pplt extension if not given.
+
+        :param filepath: Union[str, Path]
+        :param x_min: int
+        :param x_max: int
+        :param n: int
+        :param smooth: bool
+        :param very_smooth: bool
+        :param processes: int
+        :return: Path
+        """
+        step = self._step(x_min, x_max, n, smooth, very_smooth)
+        curve = self._plot_curve(x_min, x_max + step, step, processes)
+        return write_point_file(ensure_extension(Path(filepath), '.pplt'), curve,
+                                expression=self.expression, start=x_min, end=x_max + step, step=step)
+
+    def iter_points(self, x_min: int = -500,
+                    x_max: int = 500,
+                    n: int|None = None,
+                    smooth: bool = False,
+                    very_smooth: bool = False,
+                    *,
+                    chunk_size: int|None = None,
+                    ) -> Generator[Union[tuple[float, Union[int, float]], Curve], None, None]:
+        """
+        Lazily generate points of expression.
+
+        Takes the same domain arguments as .plot, and yields the same
+        points, but evaluates them as they are consumed, so memory use is
+        bounded regardless of the number of points.
+
+        chunk_size: if given, yield Curves of up to chunk_size points,
+        rather than individual (x, y) tuples.
+
+        :param x_min: int
+        :param x_max: int
+        :param n: int
+        :param smooth: bool
+        :param very_smooth: bool
+        :param chunk_size: int
+        :return: Generator[Union[tuple[float, Union[int, float]], Curve], None, None]
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, not {chunk_size!r}")
+
+        step = self._step(x_min, x_max, n, smooth, very_smooth)
+        domain = self.float_range(x_min, x_max + step, step)
+
+        for xs, ys in self._evaluate_chunks(domain, chunk_size or _CHUNK_SIZE):
+            if chunk_size:
+                yield Curve(xs, array('d', ys))
+            else:
+                yield from zip(xs, ys)
+
+    def _evaluate_chunks(self, domain: Iterable[float],
+                         chunk_size: int = _CHUNK_SIZE,
+                         ) -> Generator[tuple[array, list[Union[int, float]]], None, None]:
+        """
+        Evaluate domain lazily, chunk_size x values at a time.
+
+        :param domain: Iterable[float]
+        :param chunk_size: int
+        :return: Generator[tuple[array, list[Union[int, float]]], None, None]
+        """
+        domain = iter(domain)
+        while xs := array('d', islice(domain, chunk_size)):
+            yield xs, self._compiled.evaluate_many(xs)
+
+    def plot_adaptive(self, x_min: int = -500,
+                      x_max: int = 500,
+                      *,
+                      tolerance: float = 1e-3,
+                      max_points: int = 5000,
+                      columnar: bool = False,
+                      ) -> Union[list[tuple[float, Union[int, float]]], Curve]:
+        """
+        Plot expression, adaptively sampling the domain.
+
+        Rather than spacing points evenly, points are concentrated where
+        the curve bends, and sparse where it is straight, so a curve as
+        faithful as a very_smooth plot takes far fewer evaluations.
+
+        tolerance: maximum deviation of the plotted line from the curve,
+        as a fraction of the plot height.
+        max_points: maximum number of points to evaluate.
+        columnar: return a Curve, rather than a list of (x, y) tuples.
+
+        Points at which the expression is undefined, or not real, are nan
+        rather than raising, as they do with .plot, and points are
+        concentrated around where it becomes undefined.
+
+        :param x_min: int
+        :param x_max: int
+        :param tolerance: float
+        :param max_points: int
+        :param columnar: bool
+        :return: Union[list[tuple[float, Union[int, float]]], Curve]
+        """
+        from .adaptive import sample_adaptive
+
+        def evaluate(x: float) -> Union[int, float]:
+            try:
+                y = self._compiled.evaluate(x)
+            except (ArithmeticError, TypeError, ValueError):
+                return math.nan
+            return y if isinstance(y, (int, float)) else math.nan
+
+        with metrics.stage('parse.evaluate_adaptive') as span:
+            curve = sample_adaptive(evaluate, x_min, x_max,
+                                    tolerance=tolerance, max_points=max_points)
+            span.points = len(curve)
+        return curve if columnar else curve.points()
+
+    def plot_arrays(self, x_min: int = -500,
+                    x_max: int = 500,
+                    n: int|None = None,
+                    smooth: bool = False,
+                    very_smooth: bool = False
+                    ) -> tuple['np.ndarray', 'np.ndarray']:
+        """
+        Plot expression, evaluating the whole domain as NumPy arrays.
+
+        Takes the same arguments as .plot, and samples the same x values,
+        but returns separate x and y arrays. Requires NumPy.
+
+        Points at which the expression is undefined are nan/inf rather
+        than raising, as they do with .plot.
+
+        :param x_min: int
+        :param x_max: int
+        :param n: int
+        :param smooth: bool
+        :param very_smooth: bool
+        :return: tuple[np.ndarray, np.ndarray]
+        """
+        from .vectorize import float_range_array
+
+        step = self._step(x_min, x_max, n, smooth, very_smooth)
+        xs = float_range_array(x_min, x_max + step, step)
+        with metrics.stage('parse.evaluate_vectorized', len(xs)):
+            ys = self._vectorized.evaluate(xs)
+        return xs, ys
+
+    @staticmethod
+    def _step(x_min: Union[int, float],
+              x_max: Union[int, float],
+              n: int|None = None,
+              smooth: bool = False,
+              very_smooth: bool = False
+              ) -> Union[int, float]:
+        """
+        Distance between plotted x values, per .plot's n/smooth/very_smooth.
+
+        :param x_min: Union[int, float]
+        :param x_max: Union[int, float]
+        :param n: int
+        :param smooth: bool
+        :param very_smooth: bool
+        :return: Union[int, float]
+        """
+        if n:
+            return (x_max - x_min) / (n - 1)
+        if smooth:
+            return (x_max - x_min) / (500 - 1)
+        if very_smooth:
+            return (x_max - x_min) / (5000 - 1)
+        return 1
+
     def _get_y_coord(self, x: Union[int, float]) -> Union[int, float]:
-        self._parser.evaluate(f"x={x}")
-        return self._parser.evaluate(self._expression)
+        return self._compiled.evaluate(x)
 
     @staticmethod
     def float_range(start: Union[int, float],
@@ -105,3 +511,30 @@ class Parser:
             x = x0 + i * step  # Multiplication avoids adding floating point errors.
             if x < end:
                 yield x
+
+    @staticmethod
+    def float_range_length(start: Union[int, float],
+                           end: Union[int, float],
+                           step: Union[int, float] = 1.0
+                           ) -> int:
+        """
+        Number of values float_range yields, without iterating it.
+
+        :param start: Union[int, float]
+        :param end: Union[int, float]
+        :param step: Union[int, float]
+        :return: int
+        """
+        x0 = float(start)
+        if not step > 0 or not x0 + step / 2.0 < end:
+            return 1
+
+        def in_range(i: int) -> bool:
+            return x0 + i * step < end and x0 + (i - 1) * step + step / 2.0 < end
+
+        i = max(1, math.ceil((end - x0) / step) - 1)
+        while in_range(i + 1):
+            i += 1
+        while i > 1 and not in_range(i):
+            i -= 1
+        return i + 1 if in_range(i) else 1
@@ -0,0 +1,160 @@
+"""Compact binary files of plotted points"""
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, NamedTuple, Union
+
+from .curve import Curve
+
+MAGIC = b'PPLT'
+VERSION = 1
+# Little-endian: magic, version, dtype, padding, expression length in
+# bytes, number of points, domain start, end and step.
+_HEADER = struct.Struct('<4sHcxIQddd')
+# Blocks of x and y values start on a multiple of this many bytes.
+_ALIGNMENT = 8
+
+
+class PointFileHeader(NamedTuple):
+    """Description of the points stored in a point file."""
+    expression: str
+    start: float
+    end: float
+    step: float
+    length: int
+    dtype: str
+
+
+def write_point_file(filepath: Union[str, Path],
+                     curve: Curve,
+                     *,
+                     expression: str = '',
+                     start: Union[int, float]|None = None,
+                     end: Union[int, float]|None = None,
+                     step: Union[int, float]|None = None,
+                     ) -> Path:
+    """
+    Write curve to a point file.
+
+    The file is a fixed size header, the UTF-8 expression, then the x
+    values and y values as contiguous blocks of little-endian float64s,
+    so it can be read without parsing, memory-mapped.
+
+    start/end/step describe the sampled domain, and are stored as nan if
+    not given, eg for adaptively sampled curves. The file is written to a
+    temporary file and renamed into place, so readers never see a partial
+    file.
+
+    :param filepath: Union[str, Path]
+    :param curve: Curve
+    :param expression: str expression the curve was plotted from
+    :param start: Union[int, float] first x value sampled
+    :param end: Union[int, float] end of the sampled domain
+    :param step: Union[int, float] distance between sampled x values
+    :return: Path
+    """
+    filepath = Path(filepath)
+    encoded_expression = expression.encode('utf-8')
+    header = _HEADER.pack(MAGIC, VERSION, b'd', len(encoded_expression), len(curve),
+                          *(math.nan if value is None else float(value) for value in (start, end, step)))
+    header += encoded_expression
+    header += bytes(-len(header) % _ALIGNMENT)
+
+    fd, temp_path = tempfile.mkstemp(dir=filepath.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(header)
+            temp_file.write(_little_endian_doubles(curve.xs))
+            temp_file.write(_little_endian_doubles(curve.ys))
+        os.replace(temp_path, filepath)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    return filepath
+
+
+def read_point_file(filepath: Union[str, Path]) -> tuple[PointFileHeader, Curve]:
+    """
+    Read a point file, memory-mapped.
+
+    The curve's xs and ys are read only views of the mapped file, rather
+    than copies, so reading costs next to nothing however many points the
+    file holds, and pages are only loaded as they are used. The file
+    stays mapped until the curve is garbage collected.
+
+    Raises ValueError if the file is not a point file.
+
+    :param filepath: Union[str, Path]
+    :return: tuple[PointFileHeader, Curve]
+    """
+    with open(filepath, 'rb') as point_file:
+        if os.fstat(point_file.fileno()).st_size < _HEADER.size:
+            raise ValueError(f"{filepath} is not a point file: too short")
+        mapped = mmap.mmap(point_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header, data_offset = _parse_header(mapped, filepath)
+    block_size = header.length * 8
+    if len(mapped) < data_offset + 2 * block_size:
+        raise ValueError(f"{filepath} is truncated: expected {header.length} points")
+
+    view = memoryview(mapped)
+    xs = view[data_offset:data_offset + block_size]
+    ys = view[data_offset + block_size:data_offset + 2 * block_size]
+    if sys.byteorder == 'little':
+        return header, Curve(xs.cast('d'), ys.cast('d'))
+    return header, Curve(_native_doubles(xs), _native_doubles(ys))  # pragma: no cover
+
+
+def read_point_file_header(filepath: Union[str, Path]) -> PointFileHeader:
+    """
+    Read the header of a point file, without reading its points.
+
+    :param filepath: Union[str, Path]
+    :return: PointFileHeader
+    """
+    with open(filepath, 'rb') as point_file:
+        fixed = point_file.read(_HEADER.size)
+        if len(fixed) < _HEADER.size:
+            raise ValueError(f"{filepath} is not a point file: too short")
+        expression_length = _HEADER.unpack(fixed)[3]
+        header, _ = _parse_header(fixed + point_file.read(expression_length), filepath)
+    return header
+
+
+def _parse_header(data: Any, filepath: Union[str, Path]) -> tuple[PointFileHeader, int]:
+    """Returns header of point file data, and offset of its x values."""
+    magic, version, dtype, expression_length, length, start, end, step = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{filepath} is not a point file")
+    if version != VERSION or dtype != b'd':
+        raise ValueError(f"{filepath} is an unsupported point file: version {version}, dtype {dtype!r}")
+    expression_end = _HEADER.size + expression_length
+    expression = bytes(data[_HEADER.size:expression_end]).decode('utf-8')
+    data_offset = expression_end + -expression_end % _ALIGNMENT
+    return PointFileHeader(expression, start, end, step, length, dtype.decode()), data_offset
+
+
+def _little_endian_doubles(values: Any) -> Any:
+    """Returns buffer of values as little-endian float64s, without copying if possible."""
+    try:
+        buffer = memoryview(values)
+    except TypeError:  # Not a buffer, eg a list.
+        buffer = None
+    if buffer is None or buffer.format != 'd' or not buffer.c_contiguous or sys.byteorder != 'little':
+        doubles = array('d', values)
+        if sys.byteorder != 'little':
+            doubles.byteswap()  # pragma: no cover
+        return doubles
+    return buffer
+
+
+def _native_doubles(little_endian: memoryview) -> array:  # pragma: no cover
+    """Returns copy of little-endian float64 buffer, in native byte order."""
+    doubles = array('d', bytes(little_endian))
+    doubles.byteswap()
+    return doubles
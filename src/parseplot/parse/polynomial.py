@@ -0,0 +1,230 @@
+"""Detection and Horner's scheme evaluation of polynomial expressions"""
+import ast
+from typing import Any, Callable, Iterable, Sequence, Union
+
+from plusminus import plusminus as pm
+
+from .fast_path import IMPURE_FUNCTIONS
+
+# Highest power of x evaluated by Horner's scheme. Higher powers are more
+# accurately evaluated by exponentiation than by repeated multiplication.
+MAX_DEGREE = 16
+
+_POSTFIX_POWERS = {'⁰': 0, '¹': 1, '²': 2, '³': 3}
+
+# Terms of a polynomial, power of x to coefficient.
+Terms = dict[int, Union[int, float]]
+
+
+class Polynomial:
+    """
+    Polynomial in x, evaluated by Horner's scheme.
+
+    Horner's scheme evaluates a polynomial of degree n with n
+    multiplications and n additions, and no exponentiation, as nested
+    products, eg 3*x**3 - 2*x**2 + x - 7 as ((3*x - 2)*x + 1)*x - 7.
+
+    Evaluates a single x, or every x of a NumPy array at once.
+    """
+
+    def __init__(self, coefficients: Sequence[Union[int, float]]) -> None:
+        """
+        :param coefficients: Sequence[Union[int, float]] coefficients of
+                             increasing powers of x, from x**0
+        :return: None
+        """
+        coefficients = list(coefficients)
+        while len(coefficients) > 1 and coefficients[-1] == 0:
+            coefficients.pop()
+        self.coefficients: tuple[Union[int, float], ...] = tuple(coefficients) or (0,)
+        self._evaluate = _compile_horner(self.coefficients)
+
+    @property
+    def degree(self) -> int:
+        """Returns highest power of x with a nonzero coefficient."""
+        return len(self.coefficients) - 1
+
+    def evaluate(self, x: Any) -> Any:
+        """
+        Evaluate polynomial at x.
+
+        :param x: Union[int, float, np.ndarray]
+        :return: Union[int, float, np.ndarray]
+        """
+        return self._evaluate(x)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+        return self.coefficients == other.coefficients
+
+    def __hash__(self) -> int:
+        return hash(self.coefficients)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.coefficients)!r})"
+
+
+def _compile_horner(coefficients: tuple[Union[int, float], ...]) -> Callable[[Any], Any]:
+    """Returns function of x evaluating coefficients by Horner's scheme."""
+    x = ast.Name('x', ast.Load())
+    *lower, leading = coefficients
+    value: ast.expr = ast.Constant(leading)
+    for coefficient in reversed(lower):
+        if isinstance(value, ast.Constant) and type(value.value) is int and value.value == 1:
+            value = x  # Leading 1*x.
+        else:
+            value = ast.BinOp(value, ast.Mult(), x)
+        if coefficient != 0:
+            value = ast.BinOp(value, ast.Add(), ast.Constant(coefficient))
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg('x')], kwonlyargs=[], kw_defaults=[], defaults=[])
+    expression = ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, value)))
+    return eval(compile(expression, '<horner>', 'eval'), {'__builtins__': {}})
+
+
+def detect_polynomial(tree: Any) -> Polynomial|None:
+    """
+    Returns polynomial a plusminus evaluation tree evaluates, or None if
+    it isn't one.
+
+    Only expanded polynomials of degree up to MAX_DEGREE are detected:
+    sums of terms, each a constant multiple of a power of x, such as
+    3*x**3 - 2*x**2 + x/2 - 7. Constant subexpressions, eg sin(pi/4), are
+    evaluated as coefficients. Products and powers of sums, such as
+    (x - 1)**10, are not expanded, as evaluating the expanded
+    polynomial near its roots is far less accurate than evaluating the
+    expression as written.
+
+    :param tree: plusminus evaluation tree
+    :return: Polynomial|None
+    """
+    try:
+        terms = _terms(tree)
+    except TypeError:
+        return None
+    degree = max(terms, default=0)
+    if degree > MAX_DEGREE:
+        return None
+    return Polynomial([terms.get(power, 0) for power in range(degree + 1)])
+
+
+def _terms(node: Any) -> Terms:
+    """
+    Recursively collect terms of polynomial node.
+
+    Raises TypeError if node isn't an expanded polynomial.
+    """
+    if isinstance(node, pm.RoundToEpsilon):
+        return _terms(node._result[0])
+    if not _varies(node):
+        return {0: _constant(node)}
+    if isinstance(node, pm.BaseArithmeticParser.IdentifierNode):
+        return {1: 1}
+    if isinstance(node, pm.ExponentBinaryOp):
+        base, *exponents = node.tokens[::2]
+        if any(_varies(exponent) for exponent in exponents):
+            raise TypeError("exponent is not constant")
+        try:
+            exponent = pm.safe_pow(*(_constant(exponent) for exponent in exponents))
+        except ArithmeticError as error:
+            raise TypeError(f"invalid exponent: {error}") from error
+        return _power(_terms(base), exponent)
+    if isinstance(node, pm.ArithmeticUnaryOp):
+        *opers, operand = node.tokens
+        terms = _terms(operand)
+        for oper in opers:
+            if oper in ('-', '−'):
+                terms = {power: -coefficient for power, coefficient in terms.items()}
+            elif oper != '+':
+                raise TypeError(f"not a polynomial operator {oper!r}")
+        return terms
+    if isinstance(node, pm.ArithmeticUnaryPostOp):
+        operand, *opers = node.tokens
+        terms = _terms(operand)
+        for oper in opers:
+            if oper not in _POSTFIX_POWERS:
+                raise TypeError(f"not a polynomial operator {oper!r}")
+            terms = _power(terms, _POSTFIX_POWERS[oper])
+        return terms
+    if isinstance(node, pm.ArithmeticBinaryOp):
+        terms = _terms(node.tokens[0])
+        for oper, operand in zip(node.tokens[1::2], node.tokens[2::2]):  # Left associative.
+            operand_terms = _terms(operand)
+            if oper == '+':
+                terms = _add(terms, operand_terms, 1)
+            elif oper in ('-', '−'):
+                terms = _add(terms, operand_terms, -1)
+            elif oper in ('*', '×'):
+                terms = _multiply(terms, operand_terms)
+            elif oper in ('/', '÷'):
+                terms = _divide(terms, operand_terms)
+            else:
+                raise TypeError(f"not a polynomial operator {oper!r}")
+        return terms
+    raise TypeError(f"not a polynomial: {type(node).__name__} node {node!r}")
+
+
+def _varies(node: Any) -> bool:
+    """Whether plusminus node's value depends on x, or is random."""
+    if isinstance(node, pm.BaseArithmeticParser.IdentifierNode):
+        return node.name == 'x'
+    if isinstance(node, pm.RoundToEpsilon):
+        return _varies(node._result[0])
+    if isinstance(node, pm.ArithmeticFunction) and node.tokens[0] in IMPURE_FUNCTIONS:
+        return True
+    tokens = getattr(node, 'tokens', None)  # List-like of operands and operators, or a value.
+    return isinstance(tokens, Iterable) and not isinstance(tokens, str) \
+        and any(_varies(token) for token in tokens)
+
+
+def _constant(node: Any) -> Union[int, float]:
+    """Returns value of node not depending on x, if it is a real number."""
+    try:
+        value = node.evaluate()
+    except Exception as error:
+        raise TypeError(f"cannot evaluate constant {node!r}: {error}") from error
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"not a real constant {value!r}")
+    return value
+
+
+def _add(terms: Terms, other: Terms, sign: int) -> Terms:
+    result = dict(terms)
+    for power, coefficient in other.items():
+        result[power] = result.get(power, 0) + sign * coefficient
+    return result
+
+
+def _multiply(terms: Terms, other: Terms) -> Terms:
+    """Multiply terms by a constant, or two single terms, eg 3*x * x**2."""
+    if set(other) == {0}:
+        return {power: coefficient * other[0] for power, coefficient in terms.items()}
+    if set(terms) == {0}:
+        return {power: terms[0] * coefficient for power, coefficient in other.items()}
+    if len(terms) == 1 and len(other) == 1:
+        (power, coefficient), = terms.items()
+        (other_power, other_coefficient), = other.items()
+        return {power + other_power: coefficient * other_coefficient}
+    raise TypeError("product of sums is not an expanded polynomial")
+
+
+def _divide(terms: Terms, other: Terms) -> Terms:
+    if set(other) != {0} or other[0] == 0:
+        raise TypeError("divisor is not a nonzero constant")
+    return {power: coefficient / other[0] for power, coefficient in terms.items()}
+
+
+def _power(terms: Terms, exponent: Any) -> Terms:
+    """Raise a single term to a non-negative integer power."""
+    if isinstance(exponent, bool) or not isinstance(exponent, (int, float)) \
+            or exponent < 0 or exponent != int(exponent):
+        raise TypeError(f"not a polynomial exponent {exponent!r}")
+    exponent = int(exponent)
+    if exponent == 0:
+        return {0: 1}
+    if len(terms) != 1:
+        raise TypeError("power of sum is not an expanded polynomial")
+    (power, coefficient), = terms.items()
+    if power * exponent > MAX_DEGREE:
+        raise TypeError(f"degree greater than {MAX_DEGREE}")
+    return {power * exponent: coefficient ** exponent}
@@ -1,4 +1,5 @@
 """Pre parse string cleansing"""
+from ..util.metrics import metrics
 
 
 def pre_parse_translate(initial_string: str) -> str:
@@ -11,6 +12,7 @@ def pre_parse_translate(initial_string: str) -> str:
     :param initial_string: str
     :return: str
     """
-    clean_string = initial_string.replace("^", "**")
+    with metrics.stage('parse.pre_parse'):
+        clean_string = initial_string.replace("^", "**")
 
     return clean_string
@@ -0,0 +1,187 @@
+"""Cache of computed point sets"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from .curve import Curve
+from ..util.metrics import metrics
+
+
+class ResultCacheInfo(NamedTuple):
+    """Result cache statistics."""
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    max_bytes: int
+    currbytes: int
+
+
+class ResultCache:
+    """
+    Cache of plotted Curves, keyed by expression and sampled domain.
+
+    Curves are held in memory, least recently used curves being evicted
+    once their total size exceeds max_bytes.
+
+    If directory is given, curves are also written there as .npy files,
+    and curves missing from memory are loaded from them memory-mapped,
+    so warm results survive restarts. Files are written to a temporary
+    file and atomically renamed into place, so processes may share a
+    directory.
+
+    Cached curves are shared between callers, so their arrays are read
+    only.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20,
+                 directory: Union[str, Path]|None = None,
+                 ):
+        """
+        :param max_bytes: int memory budget for cached curves
+        :param directory: Union[str, Path] directory for on-disk cache
+        :return: None
+        """
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._curves: OrderedDict[str, Curve] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(expression: str,
+            start: Union[int, float],
+            end: Union[int, float],
+            step: Union[int, float],
+            ) -> str:
+        """
+        Returns cache key for expression evaluated over
+        float_range(start, end, step).
+
+        Sampling arguments are normalised to floats, so eg smooth=True
+        and n=500 plots of the same domain share a key.
+
+        :param expression: str translated expression
+        :param start: Union[int, float]
+        :param end: Union[int, float]
+        :param step: Union[int, float]
+        :return: str hex digest
+        """
+        normalised = repr((expression.strip(), float(start), float(end), float(step)))
+        return hashlib.sha256(normalised.encode()).hexdigest()
+
+    def get(self, key: str) -> Curve|None:
+        """
+        Returns cached curve for key, or None if not cached.
+
+        :param key: str
+        :return: Curve|None
+        """
+        with self._lock:
+            curve = self._curves.get(key)
+            if curve is not None:
+                self._curves.move_to_end(key)
+                self.hits += 1
+                metrics.count('result_cache.hits')
+                return curve
+
+        curve = self._load(key)
+        with self._lock:
+            if curve is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._store(key, curve)
+        metrics.count('result_cache.misses' if curve is None else 'result_cache.disk_hits')
+        return curve
+
+    def put(self, key: str, curve: Curve) -> Curve:
+        """
+        Cache curve, returning the cached, read only, copy.
+
+        :param key: str
+        :param curve: Curve
+        :return: Curve
+        """
+        xy = np.array([curve.xs, curve.ys], dtype=float)
+        xy.flags.writeable = False
+        cached = Curve(xy[0], xy[1])
+        self._save(key, xy)
+        with self._lock:
+            self._store(key, cached)
+        return cached
+
+    def info(self) -> ResultCacheInfo:
+        """
+        Returns cache statistics.
+
+        :return: ResultCacheInfo
+        """
+        with self._lock:
+            return ResultCacheInfo(self.hits, self.disk_hits, self.misses, self.evictions,
+                                   self.max_bytes, self._bytes)
+
+    def clear(self) -> None:
+        """
+        Empty the in-memory cache and reset statistics.
+
+        Files in directory are left for other processes.
+
+        :return: None
+        """
+        with self._lock:
+            self._curves.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def _store(self, key: str, curve: Curve) -> None:
+        """Add curve to in-memory LRU, evicting to stay within max_bytes."""
+        previous = self._curves.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._curves[key] = curve
+        self._bytes += curve.nbytes
+        while self._bytes > self.max_bytes and len(self._curves) > 1:
+            _, evicted = self._curves.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _path(self, key: str) -> Path|None:
+        return self.directory / f'{key}.npy' if self.directory is not None else None
+
+    def _load(self, key: str) -> Curve|None:
+        """Load curve from on-disk cache, memory-mapped."""
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            xy = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):  # Missing, or unreadable.
+            return None
+        return Curve(xy[0], xy[1])
+
+    def _save(self, key: str, xy: np.ndarray) -> None:
+        """Atomically write curve to the on-disk cache."""
+        path = self._path(key)
+        if path is None:
+            return
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                np.save(temp_file, xy)
+            os.replace(temp_path, path)
+        except OSError:  # eg file memory-mapped by another process, on Windows.
+            Path(temp_path).unlink(missing_ok=True)
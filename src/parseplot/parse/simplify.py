@@ -0,0 +1,162 @@
+"""Simplification of fast path expressions before evaluation"""
+import ast
+from typing import AbstractSet, Any
+
+from plusminus import plusminus as pm
+
+_NUMERIC_TYPES = (int, float, complex)
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """
+    Replaces subexpressions not depending on x with their value, and
+    removes operations which leave their operand unchanged.
+    """
+
+    def __init__(self, namespace: dict[str, Any], impure: AbstractSet[str]) -> None:
+        self.namespace = namespace
+        self.impure = impure
+
+    def fold(self, node: ast.expr) -> ast.expr:
+        """Returns node's value as a constant, or node if it can't be evaluated once."""
+        try:
+            value = eval(compile(ast.fix_missing_locations(ast.Expression(node)), '<simplify>', 'eval'),
+                         self.namespace)
+        except Exception:
+            return node  # Raise when evaluated, as the user's expression would.
+        if not isinstance(value, _NUMERIC_TYPES):
+            return node
+        return ast.Constant(value)
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
+            return self.fold(node)
+        if isinstance(node.op, (ast.Add, ast.Sub)) and _is_int(node.right, 0) and _never_bool(node.left):
+            return node.left
+        if isinstance(node.op, ast.Add) and _is_int(node.left, 0) and _never_bool(node.right):
+            return node.right
+        if isinstance(node.op, ast.Mult) and _is_int(node.right, 1) and _never_bool(node.left):
+            return node.left
+        if isinstance(node.op, ast.Mult) and _is_int(node.left, 1) and _never_bool(node.right):
+            return node.right
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant):
+            return self.fold(node)
+        if isinstance(node.op, ast.USub) and isinstance(node.operand, ast.UnaryOp) \
+                and isinstance(node.operand.op, ast.USub):
+            return node.operand.operand
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.expr:
+        self.generic_visit(node)
+        if not isinstance(node.func, ast.Name) or node.func.id in self.impure:
+            return node
+        if all(isinstance(arg, ast.Constant) for arg in node.args):
+            return self.fold(node)
+        fn = self.namespace.get(node.func.id)
+        if fn is pm.safe_pow and len(node.args) == 2 \
+                and isinstance(node.args[1], ast.Constant) and node.args[1].value == 1:
+            return node.args[0]  # safe_pow(a, 1) is a, whatever a is.
+        return node
+
+
+def _is_int(node: ast.expr, value: int) -> bool:
+    """Whether node is the int constant value, which keeps the other operand's type."""
+    return isinstance(node, ast.Constant) and type(node.value) is int and node.value == value
+
+
+def _never_bool(node: ast.expr) -> bool:
+    """
+    Whether node's value is never a bool, so adding 0 or multiplying by 1
+    leaves its value and type unchanged.
+    """
+    if isinstance(node, ast.Constant):
+        return type(node.value) is not bool
+    return isinstance(node, (ast.Name, ast.BinOp, ast.UnaryOp))
+
+
+class _CommonSubexpressions(ast.NodeTransformer):
+    """
+    Binds the first evaluation of each repeated subexpression to a name,
+    and replaces the repeats with the name.
+    """
+
+    def __init__(self, repeated: AbstractSet[str]) -> None:
+        self.repeated = repeated
+        self.names: dict[str, str] = {}
+
+    def visit(self, node: ast.AST) -> Any:
+        if not isinstance(node, ast.expr):
+            return super().visit(node)
+        key = ast.dump(node)
+        if key in self.names:
+            return ast.Name(self.names[key], ast.Load())
+        if key not in self.repeated:
+            return super().visit(node)
+        name = self.names[key] = f'_t{len(self.names)}'
+        return ast.NamedExpr(ast.Name(name, ast.Store()), super().visit(node))
+
+
+def _repeated_subexpressions(node: ast.expr, impure: AbstractSet[str]) -> set[str]:
+    """
+    Returns dumps of subexpressions evaluated more than once, other than
+    names, constants, and calls of impure functions.
+
+    Repeats of a repeated subexpression aren't searched, as they will be
+    replaced whole.
+    """
+    seen: set[str] = set()
+    repeated: set[str] = set()
+
+    def search(node: ast.expr) -> None:
+        key = ast.dump(node)
+        if key in seen:
+            repeated.add(key)
+            return
+        if not isinstance(node, (ast.Name, ast.Constant)) and not _calls(node, impure):
+            seen.add(key)
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                search(child)
+
+    search(node)
+    return repeated
+
+
+def _calls(node: ast.expr, names: AbstractSet[str]) -> bool:
+    """Whether node calls any of the functions names."""
+    return any(isinstance(child, ast.Call) and isinstance(child.func, ast.Name) and child.func.id in names
+               for child in ast.walk(node))
+
+
+def simplify(node: ast.expr, namespace: dict[str, Any], impure: AbstractSet[str] = frozenset()) -> ast.expr:
+    """
+    Simplify a fast path expression of x, leaving its result, and any
+    exception it raises, unchanged for every x:
+
+    - folding subexpressions not depending on x, so they are evaluated
+      once rather than for every x, unless they raise an exception,
+    - removing identity operations - adding 0, multiplying by 1, raising
+      to the power 1 and double negation,
+    - evaluating each repeated subexpression once, binding it to a name.
+
+    Multiplying by 0 isn't removed, as it is nan for infinite operands,
+    and must raise if its operand does. Nor is floating point arithmetic
+    reordered, to fold constants apart from each other, as that changes
+    rounding. Calls of impure functions, named by impure, eg rnd(), are
+    neither folded nor shared.
+
+    :param node: ast.expr fast path expression
+    :param namespace: dict[str, Any] namespace the expression is
+                                     evaluated in
+    :param impure: AbstractSet[str] names of functions returning
+                                    different results for the same
+                                    arguments
+    :return: ast.expr
+    """
+    node = _ConstantFolder(namespace, impure).visit(node)
+    return _CommonSubexpressions(_repeated_subexpressions(node, impure)).visit(node)
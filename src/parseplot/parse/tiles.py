@@ -0,0 +1,196 @@
+"""Multi-resolution tiles of plotted points"""
+import math
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from .curve import Curve
+from .expression_cache import compile_expression
+from .parser import Parser
+from .pre_parse import pre_parse_translate
+from .vectorize import VectorizedExpression
+
+
+class Tile(NamedTuple):
+    """
+    tile_size consecutive bins of one level of a TilePyramid, the
+    position'th tile of its level.
+
+    Each bin spans 2 ** level points of the full resolution curve,
+    starting at x, and holds their minimum and maximum y. At level 0 each
+    bin is a single point, so y_min and y_max are equal.
+    """
+    level: int
+    position: int
+    xs: np.ndarray
+    y_min: np.ndarray
+    y_max: np.ndarray
+
+    def curve(self) -> Curve:
+        """
+        Returns the tile's envelope as a line, rising or falling through
+        each bin's minimum and maximum.
+
+        :return: Curve
+        """
+        return tiles_curve([self])
+
+
+class TilePyramid:
+    """
+    An expression evaluated over a domain at full resolution, then
+    repeatedly halved in resolution, each level keeping the minimum and
+    maximum y of pairs of bins of the level below.
+
+    Level 0 holds tile_size * 2 ** (levels - 1) points, and the top level
+    a single tile, so any window of the domain may be drawn at any zoom
+    from a handful of tiles, rather than re-evaluating or sending every
+    point. Peaks and troughs survive at every level.
+
+    Tiles are views into the levels' arrays, so indexing and querying
+    copies nothing.
+
+        >>> pyramid = TilePyramid('sin(x) * x', -1000, 1000)
+        >>> tiles = pyramid.query(-10, 10, resolution=1200)
+    """
+
+    def __init__(self, expression: Union[str, Parser],
+                 x_min: Union[int, float],
+                 x_max: Union[int, float],
+                 *,
+                 levels: int = 11,
+                 tile_size: int = 256,
+                 ) -> None:
+        """
+        :param expression: Union[str, Parser] expression to evaluate
+        :param x_min: Union[int, float] start of domain
+        :param x_max: Union[int, float] end of domain
+        :param levels: int number of resolutions
+        :param tile_size: int number of bins per tile
+        :return: None
+        """
+        if levels < 1:
+            raise ValueError(f"levels must be a positive integer, not {levels!r}")
+        if tile_size < 1:
+            raise ValueError(f"tile_size must be a positive integer, not {tile_size!r}")
+        if tile_size * 2 ** (levels - 1) < 2:
+            raise ValueError("level 0 must hold at least 2 points, "
+                             "so levels or tile_size must be greater than 1")
+        if not x_max > x_min:
+            raise ValueError(f"x_max must be greater than x_min, not {x_max!r} <= {x_min!r}")
+        self.expression: str = expression.expression if isinstance(expression, Parser) else expression
+        self.x_min = x_min
+        self.x_max = x_max
+        self.tile_size = tile_size
+
+        xs = np.linspace(x_min, x_max, tile_size * 2 ** (levels - 1))
+        ys = VectorizedExpression(compile_expression(pre_parse_translate(self.expression))).evaluate(xs)
+        self._levels: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = [(xs, ys, ys)]
+        for level in range(1, levels):
+            _, y_min, y_max = self._levels[-1]
+            self._levels.append((xs[::2 ** level],
+                                 np.fmin(y_min[0::2], y_min[1::2]),  # Ignoring nan.
+                                 np.fmax(y_max[0::2], y_max[1::2]),
+                                 ))
+
+    @property
+    def levels(self) -> int:
+        """Returns number of levels, of halving resolution."""
+        return len(self._levels)
+
+    def tile_count(self, level: int) -> int:
+        """
+        Returns number of tiles at level.
+
+        :param level: int
+        :return: int
+        """
+        return len(self._levels[level][0]) // self.tile_size
+
+    def tile_width(self, level: int) -> float:
+        """
+        Returns width of the domain covered by each tile at level.
+
+        :param level: int
+        :return: float
+        """
+        points = len(self._levels[0][0])
+        return (self.x_max - self.x_min) / (points - 1) * self.tile_size * 2 ** level
+
+    def tile(self, level: int, index: int) -> Tile:
+        """
+        Returns tile index of level.
+
+        Raises IndexError if there is no such tile.
+
+        :param level: int
+        :param index: int
+        :return: Tile
+        """
+        if not 0 <= level < self.levels or not 0 <= index < self.tile_count(level):
+            raise IndexError(f"No tile {index} at level {level}")
+        bins = slice(index * self.tile_size, (index + 1) * self.tile_size)
+        xs, y_min, y_max = self._levels[level]
+        return Tile(level, index, xs[bins], y_min[bins], y_max[bins])
+
+    def level_for(self, x_start: Union[int, float],
+                  x_end: Union[int, float],
+                  resolution: int,
+                  ) -> int:
+        """
+        Returns coarsest level with at least resolution bins between
+        x_start and x_end, or level 0 if none has.
+
+        :param x_start: Union[int, float]
+        :param x_end: Union[int, float]
+        :param resolution: int
+        :return: int
+        """
+        base_bins = (x_end - x_start) / (self.x_max - self.x_min) * len(self._levels[0][0])
+        if resolution < 1 or base_bins <= resolution:
+            return 0
+        return min(int(math.log2(base_bins / resolution)), self.levels - 1)
+
+    def query(self, x_start: Union[int, float],
+              x_end: Union[int, float],
+              resolution: int,
+              ) -> list[Tile]:
+        """
+        Returns tiles covering x_start to x_end, at the coarsest level
+        with at least resolution bins across the window, eg its width in
+        pixels.
+
+        :param x_start: Union[int, float]
+        :param x_end: Union[int, float]
+        :param resolution: int
+        :return: list[Tile] in x order
+        """
+        level = self.level_for(x_start, x_end, resolution)
+        tile_width = self.tile_width(level)
+        first = max(math.floor((x_start - self.x_min) / tile_width), 0)
+        last = min(math.ceil((x_end - self.x_min) / tile_width), self.tile_count(level))
+        return [self.tile(level, index) for index in range(first, last)]
+
+
+def tiles_curve(tiles: list[Tile]) -> Curve:
+    """
+    Returns envelope of consecutive tiles, as a single line.
+
+    Bins of tiles above level 0 each become two points, at the bin's x,
+    so the line passes through every bin's minimum and maximum.
+
+    :param tiles: list[Tile]
+    :return: Curve
+    """
+    if not tiles:
+        return Curve(np.empty(0), np.empty(0))
+    xs = np.concatenate([tile.xs for tile in tiles])
+    y_min = np.concatenate([tile.y_min for tile in tiles])
+    if tiles[0].level == 0:
+        return Curve(xs, y_min)
+    y_max = np.concatenate([tile.y_max for tile in tiles])
+    # Alternate min/max order, so the line zigzags through the envelope
+    # rather than jumping back down at every bin.
+    first = np.where(np.arange(len(xs)) % 2 == 0, y_min, y_max)
+    second = np.where(np.arange(len(xs)) % 2 == 0, y_max, y_min)
+    return Curve(np.repeat(xs, 2), np.column_stack([first, second]).ravel())
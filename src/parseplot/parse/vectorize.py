@@ -0,0 +1,303 @@
+"""NumPy vectorized evaluation of compiled expressions"""
+import math
+from typing import Any, Callable, Union
+
+import numpy as np
+from plusminus import plusminus as pm
+
+from .compiled import CompiledExpression
+
+Lowered = Callable[[np.ndarray], Any]
+
+_EPSILON = 1e-15
+
+_UNARY_OPS: dict[str, Callable] = {
+    '+': np.positive,
+    '-': np.negative,
+    '−': np.negative,
+    'not': np.logical_not,
+    '°': np.radians,
+    '⁻¹': np.reciprocal,
+    '⁰': np.ones_like,
+    '¹': np.positive,
+    '²': np.square,
+    '³': lambda x: np.power(x, 3.0),
+    **{f'{root}√': (lambda n: lambda x: np.power(x, 1 / n))(n)
+       for n, root in enumerate('²³⁴⁵⁶⁷⁸⁹', start=2)},
+}
+
+_BINARY_OPS: dict[str, Callable] = {
+    '+': np.add,
+    '-': np.subtract,
+    '−': np.subtract,
+    '*': np.multiply,
+    '×': np.multiply,
+    '/': np.true_divide,
+    '÷': np.true_divide,
+    '//': np.floor_divide,
+    'mod': np.mod,
+    **{f'{root}√': (lambda n: lambda x, y: x * np.power(y, 1 / n))(n)
+       for n, root in enumerate('²³⁴⁵⁶⁷⁸⁹', start=2)},
+}
+
+_FUNCTIONS: dict[str, Callable] = {
+    'abs': np.abs,
+    'round': lambda x, digits=0: np.round(x, int(digits)),
+    'trunc': np.trunc,
+    'ceil': np.ceil,
+    'floor': np.floor,
+    'min': lambda *args: np.minimum.reduce(np.broadcast_arrays(*args)),
+    'max': lambda *args: np.maximum.reduce(np.broadcast_arrays(*args)),
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'asin': np.arcsin,
+    'acos': np.arccos,
+    'atan': np.arctan,
+    'sin⁻¹': np.arcsin,
+    'cos⁻¹': np.arccos,
+    'tan⁻¹': np.arctan,
+    'sinh': np.sinh,
+    'cosh': np.cosh,
+    'tanh': np.tanh,
+    **{f'{name}{power}': (lambda fn, n: lambda x: np.power(fn(x), n))(fn, n)
+       for name, fn in (('sin', np.sin), ('cos', np.cos), ('tan', np.tan),
+                        ('sinh', np.sinh), ('cosh', np.cosh), ('tanh', np.tanh))
+       for power, n in (('²', 2.0), ('³', 3.0))},
+    'rad': np.radians,
+    'deg': np.degrees,
+    'ln': np.log,
+    'log': lambda x, base=math.e: np.log(x) / np.log(base),
+    'log2': np.log2,
+    'log10': np.log10,
+    'hypot': lambda *args: np.sqrt(sum(np.square(arg) for arg in args)),
+    'sgn': lambda x: np.where(_isclose(x, 0.0), 0.0, np.sign(x)),
+}
+
+
+def _isclose(a: Any, b: Any) -> Any:
+    """Elementwise equivalent of math.isclose(a, b, abs_tol=1e-15)."""
+    return np.abs(a - b) <= np.maximum(1e-09 * np.maximum(np.abs(a), np.abs(b)), _EPSILON)
+
+
+_COMPARISONS: dict[str, Callable] = {
+    '<': lambda a, b: (a < b) & ~_isclose(a, b),
+    '>': lambda a, b: (a > b) & ~_isclose(a, b),
+    '<=': lambda a, b: (a <= b) | _isclose(a, b),
+    '≤': lambda a, b: (a <= b) | _isclose(a, b),
+    '>=': lambda a, b: (a >= b) | _isclose(a, b),
+    '≥': lambda a, b: (a >= b) | _isclose(a, b),
+    '==': _isclose,
+    '!=': lambda a, b: ~_isclose(a, b),
+    '≠': lambda a, b: ~_isclose(a, b),
+}
+
+
+def _elementwise(fn: Callable, nin: int) -> Callable:
+    """
+    Wrap scalar fn for elementwise evaluation of arrays.
+
+    Used for operators and functions without a NumPy equivalent.
+    Elements for which fn raises are evaluated as nan.
+    """
+    def safe_fn(*args):
+        try:
+            return fn(*args)
+        except (ArithmeticError, TypeError, ValueError):  # eg factorial of -1 or 0.5.
+            return math.nan
+
+    ufunc = np.frompyfunc(safe_fn, nin, 1)
+    return lambda *args: ufunc(*args).astype(float)
+
+
+class VectorizedExpression:
+    """
+    Compiled expression lowered to NumPy ufunc calls.
+
+    Evaluates every x in an array with a single pass of array
+    operations, rather than one evaluation tree walk per point.
+
+    Unlike scalar evaluation, points at which the expression is
+    undefined (eg division by zero) evaluate to nan or inf rather than
+    raising.
+
+    Polynomials detected by the compiled expression are evaluated by
+    Horner's scheme over the whole array.
+    """
+
+    def __init__(self, compiled: CompiledExpression):
+        """
+        Lower compiled's evaluation tree to NumPy operations.
+
+        Raises TypeError if the expression contains syntax that cannot be
+        evaluated over arrays (eg strings or sets).
+
+        :param compiled: CompiledExpression
+        :return: None
+        """
+        self.expression = compiled.expression
+        self._variables = compiled._parser.vars()
+        if compiled.polynomial is not None:
+            self._evaluate = self._lower_round_to_epsilon(compiled.polynomial.evaluate)
+        else:
+            self._evaluate = self._lower(compiled._tree)
+
+    def evaluate(self, xs: np.ndarray) -> np.ndarray:
+        """
+        Evaluate expression for each value of x in array xs.
+
+        :param xs: np.ndarray
+        :return: np.ndarray of float64
+        """
+        xs = np.asarray(xs, dtype=float)
+        with np.errstate(all='ignore'):
+            ys = self._evaluate(xs)
+        return np.broadcast_to(np.asarray(ys, dtype=float), xs.shape).copy()
+
+    def _lower(self, node: Any) -> Lowered:
+        """
+        Recursively lower a plusminus node to a function of array xs.
+
+        :param node: plusminus evaluation tree node
+        :return: Callable[[np.ndarray], Any]
+        """
+        if isinstance(node, pm.RoundToEpsilon):
+            return self._lower_round_to_epsilon(self._lower(node._result[0]))
+        if isinstance(node, pm.LiteralNode):
+            return self._lower_literal(node.tokens)
+        if isinstance(node, pm.BaseArithmeticParser.IdentifierNode):
+            return self._lower_identifier(node.name)
+        if isinstance(node, pm.ExponentBinaryOp):
+            operands = [self._lower(operand) for operand in node.tokens[::2]]
+            return self._lower_exponent(operands)
+        if isinstance(node, pm.ArithmeticFunction):
+            fn_name, *fn_args = node.tokens
+            return self._lower_function(fn_name, node.fn_map, [self._lower(arg) for arg in fn_args])
+        if isinstance(node, pm.BinaryComparison):
+            return self._lower_comparison(node.tokens)
+        if isinstance(node, pm.BinaryLogicalOperator):
+            operands = [self._lower(operand) for operand in node.tokens[::2]]
+            reduction = np.logical_and if node.tokens[1] in ('and', '∧') else np.logical_or
+            return lambda xs: reduction.reduce(np.broadcast_arrays(*(operand(xs) for operand in operands)))
+        if isinstance(node, pm.TernaryComp):
+            condition, _, if_true, _, if_false = [self._lower(token) if i % 2 == 0 else token
+                                                  for i, token in enumerate(node.tokens[:5])]
+            if len(node.tokens) > 5:
+                raise TypeError("cannot vectorize chained ternary expression")
+            return lambda xs: np.where(condition(xs), if_true(xs), if_false(xs))
+        if isinstance(node, (pm.ArithmeticUnaryOp, pm.UnaryNot)):
+            *opers, operand = node.tokens
+            return self._lower_unary(reversed(opers), node, self._lower(operand))
+        if isinstance(node, pm.ArithmeticUnaryPostOp):
+            operand, *opers = node.tokens
+            return self._lower_unary(opers, node, self._lower(operand))
+        if isinstance(node, pm.ArithmeticBinaryOp):
+            return self._lower_binary(node)
+        raise TypeError(f"cannot vectorize {type(node).__name__} node {node!r}")
+
+    @staticmethod
+    def _lower_round_to_epsilon(operand: Lowered) -> Lowered:
+        """Snap results within epsilon of an integer, as fast_path.round_to_epsilon does."""
+        def round_to_epsilon(xs):
+            ys = np.asarray(operand(xs), dtype=float)
+            # Floats of magnitude 8 or more are unchanged by rounding to 15
+            # places, which overflows for the largest.
+            ys = np.where(np.abs(ys) < 8, np.round(ys, 15), ys)
+            integers = np.trunc(ys)
+            return np.where((np.abs(ys) < 1e15) & _isclose(ys, integers), integers, ys)
+        return round_to_epsilon
+
+    @staticmethod
+    def _lower_literal(value: Any) -> Lowered:
+        if isinstance(value, list) or not isinstance(value, (int, float)):
+            raise TypeError(f"cannot vectorize non-numeric literal {value!r}")
+        value = float(value)
+        return lambda xs: value
+
+    def _lower_identifier(self, name: str) -> Lowered:
+        if name == 'x':
+            return lambda xs: xs
+        value = self._variables.get(name)
+        if not isinstance(value, (int, float)):
+            raise TypeError(f"cannot vectorize variable {name!r}")
+        value = float(value)
+        return lambda xs: value
+
+    @staticmethod
+    def _lower_exponent(operands: list[Lowered]) -> Lowered:
+        def exponent(xs):
+            values = [operand(xs) for operand in operands]
+            result = values[-1]
+            for value in values[-2::-1]:  # Right associative.
+                result = np.power(value, result)
+            return result
+        return exponent
+
+    @staticmethod
+    def _lower_function(fn_name: str, fn_map: dict, args: list[Lowered]) -> Lowered:
+        if fn_name in _FUNCTIONS:
+            fn = _FUNCTIONS[fn_name]
+        elif fn_name in fn_map and args:
+            fn = _elementwise(fn_map[fn_name].method, len(args))
+        else:
+            raise TypeError(f"cannot vectorize function {fn_name!r}")
+        return lambda xs: fn(*(arg(xs) for arg in args))
+
+    def _lower_comparison(self, tokens: list) -> Lowered:
+        operands = [self._lower(operand) for operand in tokens[::2]]
+        opers = [_COMPARISONS[oper] for oper in tokens[1::2]]
+
+        def comparison(xs):
+            values = [operand(xs) for operand in operands]
+            result = True
+            for oper, left, right in zip(opers, values, values[1:]):
+                result = result & oper(left, right)
+            return result
+        return comparison
+
+    @staticmethod
+    def _lower_unary(opers, node: Any, operand: Lowered) -> Lowered:
+        fns = [_UNARY_OPS[oper] if oper in _UNARY_OPS
+               else _elementwise(node.opns_map[oper], 1)
+               for oper in opers]
+
+        def unary(xs):
+            value = operand(xs)
+            for fn in fns:
+                value = fn(value)
+            return value
+        return unary
+
+    def _lower_binary(self, node: Any) -> Lowered:
+        operands = [self._lower(operand) for operand in node.tokens[::2]]
+        fns = [_BINARY_OPS[oper] if oper in _BINARY_OPS
+               else _elementwise(node.opns_map[oper], 2)
+               for oper in node.tokens[1::2]]
+
+        def binary(xs):
+            value = operands[0](xs)
+            for fn, operand in zip(fns, operands[1:]):  # Left associative.
+                value = fn(value, operand(xs))
+            return value
+        return binary
+
+
+def float_range_array(start: Union[int, float],
+                      end: Union[int, float],
+                      step: Union[int, float] = 1.0
+                      ) -> np.ndarray:
+    """
+    Array equivalent of Parser.float_range.
+
+    Values are computed as start + i * step, as in Parser.float_range,
+    so both produce identical x values.
+
+    :param start: Union[int, float]
+    :param end: Union[int, float]
+    :param step: Union[int, float]
+    :return: np.ndarray of float64
+    """
+    from .parser import Parser
+
+    return float(start) + np.arange(Parser.float_range_length(start, end, step), dtype=float) * step
+
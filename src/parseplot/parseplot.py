@@ -0,0 +1,251 @@
+"""
+Command line interface, plotting expressions read from a file or stdin.
+
+    parseplot expressions.txt -o plots --format svg --format pplt -n 1000 --jobs 4
+
+Expressions are read one per line, blank lines and lines starting with #
+being skipped, and each is saved to the output directory in each format,
+named by its line number and expression, eg 000003_sin_x.svg. Saved paths
+are written to stdout as each expression is plotted, and expressions
+failing to plot reported on stderr.
+
+Input is read and plotted as it arrives, with at most a few expressions
+in flight per job, so arbitrarily long input runs in constant memory.
+"""
+import argparse
+import re
+import sys
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Sequence, Union
+
+from .parse.parser import Parser
+from .parse.point_file import write_point_file
+from .util.filepath_helpers import ensure_extension
+
+# Output formats: plot formats saved by BokehPlotter, and point files.
+FORMATS = ('html', 'svg', 'png', 'pplt')
+
+# Expressions submitted to worker processes ahead of those being output,
+# per job.
+PENDING_PER_JOB = 2
+
+# Longest part of an output file name taken from its expression.
+MAX_NAME_LENGTH = 40
+
+
+class Job(NamedTuple):
+    """An expression to plot, and the line it was read from."""
+    line: int
+    expression: str
+
+
+class PlotOptions(NamedTuple):
+    """How to plot and save each expression."""
+    out_dir: Path
+    formats: tuple[str, ...] = ('svg',)
+    x_min: int = -500
+    x_max: int = 500
+    n: int|None = None
+    smooth: bool = False
+    very_smooth: bool = False
+    renderer: str = 'native'
+
+
+class JobResult(NamedTuple):
+    """Files saved for a job, or the error plotting it."""
+    job: Job
+    paths: list[Path]
+    error: str|None = None
+
+
+def read_jobs(lines: Iterable[str]) -> Iterator[Job]:
+    """
+    Lazily yields a job for each expression in lines, skipping blank lines
+    and comments starting with #.
+
+    :param lines: Iterable[str] eg a file object
+    :return: Iterator[Job]
+    """
+    for line_number, line in enumerate(lines, start=1):
+        expression = line.strip()
+        if expression and not expression.startswith('#'):
+            yield Job(line_number, expression)
+
+
+def output_name(job: Job) -> str:
+    """
+    Returns file name, without extension, of job's output, eg
+    000003_sin_x for sin(x) on line 3.
+
+    :param job: Job
+    :return: str
+    """
+    slug = re.sub(r'[^\w.+-]+', '_', job.expression).strip('_.')[:MAX_NAME_LENGTH].rstrip('_.')
+    return f'{job.line:06}_{slug}' if slug else f'{job.line:06}'
+
+
+def plot_job(job: Job, options: PlotOptions) -> JobResult:
+    """
+    Plot job's expression, saving it in each of options' formats.
+
+    The expression is evaluated once, for all formats.
+
+    Errors are returned in the result, as their messages, so they may be
+    returned from worker processes whatever their type.
+
+    :param job: Job
+    :param options: PlotOptions
+    :return: JobResult
+    """
+    filepath = options.out_dir / output_name(job)
+    domain = options.x_min, options.x_max, options.n, options.smooth, options.very_smooth
+    paths: list[Path] = []
+    try:
+        parser = Parser(job.expression)
+        step = Parser._step(*domain)
+        curve = parser._plot_curve(options.x_min, options.x_max + step, step)
+        if 'pplt' in options.formats:
+            paths.append(write_point_file(ensure_extension(filepath, '.pplt'), curve, expression=parser.expression,
+                                          start=options.x_min, end=options.x_max + step, step=step))
+        plot_formats = [plot_format for plot_format in options.formats if plot_format != 'pplt']
+        if plot_formats:
+            from .plot.bokeh.bokeh_plotter import BokehPlotter
+            from .plot.export import EXPORT_FORMATS
+
+            plotter = BokehPlotter(title=job.expression, x_axis_label='x', y_axis_label='y',
+                                   renderer=options.renderer)
+            plotter.add_line(curve)
+            for plot_format in plot_formats:
+                paths.append(Path(getattr(plotter, EXPORT_FORMATS[plot_format])(filepath)))
+    except Exception as error:
+        return JobResult(job, paths, f'{type(error).__name__}: {error}')
+    return JobResult(job, paths)
+
+
+def plot_jobs(jobs: Iterable[Job],
+              options: PlotOptions,
+              executor: Executor|None = None,
+              max_pending: int = PENDING_PER_JOB,
+              ) -> Iterator[JobResult]:
+    """
+    Lazily plot jobs, yielding results in the order of jobs.
+
+    Jobs are plotted in executor if given, with at most max_pending
+    submitted ahead of the result yielded, otherwise in this process.
+
+    :param jobs: Iterable[Job]
+    :param options: PlotOptions
+    :param executor: Executor
+    :param max_pending: int
+    :return: Iterator[JobResult]
+    """
+    if executor is None:
+        for job in jobs:
+            yield plot_job(job, options)
+        return
+
+    pending: deque[Future[JobResult]] = deque()
+    for job in jobs:
+        pending.append(executor.submit(plot_job, job, options))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _number(argument: str) -> Union[int, float]:
+    number = float(argument)
+    return int(number) if number.is_integer() else number
+
+
+def _formats(argument: str) -> list[str]:
+    formats = [output_format.strip().lower() for output_format in argument.split(',') if output_format.strip()]
+    unknown = [output_format for output_format in formats if output_format not in FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown format(s) {', '.join(unknown)}, "
+                                         f"expected some of {', '.join(FORMATS)}")
+    return formats
+
+
+def _argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='parseplot',
+                                     description='Plot expressions read one per line from a file or stdin.')
+    parser.add_argument('input', nargs='?', type=argparse.FileType('r', encoding='utf-8'), default=sys.stdin,
+                        help='File of expressions, default stdin.')
+    parser.add_argument('-o', '--out-dir', type=Path, default=Path('.'),
+                        help='Directory to save plots in, default the current directory.')
+    parser.add_argument('-f', '--format', type=_formats, action='extend', dest='formats', metavar='FORMAT',
+                        help=f"Output format(s), of {', '.join(FORMATS)}, repeated or comma separated. "
+                             f"Default svg.")
+    parser.add_argument('--x-min', type=_number, default=-500, help='Start of the domain, default -500.')
+    parser.add_argument('--x-max', type=_number, default=500, help='End of the domain, default 500.')
+    resolution = parser.add_mutually_exclusive_group()
+    resolution.add_argument('-n', '--points', type=int, dest='n', metavar='POINTS',
+                            help='Number of points, default one per unit of the domain.')
+    resolution.add_argument('--smooth', action='store_true', help='Plot 500 points.')
+    resolution.add_argument('--very-smooth', action='store_true', help='Plot 5000 points.')
+    parser.add_argument('--renderer', choices=('native', 'bokeh'), default='native',
+                        help='Renderer of svg and png plots, default native. bokeh requires Firefox.')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of worker processes, default 1, plotting in this process.')
+    return parser
+
+
+def main(argv: Sequence[str]|None = None) -> int:
+    """
+    Run parseplot command line, returning exit status: 1 if any
+    expression failed to plot, else 0.
+
+    :param argv: Sequence[str] arguments, default sys.argv[1:]
+    :return: int
+    """
+    argument_parser = _argument_parser()
+    args = argument_parser.parse_args(argv)
+    if args.jobs < 1:
+        argument_parser.error(f"--jobs must be a positive integer, not {args.jobs}")
+    if args.n is not None and args.n < 2:
+        argument_parser.error(f"--points must be at least 2, not {args.n}")
+
+    options = PlotOptions(out_dir=args.out_dir,
+                          formats=tuple(dict.fromkeys(args.formats or ['svg'])),
+                          x_min=args.x_min,
+                          x_max=args.x_max,
+                          n=args.n,
+                          smooth=args.smooth,
+                          very_smooth=args.very_smooth,
+                          renderer=args.renderer,
+                          )
+    options.out_dir.mkdir(parents=True, exist_ok=True)
+
+    failed = 0
+    # Close the input file if opened by argparse, but not stdin.
+    with nullcontext(args.input) if args.input is sys.stdin else args.input:
+        jobs = read_jobs(args.input)
+        if args.jobs == 1:
+            failed = _report(plot_jobs(jobs, options))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(args.jobs) as executor:
+                failed = _report(plot_jobs(jobs, options, executor, args.jobs * PENDING_PER_JOB))
+    return 1 if failed else 0
+
+
+def _report(results: Iterable[JobResult]) -> int:
+    """Print saved paths and errors of results, returning number failed."""
+    failed = 0
+    for result in results:
+        for path in result.paths:
+            print(path, flush=True)
+        if result.error is not None:
+            failed += 1
+            print(f"parseplot: line {result.job.line}: {result.job.expression}: {result.error}",
+                  file=sys.stderr, flush=True)
+    return failed
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,19 @@
 """Plot module"""
-from .bokeh import BokehPlotter
+from typing import TYPE_CHECKING
+
+from ..util.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .bokeh import BokehPlotter  # pragma: no cover
+    from .export import export_many  # pragma: no cover
+
+# Imported on first use, as they import Bokeh.
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "BokehPlotter": (".bokeh.bokeh_plotter", "BokehPlotter"),
+    "export_many": (".export", "export_many"),
+}, globals())
 
 __all__ = [
     "BokehPlotter",
+    "export_many",
 ]
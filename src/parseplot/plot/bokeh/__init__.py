@@ -1,6 +1,18 @@
 """Parse module"""
-from .bokeh_plotter import BokehPlotter
+from typing import TYPE_CHECKING
+
+from .webdriver_pool import WebdriverPool
+from ...util.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .bokeh_plotter import BokehPlotter  # pragma: no cover
+
+# Imported on first use, as it imports Bokeh.
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "BokehPlotter": (".bokeh_plotter", "BokehPlotter"),
+}, globals())
 
 __all__ = [
     "BokehPlotter",
+    "WebdriverPool",
 ]
@@ -1,13 +1,15 @@
 """Bokeh plotter"""
 from __future__ import annotations
+from concurrent.futures import Executor
 from pathlib import Path
 from typing import (Any,
+                    ContextManager,
                     Optional,
                     Sequence,
-                    TYPE_CHECKING,
                     Union,
                     )
 
+import numpy as np
 import PIL
 from PIL.Image import Image
 from bokeh.io.export import get_screenshot_as_png
@@ -18,10 +20,21 @@ from bokeh.io import (export_png,
                       )
 from bokeh.plotting import figure
 
-from src.parseplot.util.filepath_helpers import ensure_extension
+from ...parse.curve import Curve
+from ...parse.point_file import read_point_file
+from ...parse.tiles import Tile, tiles_curve
+from ..decimate import DECIMATION_METHODS, decimate
+from ..native_renderer import (Chart,
+                               Line,
+                               render_png,
+                               render_svg,
+                               )
+from .webdriver_pool import default_webdriver_pool, WebdriverPool
+from ...util.asynchronous import run_blocking
+from ...util.filepath_helpers import ensure_extension
+from ...util.metrics import metrics
 
-if TYPE_CHECKING:
-    from selenium import webdriver  # pragma: no cover
+RENDERERS = ('bokeh', 'native')
 
 
 class BokehPlotter:
@@ -36,6 +49,10 @@ class BokehPlotter:
                  y_axis_label: str|None = None,
                  x_axis_location: Union[int, float]|None = None,
                  y_axis_location: Union[int, float]|None = None,
+                 decimation: str|None = None,
+                 decimation_points: int|None = None,
+                 webdriver_pool: WebdriverPool|None = None,
+                 renderer: str = 'bokeh',
                  ) -> None:
         """
         Object wrapping bokeh plotting functionality.
@@ -86,9 +103,29 @@ class BokehPlotter:
         :param y_axis_label: str label for y axis
         :param x_axis_location: int location of x-axis (on y-axis)
         :param y_axis_location: int location of y-axis (on x-axis)
+        :param decimation: str 'lttb' or 'minmax' method to downsample
+                               lines added to the plot by
+        :param decimation_points: int number of points to downsample lines
+                                      to, defaulting to twice the plot
+                                      width
+        :param webdriver_pool: WebdriverPool to borrow webdrivers for image
+                               export from, defaulting to the process-wide
+                               pool of headless Firefox drivers
+        :param renderer: str default renderer for image export:
+                             'bokeh' - screenshot of the Bokeh plot, via
+                                       a headless browser
+                             'native' - drawn directly from .points,
+                                        without a browser, much faster
         :return: None
         """
         self._plot: figure = figure()
+        self._line_styles: list[dict[str, Any]] = []
+
+        self.renderer: str = self.__check_renderer(renderer)
+
+        self.decimation: Optional[str] = self.__check_decimation(decimation, decimation_points)
+        self.decimation_points: Optional[int] = decimation_points
+        self.webdriver_pool: Optional[WebdriverPool] = webdriver_pool
 
         self.title: Optional[str] = title
         self.x_axis_label: Optional[str] = x_axis_label
@@ -96,13 +133,36 @@ class BokehPlotter:
         self.x_axis_location: Optional[Union[int, float]] = x_axis_location
         self.y_axis_location: Optional[Union[int, float]] = y_axis_location
 
-        self.points: list[Sequence[tuple[Union[int, float], Union[int, float]]]] = []
+        self.points: list[Union[Sequence[tuple[Union[int, float], Union[int, float]]], Curve]] = []
         if points:
             self.__add_lines(points)
 
+    @classmethod
+    def from_point_files(cls, *filepaths: Union[str, Path], **kwargs: Any) -> BokehPlotter:
+        """
+        Construct plotter with a line from each point file.
+
+        Point files are read memory-mapped, and their points passed to the
+        plot without copying. Lines are labelled with their file's
+        expression, if it has one.
+
+        Keyword arguments are passed to the constructor, eg:
+            >>> b = BokehPlotter.from_point_files('cubic.pplt', 'square.pplt',
+            >>>                                   title='Polynomials')
+
+        :param filepaths: Union[str, Path] point files
+        :param kwargs: Any BokehPlotter keyword arguments
+        :return: BokehPlotter
+        """
+        plotter = cls(**kwargs)
+        for filepath in filepaths:
+            header, curve = read_point_file(filepath)
+            plotter.add_line(curve, legend_label=header.expression or None)
+        return plotter
+
     @property
     def title(self):
-        return self._plot.title.text
+        return self._plot.title.text if self._plot.title else None
 
     @title.setter
     def title(self, new_title):
@@ -141,7 +201,7 @@ class BokehPlotter:
         self._plot.yaxis.fixed_location = new_y_axis_location
 
     def add_line(self,
-                 points: Sequence[tuple[Union[int, float], Union[int, float]]],
+                 points: Union[Sequence[tuple[Union[int, float], Union[int, float]]], Curve],
                  legend_label: str|None = None,
                  line_color: str|None = None,
                  line_width: int|None = None,
@@ -149,23 +209,67 @@ class BokehPlotter:
         """
         Add a line to the class' plot.
 
-        :param points: Sequence[tuple[int, float]]
+        A Curve's x and y buffers are passed to the plot as NumPy views,
+        without copying or unpacking individual points.
+
+        If .decimation is set, the line is downsampled before being added
+        to the plot, which shrinks saved/exported plots, but .points
+        retains the full set of points.
+
+        :param points: Union[Sequence[tuple[int, float]], Curve]
+        :param legend_label: str
+        :param line_color: str
+        :param line_width: str
+        :return: None
+        """
+        with metrics.stage('plot.add_line', len(points)):
+            line_args: dict[str, Any]
+            if isinstance(points, Curve):
+                line_args = {'x': np.asarray(points.xs),
+                             'y': np.asarray(points.ys),
+                             }
+            else:
+                line_args = {'x': [x[0] for x in points],
+                             'y': [y[1] for y in points],
+                             }
+            if self.decimation:
+                line_args['x'], line_args['y'] = decimate(line_args['x'], line_args['y'],
+                                                          self.decimation,
+                                                          self.decimation_points or 2 * (self._plot.width or 600))
+            if legend_label:
+                line_args['legend_label'] = legend_label
+            if line_color:
+                line_args['line_color'] = line_color
+            if line_width:
+                line_args['line_width'] = line_width
+            self._plot.line(**line_args)
+            self.points.append(points)
+            self._line_styles.append({'colour': line_color,
+                                      'width': line_width or 1,
+                                      'legend_label': legend_label,
+                                      })
+
+    def add_tiles(self,
+                  tiles: Sequence[Tile],
+                  legend_label: str|None = None,
+                  line_color: str|None = None,
+                  line_width: int|None = None,
+                  ) -> None:
+        """
+        Add a line drawn from consecutive tiles of a TilePyramid, eg:
+            >>> pyramid = TilePyramid('sin(x) * x', -1000, 1000)
+            >>> b.add_tiles(pyramid.query(-10, 10, resolution=b._plot.width))
+
+        Above level 0, the line traces the minimum and maximum y of each
+        of the tiles' bins.
+
+        :param tiles: Sequence[Tile]
         :param legend_label: str
         :param line_color: str
         :param line_width: str
         :return: None
         """
-        self.points.append(points)
-        line_args: dict[str, Any] = {'x': [x[0] for x in points],
-                                     'y': [y[1] for y in points],
-                                     }
-        if legend_label:
-            line_args['legend_label'] = legend_label
-        if line_color:
-            line_args['line_color'] = line_color
-        if line_width:
-            line_args['line_width'] = line_width
-        self._plot.line(**line_args)
+        self.add_line(tiles_curve(list(tiles)), legend_label, line_color, line_width)
 
     def plot(self,
              passed_points: Sequence[tuple[int, float]]|None = None,
@@ -181,14 +285,25 @@ class BokehPlotter:
 
         return self.show_in_browser()
 
-    def plot_PIL_Image_png(self) -> Image:
+    def plot_PIL_Image_png(self, renderer: str|None = None,
+                           *,
+                           webdriver_pool: WebdriverPool|None = None,
+                           ) -> Image:
         """
         Returns plot as a PIL Image object
 
+        :param renderer: str 'bokeh' or 'native', defaulting to
+                             .renderer
+        :param webdriver_pool: WebdriverPool to borrow a webdriver from if
+                               .webdriver_pool is None
         :return: PIL.Image object
         """
-        return get_screenshot_as_png(self._plot,
-                                     driver=self.__initialise_webdriver())
+        renderer = self.__check_renderer(renderer or self.renderer)
+        with metrics.stage(f'plot.render_png.{renderer}'):
+            if renderer == 'native':
+                return render_png(self.native_chart())
+            with self.__webdriver(webdriver_pool) as driver:
+                return get_screenshot_as_png(self._plot, driver=driver)
 
     def save_html_to_file(self, filepath: Union[str, Path]
                           ) -> Union[str, Path]:
@@ -203,9 +318,14 @@ class BokehPlotter:
         extension = '.html'
 
         filepath = ensure_extension(filepath, extension)
-        return save(self._plot, filename=filepath)
-
-    def save_as_png(self, filepath: Union[str, Path]) -> Union[str, Path]:
+        with metrics.stage('plot.save_html'):
+            return save(self._plot, filename=filepath)
+
+    def save_as_png(self, filepath: Union[str, Path],
+                    renderer: str|None = None,
+                    *,
+                    webdriver_pool: WebdriverPool|None = None,
+                    ) -> Union[str, Path]:
         """
         Save the plot to the given filepath as a png image.
 
@@ -215,16 +335,30 @@ class BokehPlotter:
         returns just the filepath
 
         :param filepath: Path|str
+        :param renderer: str 'bokeh' or 'native', defaulting to
+                             .renderer
+        :param webdriver_pool: WebdriverPool to borrow a webdriver from if
+                               .webdriver_pool is None
         :return: Path|str
         """
         extension = '.png'
 
         filepath = ensure_extension(filepath, extension)
-        export_png(self._plot, filename=filepath, webdriver=self.__initialise_webdriver())
+        renderer = self.__check_renderer(renderer or self.renderer)
+        with metrics.stage(f'plot.export_png.{renderer}'):
+            if renderer == 'native':
+                render_png(self.native_chart()).save(filepath)
+                return filepath
+            with self.__webdriver(webdriver_pool) as driver:
+                export_png(self._plot, filename=filepath, webdriver=driver)
 
         return filepath
 
-    def save_as_svg(self, filepath: Union[str, Path]) -> Union[str, Path]:
+    def save_as_svg(self, filepath: Union[str, Path],
+                    renderer: str|None = None,
+                    *,
+                    webdriver_pool: WebdriverPool|None = None,
+                    ) -> Union[str, Path]:
         """
         Save the plot to the given filepath as a svg image.
 
@@ -234,15 +368,118 @@ class BokehPlotter:
         returns just the filepath
 
         :param filepath: Path|str
+        :param renderer: str 'bokeh' or 'native', defaulting to
+                             .renderer
+        :param webdriver_pool: WebdriverPool to borrow a webdriver from if
+                               .webdriver_pool is None
         :return: Path|str
         """
         extension = '.svg'
 
         filepath = ensure_extension(filepath, extension)
-        export_svg(self._plot, filename=filepath, webdriver=self.__initialise_webdriver())
+        renderer = self.__check_renderer(renderer or self.renderer)
+        with metrics.stage(f'plot.export_svg.{renderer}'):
+            if renderer == 'native':
+                Path(filepath).write_text(render_svg(self.native_chart()), encoding='utf-8')
+                return filepath
+            with self.__webdriver(webdriver_pool) as driver:
+                export_svg(self._plot, filename=filepath, webdriver=driver)
 
         return filepath
 
+    def native_chart(self) -> Chart:
+        """
+        Returns the plot's lines and annotations for the native renderer.
+
+        Lines are taken from .points, undecimated, the native renderer
+        downsampling them to its own resolution.
+
+        :return: Chart
+        """
+        lines = []
+        for points, style in zip(self.points, self._line_styles):
+            if isinstance(points, Curve):
+                xs, ys = points.xs, points.ys
+            else:
+                xs, ys = np.asarray(points, dtype=float).reshape(-1, 2).T
+            lines.append(Line(xs, ys, **style))
+        return Chart(lines,
+                     title=self.title,
+                     x_axis_label=self.x_axis_label,
+                     y_axis_label=self.y_axis_label,
+                     x_axis_location=self.x_axis_location,
+                     y_axis_location=self.y_axis_location,
+                     width=self._plot.width or 600,
+                     height=self._plot.height or 600,
+                     )
+
+    async def aplot_PIL_Image_png(self, renderer: str|None = None,
+                                  *,
+                                  executor: Executor|None = None,
+                                  ) -> Image:
+        """
+        Returns plot as a PIL Image object, without blocking the event
+        loop.
+
+        :param renderer: str 'bokeh' or 'native', defaulting to
+                             .renderer
+        :param executor: Executor, defaulting to util.asynchronous's
+        :return: PIL.Image object
+        """
+        return await run_blocking(self.plot_PIL_Image_png, renderer, executor=executor)
+
+    async def asave_html_to_file(self, filepath: Union[str, Path],
+                                 *,
+                                 executor: Executor|None = None,
+                                 ) -> Union[str, Path]:
+        """
+        Save the html plot to the given filepath, without blocking the
+        event loop.
+
+        :param filepath: str
+        :param executor: Executor, defaulting to util.asynchronous's
+        :return: str|Path
+        """
+        return await run_blocking(self.save_html_to_file, filepath, executor=executor)
+
+    async def asave_as_png(self, filepath: Union[str, Path],
+                           renderer: str|None = None,
+                           *,
+                           executor: Executor|None = None,
+                           ) -> Union[str, Path]:
+        """
+        Save the plot to the given filepath as a png image, without
+        blocking the event loop.
+
+        Browsers started are bounded by the webdriver pool's max_size.
+
+        :param filepath: Path|str
+        :param renderer: str 'bokeh' or 'native', defaulting to
+                             .renderer
+        :param executor: Executor, defaulting to util.asynchronous's
+        :return: Path|str
+        """
+        return await run_blocking(self.save_as_png, filepath, renderer, executor=executor)
+
+    async def asave_as_svg(self, filepath: Union[str, Path],
+                           renderer: str|None = None,
+                           *,
+                           executor: Executor|None = None,
+                           ) -> Union[str, Path]:
+        """
+        Save the plot to the given filepath as a svg image, without
+        blocking the event loop.
+
+        Browsers started are bounded by the webdriver pool's max_size.
+
+        :param filepath: Path|str
+        :param renderer: str 'bokeh' or 'native', defaulting to
+                             .renderer
+        :param executor: Executor, defaulting to util.asynchronous's
+        :return: Path|str
+        """
+        return await run_blocking(self.save_as_svg, filepath, renderer, executor=executor)
+
     def show_in_browser(self) -> None:
         """
         Shows plot in default browser.
@@ -270,21 +507,43 @@ class BokehPlotter:
             self.add_line(line)
 
     @staticmethod
-    def __initialise_webdriver() -> webdriver.Firefox:
+    def __check_decimation(decimation: str|None, decimation_points: int|None) -> str|None:
+        """
+        Returns decimation, raising ValueError if it is not a known
+        decimation method, or decimation_points is not positive.
+
+        :param decimation: str
+        :param decimation_points: int
+        :return: str
+        """
+        if decimation is not None and decimation not in DECIMATION_METHODS:
+            raise ValueError(f"Unknown decimation method {decimation!r}, "
+                             f"expected one of {', '.join(DECIMATION_METHODS)}")
+        if decimation_points is not None and decimation_points < 1:
+            raise ValueError(f"decimation_points must be a positive integer, not {decimation_points!r}")
+        return decimation
+
+    @staticmethod
+    def __check_renderer(renderer: str) -> str:
         """
-        Returns initialised Firefox webdriver.
+        Returns renderer, raising ValueError if it is not a known renderer.
 
-        Very slow.
-        Requires Firefox to be installed.
+        :param renderer: str
+        :return: str
+        """
+        if renderer not in RENDERERS:
+            raise ValueError(f"Unknown renderer {renderer!r}, expected one of {', '.join(RENDERERS)}")
+        return renderer
 
-        :return: webdriver.Firefox
+    def __webdriver(self, webdriver_pool: WebdriverPool|None = None) -> ContextManager[Any]:
         """
-        from selenium import webdriver
-        from selenium.webdriver.firefox.options import Options
-        import geckodriver_autoinstaller
+        Context manager borrowing a webdriver from the plotter's pool, or
+        if it has none webdriver_pool, or the default pool.
+
+        Drivers are reused across exports, rather than starting a new
+        browser, which is very slow, for each.
 
-        geckodriver_autoinstaller.install()  # In case driver not installed.
-        options = Options()
-        options.headless = True# type: ignore[attr-defined]
-        driver = webdriver.Firefox(options=options)
-        return driver
+        :param webdriver_pool: WebdriverPool
+        :return: ContextManager[webdriver]
+        """
+        return (self.webdriver_pool or webdriver_pool or default_webdriver_pool()).driver()
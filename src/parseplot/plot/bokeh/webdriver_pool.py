@@ -0,0 +1,209 @@
+"""Pool of reusable headless webdrivers for exporting plots"""
+from __future__ import annotations
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import (Any,
+                    Callable,
+                    Iterator,
+                    TYPE_CHECKING,
+                    )
+
+from ...util.metrics import metrics
+
+if TYPE_CHECKING:
+    from selenium import webdriver  # pragma: no cover
+
+
+def firefox_webdriver() -> webdriver.Firefox:
+    """
+    Returns initialised headless Firefox webdriver.
+
+    Very slow.
+    Requires Firefox to be installed.
+
+    :return: webdriver.Firefox
+    """
+    from selenium import webdriver
+    from selenium.webdriver.firefox.options import Options
+    import geckodriver_autoinstaller
+
+    geckodriver_autoinstaller.install()  # In case driver not installed.
+    options = Options()
+    options.headless = True# type: ignore[attr-defined]
+    driver = webdriver.Firefox(options=options)
+    return driver
+
+
+def is_alive(driver: Any) -> bool:
+    """
+    Returns whether driver's browser still responds.
+
+    :param driver: webdriver
+    :return: bool
+    """
+    try:
+        driver.title
+    except Exception:
+        return False
+    return True
+
+
+def _quit(driver: Any) -> None:
+    """Quit driver, ignoring errors from an already dead browser."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class WebdriverPool:
+    """
+    Pool of webdrivers, reused across exports.
+
+    Drivers are started on demand, up to max_size at once, and returned
+    to the pool after use. Idle drivers are health checked before reuse,
+    dead drivers being replaced.
+
+    Use as a context manager, or call .close(), to quit the pool's
+    drivers.
+    """
+
+    def __init__(self,
+                 factory: Callable[[], Any] = firefox_webdriver,
+                 *,
+                 max_size: int = 2,
+                 health_check: Callable[[Any], bool] = is_alive,
+                 ) -> None:
+        """
+        :param factory: Callable[[], webdriver] starting a new driver
+        :param max_size: int maximum number of drivers running at once
+        :param health_check: Callable[[webdriver], bool] returning
+                             whether an idle driver may be reused
+        :return: None
+        """
+        if max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, not {max_size!r}")
+        self.factory = factory
+        self.max_size = max_size
+        self.health_check = health_check
+        self.started = 0  # Number of drivers started over the pool's life.
+
+        self._idle: list[Any] = []
+        self._size = 0  # Number of drivers running, idle or in use.
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def driver(self, timeout: float|None = None) -> Iterator[Any]:
+        """
+        Context manager borrowing a driver from the pool.
+
+        :param timeout: float seconds to wait for a driver, if max_size
+                              are in use, waiting indefinitely if None
+        :return: Iterator[webdriver]
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def acquire(self, timeout: float|None = None) -> Any:
+        """
+        Borrow a driver from the pool, starting one if none are idle.
+
+        Raises TimeoutError if no driver becomes available in timeout
+        seconds.
+
+        :param timeout: float
+        :return: webdriver
+        """
+        dead = []
+        try:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("WebdriverPool is closed")
+                    while self._idle:
+                        driver = self._idle.pop()
+                        if self.health_check(driver):
+                            return driver
+                        dead.append(driver)
+                        self._size -= 1
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    if not self._condition.wait(timeout):
+                        raise TimeoutError(f"No webdriver available within {timeout} seconds")
+        finally:
+            for driver in dead:
+                _quit(driver)
+
+        try:
+            with metrics.stage('plot.webdriver_start'):
+                driver = self.factory()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.started += 1
+        return driver
+
+    def release(self, driver: Any) -> None:
+        """
+        Return a borrowed driver to the pool.
+
+        :param driver: webdriver
+        :return: None
+        """
+        with self._condition:
+            if not self._closed:
+                self._idle.append(driver)
+                self._condition.notify()
+                return
+            self._size -= 1
+        _quit(driver)
+
+    def close(self) -> None:
+        """
+        Quit idle drivers, and drivers in use once they are released.
+
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for driver in idle:
+            _quit(driver)
+
+    def __enter__(self) -> WebdriverPool:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+_default_pool: WebdriverPool|None = None
+_default_pool_lock = threading.Lock()
+
+
+def default_webdriver_pool() -> WebdriverPool:
+    """
+    Returns the process-wide pool of Firefox webdrivers, creating it on
+    first use.
+
+    The pool is closed when the interpreter exits.
+
+    :return: WebdriverPool
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WebdriverPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
@@ -0,0 +1,112 @@
+"""Downsampling of lines for display"""
+from typing import Any, Callable
+
+import numpy as np
+
+
+def lttb(xs: Any, ys: Any, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample line to points points by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points, and from each of points - 2 equal
+    sized buckets between them, the point forming the largest triangle
+    with the point kept from the previous bucket and the average of the
+    next bucket. Preserves the visual shape of the line, including peaks.
+
+    :param xs: Sequence of x values
+    :param ys: Sequence of y values
+    :param points: int number of points to keep
+    :return: tuple[np.ndarray, np.ndarray]
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    length = len(xs)
+    if points >= length or points < 3:
+        return xs, ys
+
+    # Bucket i spans indices edges[i] to edges[i + 1], excluding first and last points.
+    edges = np.linspace(1, length - 1, points - 1).astype(int)
+    selected = np.empty(points, dtype=int)
+    selected[0] = 0
+    selected[-1] = length - 1
+
+    previous = 0
+    for i in range(points - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_xs, next_ys = xs[stop:edges[i + 2]], ys[stop:edges[i + 2]]
+            average_x, average_y = next_xs.mean(), next_ys.mean()
+        else:  # Last bucket, next is the last point.
+            average_x, average_y = xs[-1], ys[-1]
+
+        areas = np.abs((xs[previous] - average_x) * (ys[start:stop] - ys[previous])
+                       - (xs[previous] - xs[start:stop]) * (average_y - ys[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return xs[selected], ys[selected]
+
+
+def min_max(xs: Any, ys: Any, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample line to at most points points, keeping the first and last
+    points, and the minimum and maximum y of each of (points - 2) // 2
+    buckets.
+
+    Buckets are of equal x width - ie one per pixel column when points is
+    twice the plot width - if xs is sorted, otherwise of equal numbers of
+    points. Every peak and trough of the line is preserved.
+
+    :param xs: Sequence of x values
+    :param ys: Sequence of y values
+    :param points: int maximum number of points to keep
+    :return: tuple[np.ndarray, np.ndarray]
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    length = len(xs)
+    buckets = (points - 2) // 2  # Besides the first and last points.
+    if points >= length or buckets < 1:
+        return xs, ys
+
+    if np.all(np.diff(xs) >= 0):
+        starts = np.unique(np.searchsorted(xs, np.linspace(xs[0], xs[-1], buckets + 1)[:-1]))
+    else:
+        starts = np.unique(np.linspace(0, length, buckets + 1)[:-1].astype(int))
+    stops = np.append(starts[1:], length)
+
+    selected = {0, length - 1}
+    for start, stop in zip(starts, stops):
+        bucket = ys[start:stop]
+        if np.isnan(bucket).all():
+            selected.add(int(start))
+        else:
+            selected.add(int(start + np.nanargmin(bucket)))
+            selected.add(int(start + np.nanargmax(bucket)))
+
+    indices = np.fromiter(sorted(selected), dtype=int)
+    return xs[indices], ys[indices]
+
+
+DECIMATION_METHODS: dict[str, Callable[[Any, Any, int], tuple[np.ndarray, np.ndarray]]] = {
+    'lttb': lttb,
+    'minmax': min_max,
+}
+
+
+def decimate(xs: Any, ys: Any, method: str, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample line by named method, to about points points.
+
+    :param xs: Sequence of x values
+    :param ys: Sequence of y values
+    :param method: str 'lttb' or 'minmax'
+    :param points: int number of points to keep
+    :return: tuple[np.ndarray, np.ndarray]
+    """
+    try:
+        decimation_method = DECIMATION_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown decimation method {method!r}, "
+                         f"expected one of {', '.join(DECIMATION_METHODS)}") from None
+    return decimation_method(xs, ys, points)
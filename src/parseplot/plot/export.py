@@ -0,0 +1,153 @@
+"""Batch export of plots"""
+from __future__ import annotations
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (Iterable,
+                    Iterator,
+                    Mapping,
+                    Sequence,
+                    Union,
+                    )
+
+from .bokeh.bokeh_plotter import BokehPlotter
+from .bokeh.webdriver_pool import WebdriverPool
+
+# Export format to BokehPlotter method saving in that format.
+EXPORT_FORMATS = {'png': 'save_as_png',
+                  'svg': 'save_as_svg',
+                  'html': 'save_html_to_file',
+                  }
+
+
+@dataclass
+class ExportReport:
+    """Outcome of a batch export."""
+    saved: dict[str, list[Path]] = field(default_factory=dict)
+    failed: dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def charts_per_second(self) -> float:
+        """Charts successfully exported per second."""
+        return len(self.saved) / self.elapsed if self.elapsed else 0.0
+
+
+def export_many(plotters: Union[Mapping[str, BokehPlotter], Iterable[BokehPlotter]],
+                out_dir: Union[str, Path],
+                formats: Sequence[str] = ('png', 'svg'),
+                *,
+                renderer: str|None = None,
+                workers: int|None = None,
+                webdriver_pool: WebdriverPool|None = None,
+                ) -> ExportReport:
+    """
+    Export many plots to out_dir, in each of formats.
+
+    Plots are taken from plotters as workers become free, so plotters may
+    be a generator producing plots as they are exported. A mapping's keys
+    name its plots' files, otherwise files are named by position, eg
+    plot_00042.png.
+
+    Each worker keeps one rendering session - a headless browser, from
+    webdriver_pool - for all the plots it exports, rather than starting
+    one per export. If webdriver_pool is not given, a pool of one driver
+    per worker is used for the batch, and closed after it. Plotters with
+    their own pool keep using it. No browser is started for plots
+    rendered natively.
+
+    A plot failing to export is recorded in the report's .failed, and the
+    batch carries on. An error raised taking plots from plotters, eg by a
+    generator, is raised once the plots already taken are exported.
+
+    :param plotters: Union[Mapping[str, BokehPlotter], Iterable[BokehPlotter]]
+    :param out_dir: Union[str, Path] directory to save plots in
+    :param formats: Sequence[str] of 'png', 'svg', 'html'
+    :param renderer: str 'bokeh' or 'native', defaulting to each
+                         plotter's .renderer
+    :param workers: int number of plots exported in parallel, defaulting
+                        to the number of CPUs
+    :param webdriver_pool: WebdriverPool to borrow drivers from
+    :return: ExportReport
+    """
+    unknown_formats = [export_format for export_format in formats if export_format not in EXPORT_FORMATS]
+    if unknown_formats:
+        raise ValueError(f"Unknown export format(s) {', '.join(map(repr, unknown_formats))}, "
+                         f"expected some of {', '.join(EXPORT_FORMATS)}")
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be a positive integer, not {workers!r}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    batch_pool = webdriver_pool or WebdriverPool(max_size=workers)
+    report = ExportReport()
+    named_plotters = _named(plotters)
+    lock = threading.Lock()
+    plotters_errors: list[Exception] = []
+
+    def export_worker() -> None:
+        while True:
+            with lock:
+                try:
+                    name, plotter = next(named_plotters)
+                except StopIteration:
+                    return
+                except Exception as error:
+                    plotters_errors.append(error)
+                    return
+            try:
+                paths = _export(plotter, out_dir / name, formats, renderer, batch_pool)
+            except Exception as error:
+                with lock:
+                    report.failed[name] = error
+            else:
+                with lock:
+                    report.saved[name] = paths
+
+    start = time.perf_counter()
+    try:
+        threads = [threading.Thread(target=export_worker, name=f'export_many-{i}') for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if webdriver_pool is None:
+            batch_pool.close()
+    if plotters_errors:
+        raise plotters_errors[0]
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _named(plotters: Union[Mapping[str, BokehPlotter], Iterable[BokehPlotter]],
+           ) -> Iterator[tuple[str, BokehPlotter]]:
+    """Yields file name and plotter of each plot."""
+    if isinstance(plotters, Mapping):
+        yield from plotters.items()
+    else:
+        for index, plotter in enumerate(plotters):
+            yield f'plot_{index:05}', plotter
+
+
+def _export(plotter: BokehPlotter,
+            filepath: Path,
+            formats: Sequence[str],
+            renderer: str|None,
+            webdriver_pool: WebdriverPool,
+            ) -> list[Path]:
+    """
+    Save plotter in each format, borrowing drivers from webdriver_pool if
+    plotter has no pool of its own.
+    """
+    paths = []
+    for export_format in formats:
+        save = getattr(plotter, EXPORT_FORMATS[export_format])
+        if export_format == 'html':
+            paths.append(Path(save(filepath)))
+        else:
+            paths.append(Path(save(filepath, renderer=renderer, webdriver_pool=webdriver_pool)))
+    return paths
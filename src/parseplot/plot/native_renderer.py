@@ -0,0 +1,265 @@
+"""Browser-free rendering of line charts to SVG and PNG"""
+from __future__ import annotations
+import math
+from dataclasses import dataclass, field
+from html import escape
+from typing import (Any,
+                    Iterator,
+                    Optional,
+                    Sequence,
+                    Union,
+                    )
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .decimate import min_max
+
+# Bokeh's Category10 palette, used in turn for lines without a colour.
+PALETTE = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+           '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf')
+
+# Space around the plot frame, in pixels: left, right, top, bottom.
+MARGINS = (60, 20, 40, 50)
+# Fraction of the data range padding each side of the frame.
+RANGE_PADDING = 0.05
+TICK_COUNT = 6
+FONT_SIZE = 12
+TITLE_FONT_SIZE = 14
+AXIS_COLOUR = '#444444'
+GRID_COLOUR = '#e5e5e5'
+
+
+@dataclass
+class Line:
+    """Points and style of a line to be rendered."""
+    xs: Any
+    ys: Any
+    colour: Optional[str] = None
+    width: Union[int, float] = 1
+    legend_label: Optional[str] = None
+
+
+@dataclass
+class Chart:
+    """Lines and annotations of a chart to be rendered."""
+    lines: list[Line] = field(default_factory=list)
+    title: Optional[str] = None
+    x_axis_label: Optional[str] = None
+    y_axis_label: Optional[str] = None
+    x_axis_location: Optional[Union[int, float]] = None
+    y_axis_location: Optional[Union[int, float]] = None
+    width: int = 600
+    height: int = 600
+
+
+def nice_ticks(low: float, high: float, count: int = TICK_COUNT) -> list[float]:
+    """
+    Returns about count evenly spaced round numbers from low to high.
+
+    :param low: float
+    :param high: float
+    :param count: int approximate number of ticks
+    :return: list[float]
+    """
+    span = high - low
+    if not span > 0 or not math.isfinite(span):
+        return [low]
+    raw_step = span / max(count - 1, 1)
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(multiple * magnitude for multiple in (1, 2, 2.5, 5, 10)
+                if multiple * magnitude >= raw_step)
+    first = math.ceil(low / step)
+    last = math.floor(high / step)
+    return [round(tick * step, 12) for tick in range(first, last + 1)]
+
+
+def format_tick(tick: float) -> str:
+    """
+    Returns tick value as a short label.
+
+    :param tick: float
+    :return: str
+    """
+    return f'{tick:.6g}'
+
+
+class _Layout:
+    """Mapping from data coordinates to the pixels of a chart's frame."""
+
+    def __init__(self, chart: Chart) -> None:
+        left, right, top, bottom = MARGINS
+        self.frame = (left, top, chart.width - right, chart.height - bottom)
+        self.x_range = self._range([line.xs for line in chart.lines])
+        self.y_range = self._range([line.ys for line in chart.lines])
+
+    @staticmethod
+    def _range(arrays: Sequence[Any]) -> tuple[float, float]:
+        low, high = math.inf, -math.inf
+        for values in arrays:
+            values = np.asarray(values, dtype=float)
+            finite = values[np.isfinite(values)]
+            if len(finite):
+                low, high = min(low, float(finite.min())), max(high, float(finite.max()))
+        if low > high:  # No finite values.
+            return 0.0, 1.0
+        if low == high:
+            return low - 1, high + 1
+        padding = (high - low) * RANGE_PADDING
+        return low - padding, high + padding
+
+    def x(self, xs: Any) -> Any:
+        """Returns pixel x of data xs."""
+        (x_min, x_max), (left, _, right, _) = self.x_range, self.frame
+        return left + (np.asarray(xs, dtype=float) - x_min) * (right - left) / (x_max - x_min)
+
+    def y(self, ys: Any) -> Any:
+        """Returns pixel y of data ys, increasing downwards."""
+        (y_min, y_max), (_, top, _, bottom) = self.y_range, self.frame
+        return bottom - (np.asarray(ys, dtype=float) - y_min) * (bottom - top) / (y_max - y_min)
+
+    def axis_positions(self, chart: Chart) -> tuple[float, float]:
+        """
+        Returns pixel y of the x axis and pixel x of the y axis, at their
+        fixed locations if within the frame, otherwise on the frame edge.
+        """
+        left, top, right, bottom = self.frame
+        x_axis: float = bottom
+        if chart.x_axis_location is not None:
+            x_axis = min(max(float(self.y(chart.x_axis_location)), top), bottom)
+        y_axis: float = left
+        if chart.y_axis_location is not None:
+            y_axis = min(max(float(self.x(chart.y_axis_location)), left), right)
+        return x_axis, y_axis
+
+    def segments(self, line: Line) -> Iterator[tuple[Any, Any]]:
+        """
+        Yields pixel coordinates of runs of finite points of line,
+        downsampled to two points per pixel column.
+        """
+        xs, ys = min_max(line.xs, line.ys, 2 * (self.frame[2] - self.frame[0]))
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        breaks = np.flatnonzero(np.diff(finite.astype(np.int8))) + 1
+        for run in np.split(np.arange(len(xs)), breaks):
+            if len(run) and finite[run[0]]:
+                yield self.x(xs[run]), self.y(ys[run])
+
+
+def _line_colour(line: Line, index: int) -> str:
+    return line.colour or PALETTE[index % len(PALETTE)]
+
+
+def render_svg(chart: Chart) -> str:
+    """
+    Returns chart as an SVG document.
+
+    :param chart: Chart
+    :return: str
+    """
+    layout = _Layout(chart)
+    left, top, right, bottom = layout.frame
+    x_axis, y_axis = layout.axis_positions(chart)
+    x_ticks = nice_ticks(*layout.x_range)
+    y_ticks = nice_ticks(*layout.y_range)
+
+    elements = [f'<rect width="{chart.width}" height="{chart.height}" fill="white"/>']
+    for tick in x_ticks:
+        x = layout.x(tick)
+        elements.append(f'<line x1="{x:.2f}" y1="{top}" x2="{x:.2f}" y2="{bottom}" stroke="{GRID_COLOUR}"/>')
+        elements.append(f'<text x="{x:.2f}" y="{x_axis + 15:.2f}" text-anchor="middle">'
+                        f'{format_tick(tick)}</text>')
+    for tick in y_ticks:
+        y = layout.y(tick)
+        elements.append(f'<line x1="{left}" y1="{y:.2f}" x2="{right}" y2="{y:.2f}" stroke="{GRID_COLOUR}"/>')
+        elements.append(f'<text x="{y_axis - 5:.2f}" y="{y + 4:.2f}" text-anchor="end">'
+                        f'{format_tick(tick)}</text>')
+    elements.append(f'<line x1="{left}" y1="{x_axis:.2f}" x2="{right}" y2="{x_axis:.2f}" stroke="{AXIS_COLOUR}"/>')
+    elements.append(f'<line x1="{y_axis:.2f}" y1="{top}" x2="{y_axis:.2f}" y2="{bottom}" stroke="{AXIS_COLOUR}"/>')
+
+    elements.append(f'<clipPath id="frame"><rect x="{left}" y="{top}" '
+                    f'width="{right - left}" height="{bottom - top}"/></clipPath>')
+    elements.append('<g clip-path="url(#frame)" fill="none" stroke-linejoin="round">')
+    for index, line in enumerate(chart.lines):
+        for xs, ys in layout.segments(line):
+            coordinates = ' '.join(f'{x:.2f},{y:.2f}' for x, y in zip(xs.tolist(), ys.tolist()))
+            elements.append(f'<polyline points="{coordinates}" stroke="{_line_colour(line, index)}" '
+                            f'stroke-width="{line.width}"/>')
+    elements.append('</g>')
+
+    legend_y = top + 15
+    for index, line in enumerate(chart.lines):
+        if line.legend_label:
+            elements.append(f'<line x1="{right - 130}" y1="{legend_y - 4}" x2="{right - 110}" y2="{legend_y - 4}" '
+                            f'stroke="{_line_colour(line, index)}" stroke-width="{line.width}"/>')
+            elements.append(f'<text x="{right - 105}" y="{legend_y}">{escape(line.legend_label)}</text>')
+            legend_y += 15
+
+    if chart.title:
+        elements.append(f'<text x="{left}" y="{top - 15}" font-size="{TITLE_FONT_SIZE}" font-weight="bold">'
+                        f'{escape(chart.title)}</text>')
+    if chart.x_axis_label:
+        elements.append(f'<text x="{(left + right) / 2}" y="{chart.height - 10}" text-anchor="middle">'
+                        f'{escape(chart.x_axis_label)}</text>')
+    if chart.y_axis_label:
+        elements.append(f'<text transform="translate(15 {(top + bottom) / 2}) rotate(-90)" text-anchor="middle">'
+                        f'{escape(chart.y_axis_label)}</text>')
+
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{chart.width}" height="{chart.height}" '
+            f'font-family="sans-serif" font-size="{FONT_SIZE}">'
+            + ''.join(elements)
+            + '</svg>\n')
+
+
+def render_png(chart: Chart) -> Image.Image:
+    """
+    Returns chart as a PIL Image.
+
+    :param chart: Chart
+    :return: PIL.Image.Image
+    """
+    layout = _Layout(chart)
+    left, top, right, bottom = layout.frame
+    x_axis, y_axis = layout.axis_positions(chart)
+    font = ImageFont.load_default()
+
+    image = Image.new('RGB', (chart.width, chart.height), 'white')
+    draw = ImageDraw.Draw(image)
+    for tick in nice_ticks(*layout.x_range):
+        x = float(layout.x(tick))
+        draw.line([(x, top), (x, bottom)], fill=GRID_COLOUR)
+        draw.text((x, x_axis + 10), format_tick(tick), fill='black', font=font, anchor='mm')
+    for tick in nice_ticks(*layout.y_range):
+        y = float(layout.y(tick))
+        draw.line([(left, y), (right, y)], fill=GRID_COLOUR)
+        draw.text((y_axis - 5, y), format_tick(tick), fill='black', font=font, anchor='rm')
+    draw.line([(left, x_axis), (right, x_axis)], fill=AXIS_COLOUR)
+    draw.line([(y_axis, top), (y_axis, bottom)], fill=AXIS_COLOUR)
+
+    # Lines are drawn on their own layer, cropped to the frame.
+    lines_layer = Image.new('RGBA', image.size)
+    lines_draw = ImageDraw.Draw(lines_layer)
+    for index, line in enumerate(chart.lines):
+        for xs, ys in layout.segments(line):
+            lines_draw.line(list(zip(xs.tolist(), ys.tolist())), fill=_line_colour(line, index),
+                            width=max(1, round(line.width)), joint='curve')
+    frame = (left, top, right + 1, bottom + 1)
+    image.paste(lines_layer.crop(frame), frame[:2], lines_layer.crop(frame))
+
+    legend_y = top + 10
+    for index, line in enumerate(chart.lines):
+        if line.legend_label:
+            draw.line([(right - 130, legend_y), (right - 110, legend_y)], fill=_line_colour(line, index),
+                      width=max(1, round(line.width)))
+            draw.text((right - 105, legend_y), line.legend_label, fill='black', font=font, anchor='lm')
+            legend_y += 15
+
+    if chart.title:
+        draw.text((left, top - 15), chart.title, fill='black', font=font, anchor='ls')
+    if chart.x_axis_label:
+        draw.text(((left + right) / 2, chart.height - 10), chart.x_axis_label, fill='black', font=font, anchor='ms')
+    if chart.y_axis_label:
+        label = Image.new('RGBA', (int(draw.textlength(chart.y_axis_label, font=font)) + 2, FONT_SIZE + 4))
+        ImageDraw.Draw(label).text((1, 1), chart.y_axis_label, fill='black', font=font)
+        label = label.rotate(90, expand=True)
+        image.paste(label, (5, int((top + bottom - label.height) / 2)), label)
+    return image
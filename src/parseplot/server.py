@@ -0,0 +1,450 @@
+"""
+HTTP plotting service, keeping compiled expressions, results and export
+renderers warm across requests.
+
+    python -m parseplot.server --port 8000 --processes 4
+
+    GET /plot?expression=sin(x)&x_min=-10&x_max=10&n=1000&format=svg
+    POST /plot {"expression": "sin(x)", "x_min": -10, "x_max": 10, "format": "png"}
+    GET /stats
+    GET /health
+
+Points are evaluated, and plots rendered, in a pool of worker processes
+started once, each keeping its own compiled expression cache and, for
+the bokeh renderer, its own headless browser. Plotted points are kept in
+a ResultCache, so repeated requests for the same expression and domain
+only render.
+"""
+import argparse
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque
+from concurrent.futures import Executor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Collection, Mapping, Sequence, Union
+from urllib.parse import parse_qs, urlsplit
+
+from .parse.curve import Curve
+from .parse.expression_cache import compile_expression, compiled_expressions
+from .parse.parallel import evaluate_chunk
+from .parse.parser import Parser
+from .parse.pre_parse import pre_parse_translate
+from .parse.result_cache import ResultCache
+from .util.metrics import metrics
+
+# Response format to content type.
+FORMATS = {'json': 'application/json',
+           'svg': 'image/svg+xml',
+           'png': 'image/png',
+           'html': 'text/html; charset=utf-8',
+           }
+RENDERERS = ('native', 'bokeh')
+
+# Most points a request may plot, by default.
+MAX_POINTS = 10 ** 6
+
+# Request latencies kept per path, for percentiles.
+LATENCY_SAMPLES = 1024
+
+
+class PlotError(ValueError):
+    """An invalid plot request, eg an unparsable expression."""
+
+
+def evaluate_curve(expression: str,
+                   start: Union[int, float],
+                   end: Union[int, float],
+                   step: Union[int, float],
+                   ) -> tuple[array, array]:
+    """
+    Evaluate expression over float_range(start, end, step).
+
+    Runs in worker processes, so errors are raised as PlotErrors, which
+    can be returned from workers whatever the original error. Expressions
+    are compiled, and invalid syntax rejected, in the worker too, keeping
+    CPU work off request threads.
+
+    :param expression: str translated expression
+    :param start: Union[int, float]
+    :param end: Union[int, float]
+    :param step: Union[int, float]
+    :return: tuple[array, array] of x and y values
+    """
+    try:
+        compile_expression(expression)
+    except Exception as error:
+        raise PlotError(f"invalid expression: {error}") from None
+    try:
+        return evaluate_chunk(expression, start, step, 0, Parser.float_range_length(start, end, step))
+    except Exception as error:
+        raise PlotError(f"{type(error).__name__}: {error}") from None
+
+
+def render_plot(expression: str, xs: Any, ys: Any, plot_format: str, renderer: str) -> bytes:
+    """
+    Render points of expression as plot_format.
+
+    Runs in worker processes, which import Bokeh once, and keep their
+    webdriver pool's browsers between requests.
+
+    :param expression: str as given, titling the plot
+    :param xs: array('d')|np.ndarray
+    :param ys: array('d')|np.ndarray
+    :param plot_format: str 'svg', 'png' or 'html'
+    :param renderer: str 'native' or 'bokeh'
+    :return: bytes
+    """
+    from .plot.bokeh.bokeh_plotter import BokehPlotter
+    from .plot.export import EXPORT_FORMATS
+
+    plotter = BokehPlotter(title=expression, x_axis_label='x', y_axis_label='y', renderer=renderer)
+    plotter.add_line(Curve(xs, ys))
+    with tempfile.TemporaryDirectory(prefix='parseplot_server_') as out_dir:
+        filepath = getattr(plotter, EXPORT_FORMATS[plot_format])(Path(out_dir) / 'plot')
+        return Path(filepath).read_bytes()
+
+
+class _PathStats:
+    """Request count, errors and recent latencies of a path."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def summary(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {'requests': self.requests,
+                'errors': self.errors,
+                'mean_seconds': self.seconds / self.requests if self.requests else 0.0,
+                'max_seconds': self.max_seconds,
+                'p50_seconds': _percentile(latencies, 0.5),
+                'p95_seconds': _percentile(latencies, 0.95),
+                }
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class PlotService:
+    """
+    Plots requests, independently of HTTP.
+
+    Owns a ProcessPoolExecutor of processes workers unless given an
+    executor; close() shuts down an owned pool.
+    """
+
+    def __init__(self,
+                 *,
+                 processes: int|None = None,
+                 executor: Executor|None = None,
+                 cache: ResultCache|None = None,
+                 renderer: str = 'native',
+                 max_points: int = MAX_POINTS,
+                 ) -> None:
+        """
+        :param processes: int number of worker processes, defaulting to
+                              the number of CPUs
+        :param executor: Executor to evaluate and render in, instead of a
+                         process pool
+        :param cache: ResultCache of plotted points, defaulting to a 64MiB
+                      in-memory cache
+        :param renderer: str default renderer of svg and png plots
+        :param max_points: int most points a request may plot
+        :return: None
+        """
+        if renderer not in RENDERERS:
+            raise ValueError(f"renderer must be one of {', '.join(RENDERERS)}, not {renderer!r}")
+        self._own_executor = executor is None
+        if executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(processes or os.cpu_count() or 1)
+        self.executor: Executor = executor
+        self.cache = cache if cache is not None else ResultCache()
+        self.renderer = renderer
+        self.max_points = max_points
+        self.started = time.monotonic()
+        self._stats: dict[str, _PathStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def plot(self, parameters: Mapping[str, Any]) -> tuple[bytes, str]:
+        """
+        Plot a request, returning the response body and its content type.
+
+        parameters: expression, and optionally x_min/x_max (default
+        -10/10), n, smooth or very_smooth as for Parser.plot, format (json,
+        svg, png or html, default json) and renderer.
+
+        JSON responses are {"expression", "x": [...], "y": [...]}, with
+        undefined y values null.
+
+        Raises PlotError if the request is invalid.
+
+        :param parameters: Mapping[str, Any]
+        :return: tuple[bytes, str]
+        """
+        expression = parameters.get('expression')
+        if not isinstance(expression, str) or not expression.strip():
+            raise PlotError("expression is required")
+        plot_format = _choice(parameters, 'format', 'json', FORMATS)
+        renderer = _choice(parameters, 'renderer', self.renderer, RENDERERS)
+        x_min = _number(parameters, 'x_min', -10)
+        x_max = _number(parameters, 'x_max', 10)
+        n = parameters.get('n')
+        if n is not None:
+            n = int(_number(parameters, 'n', 0))
+            if n < 2:
+                raise PlotError(f"n must be at least 2, not {n}")
+        if not x_min < x_max:
+            raise PlotError(f"x_min must be less than x_max, not {x_min} >= {x_max}")
+        step = Parser._step(x_min, x_max, n, _flag(parameters, 'smooth'), _flag(parameters, 'very_smooth'))
+        if Parser.float_range_length(x_min, x_max + step, step) > self.max_points:
+            raise PlotError(f"more than {self.max_points} points requested")
+
+        curve = self._curve(pre_parse_translate(expression), x_min, x_max + step, step)
+        if plot_format == 'json':
+            body = json.dumps({'expression': expression,
+                               'x': curve.xs.tolist(),  # Cached curves are NumPy arrays.
+                               'y': [y if math.isfinite(y) else None for y in curve.ys.tolist()],
+                               })
+            return body.encode(), FORMATS['json']
+        body_bytes = self.executor.submit(render_plot, expression, curve.xs, curve.ys,
+                                          plot_format, renderer).result()
+        return body_bytes, FORMATS[plot_format]
+
+    def _curve(self, expression: str,
+               start: Union[int, float],
+               end: Union[int, float],
+               step: Union[int, float],
+               ) -> Curve:
+        """Returns points of expression, from the cache, or evaluated by a worker."""
+        key = self.cache.key(expression, start, end, step)
+        curve = self.cache.get(key)
+        if curve is None:
+            xs, ys = self.executor.submit(evaluate_curve, expression, start, end, step).result()
+            curve = self.cache.put(key, Curve(xs, ys))
+        return curve
+
+    def record(self, path: str, seconds: float, error: bool) -> None:
+        """
+        Record a request to path, taking seconds.
+
+        :param path: str
+        :param seconds: float
+        :param error: bool whether the request failed
+        :return: None
+        """
+        with self._stats_lock:
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = self._stats[path] = _PathStats()
+            stats.requests += 1
+            stats.errors += error
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.latencies.append(seconds)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns throughput and latency of requests per path, cache
+        statistics, and the metrics registry's stages and counters.
+
+        :return: dict[str, Any]
+        """
+        uptime = time.monotonic() - self.started
+        with self._stats_lock:
+            paths = {path: stats.summary() for path, stats in sorted(self._stats.items())}
+        requests = sum(path['requests'] for path in paths.values())
+        return {'uptime_seconds': uptime,
+                'requests': requests,
+                'requests_per_second': requests / uptime if uptime else 0.0,
+                'paths': paths,
+                'expression_cache': compiled_expressions.info()._asdict(),
+                'result_cache': self.cache.info()._asdict(),
+                'metrics': metrics.to_dict(),
+                }
+
+    def close(self) -> None:
+        """
+        Shut down the worker pool, if owned.
+
+        :return: None
+        """
+        if self._own_executor:
+            self.executor.shutdown()
+
+
+def _choice(parameters: Mapping[str, Any], name: str, default: str, choices: Collection[str]) -> str:
+    value = parameters.get(name, default)
+    if value not in choices:
+        raise PlotError(f"{name} must be one of {', '.join(choices)}, not {value!r}")
+    return value
+
+
+def _number(parameters: Mapping[str, Any], name: str, default: Union[int, float]) -> Union[int, float]:
+    value = parameters.get(name, default)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise PlotError(f"{name} must be a number, not {value!r}") from None
+    if not math.isfinite(number):
+        raise PlotError(f"{name} must be finite, not {value!r}")
+    return int(number) if number.is_integer() else number
+
+
+def _flag(parameters: Mapping[str, Any], name: str) -> bool:
+    value = parameters.get(name, False)
+    return value.lower() in ('1', 'true', 'yes') if isinstance(value, str) else bool(value)
+
+
+class PlotRequestHandler(BaseHTTPRequestHandler):
+    """Handles requests to a PlotServer."""
+    server: 'PlotServer'
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        parameters = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self._handle(url.path, parameters)
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            parameters = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            parameters = None
+        if not isinstance(parameters, dict):
+            self._respond(url.path, HTTPStatus.BAD_REQUEST, self._error("body must be a JSON object"))
+            return
+        self._handle(url.path, parameters)
+
+    def _handle(self, path: str, parameters: dict[str, Any]) -> None:
+        start = time.perf_counter()
+        service = self.server.service
+        status = HTTPStatus.OK
+        try:
+            if path == '/plot':
+                body, content_type = service.plot(parameters)
+            elif path == '/stats':
+                body, content_type = json.dumps(service.stats()).encode(), FORMATS['json']
+            elif path == '/health':
+                body, content_type = b'{"status": "ok"}', FORMATS['json']
+            else:
+                status = HTTPStatus.NOT_FOUND
+                body, content_type = self._error(f"no such path {path}")
+        except PlotError as error:
+            status = HTTPStatus.BAD_REQUEST
+            body, content_type = self._error(str(error))
+        except Exception as error:
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            body, content_type = self._error(f"{type(error).__name__}: {error}")
+        self._respond(path, status, (body, content_type))
+        if status != HTTPStatus.NOT_FOUND:
+            service.record(path, time.perf_counter() - start, error=status != HTTPStatus.OK)
+
+    @staticmethod
+    def _error(message: str) -> tuple[bytes, str]:
+        return json.dumps({'error': message}).encode(), FORMATS['json']
+
+    def _respond(self, path: str, status: HTTPStatus, response: tuple[bytes, str]) -> None:
+        body, content_type = response
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class PlotServer(ThreadingHTTPServer):
+    """
+    HTTP server plotting requests with a PlotService, eg:
+        >>> with PlotServer(('127.0.0.1', 8000), processes=4) as server:
+        ...     server.serve_forever()
+
+    Requests are handled in threads, and their CPU work in the service's
+    worker processes. Closing the server closes the service.
+    """
+    daemon_threads = True
+
+    def __init__(self,
+                 address: tuple[str, int] = ('127.0.0.1', 8000),
+                 service: PlotService|None = None,
+                 *,
+                 quiet: bool = False,
+                 **service_kwargs: Any,
+                 ) -> None:
+        """
+        :param address: tuple[str, int] host and port, port 0 choosing a
+                        free port
+        :param service: PlotService, else one is created with
+                        service_kwargs
+        :param quiet: bool whether to not log requests
+        :return: None
+        """
+        self.service = service if service is not None else PlotService(**service_kwargs)
+        self.quiet = quiet
+        super().__init__(address, PlotRequestHandler)
+
+    @property
+    def url(self) -> str:
+        """Returns base URL of the server."""
+        host, port = self.server_address[:2]
+        return f'http://{host!s}:{port}'
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.service.close()
+
+
+def main(argv: Sequence[str]|None = None) -> None:
+    """
+    Serve plots until interrupted.
+
+    :param argv: Sequence[str] arguments, default sys.argv[1:]
+    :return: None
+    """
+    parser = argparse.ArgumentParser(prog='python -m parseplot.server',
+                                     description='Serve plots of expressions over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on, default 127.0.0.1.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on, default 8000.')
+    parser.add_argument('--processes', type=int, help='Worker processes, default the number of CPUs.')
+    parser.add_argument('--renderer', choices=RENDERERS, default='native',
+                        help='Default renderer of svg and png plots, default native.')
+    parser.add_argument('--cache-mb', type=int, default=64, help='Memory for cached points, default 64MiB.')
+    parser.add_argument('--cache-dir', help='Directory to also cache points in, surviving restarts.')
+    parser.add_argument('--metrics', action='store_true', help='Record stage metrics, reported by /stats.')
+    parser.add_argument('--quiet', action='store_true', help="Don't log requests.")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        metrics.enable()
+    with PlotServer((args.host, args.port),
+                    quiet=args.quiet,
+                    processes=args.processes,
+                    renderer=args.renderer,
+                    cache=ResultCache(args.cache_mb * 2 ** 20, args.cache_dir),
+                    ) as server:
+        print(f"Serving plots on {server.url}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
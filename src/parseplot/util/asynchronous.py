@@ -0,0 +1,80 @@
+"""Helpers for calling blocking parseplot functions from asyncio code."""
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, TypeVar
+from weakref import WeakKeyDictionary
+
+T = TypeVar('T')
+
+# Default maximum number of blocking calls run at once, per event loop.
+DEFAULT_MAX_CONCURRENCY = 8
+
+_executor: Executor|None = None
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+_limits: 'WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[int, asyncio.Semaphore]]' = WeakKeyDictionary()
+_limits_lock = threading.Lock()
+
+
+def set_executor(executor: Executor|None) -> None:
+    """
+    Set the executor blocking calls are run in, by default.
+
+    None runs them in the event loop's default executor.
+
+    :param executor: Executor
+    :return: None
+    """
+    global _executor
+    _executor = executor
+
+
+def set_max_concurrency(max_concurrency: int) -> None:
+    """
+    Set the maximum number of blocking calls run at once, per event
+    loop. Further calls wait for a running call to finish.
+
+    :param max_concurrency: int
+    :return: None
+    """
+    global _max_concurrency
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be a positive integer, not {max_concurrency!r}")
+    _max_concurrency = max_concurrency
+
+
+def _limit(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    """Returns semaphore limiting loop's concurrent blocking calls."""
+    with _limits_lock:
+        limit, semaphore = _limits.get(loop, (None, None))
+        if semaphore is None or limit != _max_concurrency:
+            semaphore = asyncio.Semaphore(_max_concurrency)
+            _limits[loop] = (_max_concurrency, semaphore)
+        return semaphore
+
+
+async def run_blocking(function: Callable[..., T],
+                       *args: Any,
+                       executor: Executor|None = None,
+                       **kwargs: Any,
+                       ) -> T:
+    """
+    Run function(*args, **kwargs) in an executor, without blocking the
+    event loop, returning its result.
+
+    Waits whilst the maximum number of blocking calls are already
+    running, so a burst of calls doesn't start unbounded threads,
+    processes or browsers.
+
+    :param function: Callable[..., T]
+    :param args: Any positional arguments for function
+    :param executor: Executor to run function in, defaulting to the
+                     executor set by set_executor
+    :param kwargs: Any keyword arguments for function
+    :return: T
+    """
+    loop = asyncio.get_running_loop()
+    async with _limit(loop):
+        return await loop.run_in_executor(executor or _executor,
+                                          functools.partial(function, *args, **kwargs))
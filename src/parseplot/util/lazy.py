@@ -0,0 +1,40 @@
+"""Lazily imported module attributes"""
+import importlib
+from typing import Any, Callable, Mapping
+
+
+def lazy_attributes(package: str,
+                    attributes: Mapping[str, tuple[str, str]],
+                    namespace: dict[str, Any],
+                    ) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Returns module __getattr__ and __dir__ functions importing attributes
+    on first access, eg in a package's __init__.py:
+        >>> __getattr__, __dir__ = lazy_attributes(
+        ...     __name__, {'BokehPlotter': ('.bokeh', 'BokehPlotter')}, globals())
+
+    so importing the package doesn't import Bokeh until BokehPlotter is
+    used. Imported attributes are stored in namespace, so later accesses
+    don't call __getattr__.
+
+    :param package: str name of the package, ie its __name__
+    :param attributes: Mapping[str, tuple[str, str]] attribute name to
+                       (module, name in module), module being absolute
+                       or relative to package
+    :param namespace: dict[str, Any] the package's globals()
+    :return: tuple[Callable[[str], Any], Callable[[], list[str]]]
+    """
+    def __getattr__(name: str) -> Any:
+        try:
+            module, attribute = attributes[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        value = getattr(importlib.import_module(module, package), attribute)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
+
@@ -0,0 +1,261 @@
+"""Timings and counters of parseplot's stages, for diagnosing slow plots"""
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, NamedTuple, Union
+
+# Prefix of metric names in text exports.
+TEXT_PREFIX = 'parseplot'
+
+
+@dataclass
+class StageStats:
+    """Totals recorded for a stage."""
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    points: int = 0
+
+
+class StageEvent(NamedTuple):
+    """A single timed run of a stage, as passed to listeners."""
+    stage: str
+    seconds: float
+    points: int
+    error: BaseException|None
+
+
+Listener = Callable[[StageEvent], None]
+
+
+class Span:
+    """
+    Context manager timing a run of a stage, returned by Metrics.stage.
+
+    Set .points within the block if the number of points processed is
+    only known once the stage has run.
+    """
+    __slots__ = ('_metrics', 'stage', 'points', '_start')
+
+    def __init__(self, metrics: 'Metrics', stage: str, points: int = 0):
+        self._metrics = metrics
+        self.stage = stage
+        self.points = points
+        self._start = 0.0
+
+    def __enter__(self) -> 'Span':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException|None, traceback: Any) -> None:
+        self._metrics.record(StageEvent(self.stage, time.perf_counter() - self._start, self.points, exc))
+
+
+class _DisabledSpan:
+    """Span of a disabled registry, recording nothing."""
+    __slots__ = ()
+
+    points = property(lambda self: 0, lambda self, points: None)
+
+    def __enter__(self) -> '_DisabledSpan':
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException|None, traceback: Any) -> None:
+        return None
+
+
+_DISABLED_SPAN = _DisabledSpan()
+
+
+class Metrics:
+    """
+    Registry of stage timings and counters.
+
+    Stages, eg 'parse.evaluate', record the number of times they ran,
+    their total and longest durations, the number of points they
+    processed and the number of times they raised. Counters, eg
+    'expression_cache.hits', count events.
+
+    Disabled registries record nothing, at the cost of an attribute
+    check per instrumented call; stages are instrumented per call, not
+    per point.
+
+    Listeners are called with a StageEvent after each stage run, from the
+    thread that ran it, eg to forward timings to a tracing system.
+
+    Stages run in worker processes are recorded by the workers' own
+    registries, not the parent's.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        :param enabled: bool whether to record metrics
+        :return: None
+        """
+        self.enabled = enabled
+        self._stages: dict[str, StageStats] = {}
+        self._counters: dict[str, int] = {}
+        self._listeners: list[Listener] = []
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """
+        Start recording metrics.
+
+        :return: None
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stop recording metrics. Recorded metrics are kept.
+
+        :return: None
+        """
+        self.enabled = False
+
+    def stage(self, stage: str, points: int = 0) -> Union[Span, _DisabledSpan]:
+        """
+        Returns context manager timing a run of stage, eg:
+            >>> with metrics.stage('parse.evaluate') as span:
+            ...     ys = evaluate(xs)
+            ...     span.points = len(ys)
+
+        The run is recorded as an error if the block raises.
+
+        :param stage: str
+        :param points: int number of points processed, if known
+        :return: Span
+        """
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return Span(self, stage, points)
+
+    def record(self, event: StageEvent) -> None:
+        """
+        Record a run of a stage, timed by the caller.
+
+        :param event: StageEvent
+        :return: None
+        """
+        with self._lock:
+            stats = self._stages.get(event.stage)
+            if stats is None:
+                stats = self._stages[event.stage] = StageStats()
+            stats.calls += 1
+            stats.seconds += event.seconds
+            stats.max_seconds = max(stats.max_seconds, event.seconds)
+            stats.points += event.points
+            if event.error is not None:
+                stats.errors += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """
+        Add value to counter.
+
+        :param counter: str
+        :param value: int
+        :return: None
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def add_listener(self, listener: Listener) -> None:
+        """
+        Call listener with each StageEvent recorded.
+
+        :param listener: Callable[[StageEvent], None]
+        :return: None
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        """
+        Stop calling listener.
+
+        :param listener: Callable[[StageEvent], None]
+        :return: None
+        """
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def stages(self) -> dict[str, StageStats]:
+        """
+        Returns copies of the stats of each stage recorded.
+
+        :return: dict[str, StageStats]
+        """
+        with self._lock:
+            return {stage: StageStats(**asdict(stats)) for stage, stats in self._stages.items()}
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns counters recorded.
+
+        :return: dict[str, int]
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        """
+        Discard recorded metrics.
+
+        :return: None
+        """
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Returns recorded metrics as a dict of stages and counters.
+
+        :return: dict[str, Any]
+        """
+        return {'stages': {stage: asdict(stats) for stage, stats in sorted(self.stages().items())},
+                'counters': dict(sorted(self.counters().items())),
+                }
+
+    def to_json(self) -> str:
+        """
+        Returns recorded metrics as JSON, per .to_dict.
+
+        :return: str
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_text(self) -> str:
+        """
+        Returns recorded metrics in Prometheus' text format, eg:
+            parseplot_stage_calls_total{stage="parse.evaluate"} 3
+            parseplot_counter_total{counter="expression_cache.hits"} 2
+
+        :return: str
+        """
+        lines = []
+        stages = sorted(self.stages().items())
+        for field, metric, kind in (('calls', 'stage_calls_total', 'counter'),
+                                    ('errors', 'stage_errors_total', 'counter'),
+                                    ('seconds', 'stage_seconds_total', 'counter'),
+                                    ('max_seconds', 'stage_seconds_max', 'gauge'),
+                                    ('points', 'stage_points_total', 'counter'),
+                                    ):
+            lines.append(f"# TYPE {TEXT_PREFIX}_{metric} {kind}")
+            lines.extend(f'{TEXT_PREFIX}_{metric}{{stage="{stage}"}} {getattr(stats, field)!r}'
+                         for stage, stats in stages)
+        lines.append(f"# TYPE {TEXT_PREFIX}_counter_total counter")
+        lines.extend(f'{TEXT_PREFIX}_counter_total{{counter="{counter}"}} {value}'
+                     for counter, value in sorted(self.counters().items()))
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,85 @@
+"""Test adaptive.py"""
+import math
+
+import numpy as np
+import pytest
+
+from src.parseplot import Curve, Parser
+from src.parseplot.parse.adaptive import sample_adaptive
+
+
+@pytest.mark.parametrize(
+    'expression',
+    ['x**2',
+     'x**3-3*x',
+     'sin(x)',
+     'sin(x**2)',
+     'e**x',
+     'abs(x)',
+     ])
+def test_plot_adaptive_fidelity(expression):
+    """Fewer evaluations than very_smooth, within tolerance of the curve."""
+    test_parser = Parser(expression)
+    curve = test_parser.plot_adaptive(-5, 5, tolerance=1e-3, columnar=True)
+    xs, ys = test_parser.plot_arrays(-5, 5, very_smooth=True)
+
+    interpolated = np.interp(xs, np.asarray(curve.xs), np.asarray(curve.ys))
+
+    assert len(curve) < 5000
+    assert np.max(np.abs(interpolated - ys)) <= 2e-3 * np.ptp(ys)
+    assert list(curve.xs) == sorted(curve.xs)
+    assert curve.xs[0] == -5
+    assert curve.xs[-1] == 5
+
+
+def test_plot_adaptive_straight_line_not_refined():
+    curve = Parser('2*x+1').plot_adaptive(-5, 5, columnar=True)
+
+    # Initial points, plus one midpoint per initial interval to check it.
+    assert len(curve) == 65 + 64
+
+
+def test_plot_adaptive_points():
+    test_parser = Parser('x**2')
+    points = test_parser.plot_adaptive(-5, 5)
+
+    assert isinstance(points, list)
+    assert points == test_parser.plot_adaptive(-5, 5, columnar=True).points()
+    assert all(y == x ** 2 for x, y in points)
+
+
+@pytest.mark.parametrize(
+    'expression, undefined',
+    [('1/x', lambda x: x == 0),  # ZeroDivisionError.
+     ('log(x)', lambda x: x <= 0),  # ValueError.
+     ('x^0.5', lambda x: x < 0),  # Complex.
+     ])
+def test_plot_adaptive_undefined_nan(expression, undefined):
+    curve = Parser(expression).plot_adaptive(-5, 5, columnar=True)
+
+    assert [math.isnan(y) for y in curve.ys] == [undefined(x) for x in curve.xs]
+    assert curve.xs[0] == -5
+    assert curve.xs[-1] == 5
+
+
+@pytest.mark.parametrize('max_points', [10, 100, 1000])
+def test_max_points(max_points):
+    curve = sample_adaptive(lambda x: math.sin(x ** 2), -10, 10, max_points=max_points)
+
+    assert len(curve) == max_points
+
+
+def test_non_finite_refined_towards_discontinuity():
+    curve = sample_adaptive(lambda x: 1 / x if x > 0 else math.nan, -1, 1, initial_points=3)
+
+    assert isinstance(curve, Curve)
+    assert 0 < min(x for x in curve.xs if x > 0) < 1e-4
+
+
+def test_bad_initial_points():
+    with pytest.raises(ValueError):
+        sample_adaptive(lambda x: x, -1, 1, initial_points=1)
+    with pytest.raises(ValueError):
+        sample_adaptive(lambda x: x, -1, 1, max_points=1)
+    with pytest.raises(ValueError):
+        Parser('x').plot_adaptive(0, 1, max_points=1)
@@ -0,0 +1,56 @@
+"""Test batch.py"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.parseplot import Parser, plot_many
+from src.parseplot.parse import batch
+
+
+def test_plot_many_matches_plot():
+    expressions = ['x**2', 'y=x+1', 'sin(x)']
+    curves = plot_many(expressions, x_min=-5, x_max=5, smooth=True)
+
+    assert list(curves) == expressions
+    for expression, curve in curves.items():
+        assert curve.points() == Parser(expression).plot(-5, 5, smooth=True)
+
+
+def test_plot_many_domain_shared():
+    curves = plot_many(['x', 'x**2'], domain=[-1, 0, 0.5, 1])
+
+    assert curves['x'].xs is curves['x**2'].xs
+    assert list(curves['x**2'].xs) == [-1, 0, 0.5, 1]
+    assert list(curves['x**2'].ys) == [1, 0, 0.25, 1]
+
+
+def test_plot_many_deduplicates(monkeypatch):
+    """Expressions identical after pre_parse_translate are evaluated once."""
+    evaluated = []
+
+    def mock_evaluate_domain(expression, xs):
+        evaluated.append(expression)
+        return batch.array('d', [0.0] * len(xs))
+
+    monkeypatch.setattr(batch, 'evaluate_domain', mock_evaluate_domain)
+
+    curves = plot_many(['x^2', 'x', 'x**2', 'x^2'], domain=[1, 2])
+
+    assert evaluated == ['x**2', 'x']
+    assert list(curves) == ['x^2', 'x', 'x**2']
+    assert curves['x^2'] is curves['x**2']
+
+
+@pytest.mark.parametrize('parallel_args', [{'processes': 2}, {'executor': 'thread_pool'}])
+def test_plot_many_parallel(parallel_args):
+    expressions = ['x**2', 'x**3', 'x^2', 'abs(x)']
+    expected = plot_many(expressions, x_min=-20, x_max=20)
+
+    if parallel_args.get('executor'):
+        with ThreadPoolExecutor(2) as executor:
+            curves = plot_many(expressions, x_min=-20, x_max=20, executor=executor)
+    else:
+        curves = plot_many(expressions, x_min=-20, x_max=20, **parallel_args)
+
+    assert list(curves) == expressions
+    assert curves == expected
@@ -0,0 +1,72 @@
+"""Test compiled.py"""
+import pickle
+import threading
+
+import pytest
+from plusminus import ArithmeticParser
+
+from src.parseplot.parse.compiled import CompiledExpression
+
+
+@pytest.mark.parametrize(
+    'expression, xs',
+    [('3', [-2, 0, 2]),  # Constant.
+     ('x+2', [-5, -0.5, 0, 3.25]),  # Linear
+     ('x**2-4', [-5, -1.5, 0, 4]),  # Quadratic
+     ('sin(x)+cos(x)**2', [-3.1, 0, 0.7, 12]),  # Functions
+     ('pi*x', [-1, 0, 1]),  # Predefined variables.
+     ('|x-1|', [-2, 1, 4]),  # plusminus absolute value syntax.
+     ])
+def test_evaluate_matches_plusminus(expression, xs):
+    """Compiled evaluation matches re-parsing the expression per x."""
+    compiled = CompiledExpression(expression)
+    reference_parser = ArithmeticParser()
+    for x in xs:
+        reference_parser.evaluate(f"x={x}")
+        assert compiled.evaluate(x) == reference_parser.evaluate(expression)
+
+
+@pytest.mark.parametrize(
+    'expression, expected',
+    [('y=x**2', [4, 0, 9]),
+     ('y = x**2', [4, 0, 9]),
+     ('f <- x**2', [4, 0, 9]),
+     ('x**2==4', [True, False, False]),  # Comparison, not assignment.
+     ])
+def test_assignment_prefix(expression, expected):
+    assert CompiledExpression(expression).evaluate_many([-2, 0, 3]) == expected
+
+
+def test_evaluate_many():
+    compiled = CompiledExpression('x**2+4')
+    assert compiled.evaluate_many(x for x in range(-5, 6)) == [x ** 2 + 4 for x in range(-5, 6)]
+
+
+def test_invalid_expression_raises():
+    with pytest.raises(Exception):
+        CompiledExpression('my test expression')
+
+
+def test_pickle_recompiles():
+    compiled = CompiledExpression('x**3')
+    unpickled = pickle.loads(pickle.dumps(compiled))
+    assert unpickled is not compiled
+    assert unpickled.expression == compiled.expression
+    assert unpickled.evaluate(3) == 27
+
+
+def test_shared_between_threads():
+    compiled = CompiledExpression('x*2')
+    results = {}
+
+    def evaluate_range(offset):
+        results[offset] = compiled.evaluate_many(range(offset, offset + 200))
+
+    threads = [threading.Thread(target=evaluate_range, args=(offset,)) for offset in range(0, 1000, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for offset, ys in results.items():
+        assert ys == [x * 2 for x in range(offset, offset + 200)]
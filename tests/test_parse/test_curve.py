@@ -0,0 +1,61 @@
+"""Test curve.py"""
+from array import array
+
+import numpy as np
+import pytest
+
+from src.parseplot.parse.curve import Curve
+
+
+def test__init__():
+    test_xs, test_ys = array('d', [1, 2, 3]), array('d', [4, 5, 6])
+    test_curve = Curve(test_xs, test_ys)
+
+    assert test_curve.xs is test_xs
+    assert test_curve.ys is test_ys
+
+
+def test__init__mismatched_lengths():
+    with pytest.raises(ValueError):
+        Curve(array('d', [1, 2, 3]), array('d', [4, 5]))
+
+
+def test_slots():
+    test_curve = Curve(array('d'), array('d'))
+    with pytest.raises(AttributeError):
+        test_curve.other = 'not allowed'
+
+
+@pytest.mark.parametrize(
+    'xs, ys',
+    [(array('d', [1, 2, 3]), array('d', [4, 5, 6])),
+     (np.array([1., 2., 3.]), np.array([4., 5., 6.])),
+     ])
+def test_sequence_behaviour(xs, ys):
+    test_curve = Curve(xs, ys)
+
+    assert len(test_curve) == 3
+    assert test_curve[1] == (2, 5)
+    assert test_curve[-1] == (3, 6)
+    assert list(test_curve) == [(1, 4), (2, 5), (3, 6)]
+    assert test_curve.points() == [(1, 4), (2, 5), (3, 6)]
+    assert test_curve.nbytes == 48
+
+
+def test_from_points():
+    test_curve = Curve.from_points([(1, 4), (2, 5), (3, 6)])
+
+    assert test_curve.xs == array('d', [1, 2, 3])
+    assert test_curve.ys == array('d', [4, 5, 6])
+
+
+@pytest.mark.parametrize(
+    'other, equal',
+    [(Curve(array('d', [1, 2]), array('d', [3, 4])), True),
+     (Curve(np.array([1., 2.]), np.array([3., 4.])), True),
+     (Curve(array('d', [1, 2]), array('d', [3, 5])), False),
+     (Curve(array('d', [1]), array('d', [3])), False),
+     ([(1, 3), (2, 4)], False),  # Not a Curve.
+     ])
+def test__eq__(other, equal):
+    assert (Curve(array('d', [1, 2]), array('d', [3, 4])) == other) is equal
@@ -0,0 +1,65 @@
+"""Test expression_cache.py"""
+import pytest
+
+from src.parseplot import Parser
+from src.parseplot.parse import expression_cache
+from src.parseplot.parse.expression_cache import CacheInfo, ExpressionCache
+
+
+def test_get_caches():
+    test_cache = ExpressionCache()
+    compiled = test_cache.get('x**2')
+
+    assert test_cache.get('x**2') is compiled
+    assert test_cache.get(' x**2 ') is compiled  # Surrounding whitespace normalised.
+    assert test_cache.info() == CacheInfo(hits=2, misses=1, evictions=0, maxsize=256, currsize=1)
+
+
+def test_lru_eviction():
+    test_cache = ExpressionCache(maxsize=2)
+    test_cache.get('x')
+    test_cache.get('x**2')
+    test_cache.get('x')  # x now most recently used.
+    test_cache.get('x**3')  # Evicts x**2.
+
+    assert 'x' in test_cache
+    assert 'x**2' not in test_cache
+    assert 'x**3' in test_cache
+    assert test_cache.info() == CacheInfo(hits=1, misses=3, evictions=1, maxsize=2, currsize=2)
+
+
+def test_failed_compile_not_cached():
+    test_cache = ExpressionCache()
+    with pytest.raises(Exception):
+        test_cache.get('my test expression')
+
+    assert len(test_cache) == 0
+    assert test_cache.info().misses == 1
+
+
+def test_clear():
+    test_cache = ExpressionCache()
+    test_cache.get('x')
+    test_cache.get('x')
+    test_cache.clear()
+
+    assert test_cache.info() == CacheInfo(hits=0, misses=0, evictions=0, maxsize=256, currsize=0)
+
+
+@pytest.mark.parametrize('maxsize', [0, -1])
+def test_bad_maxsize(maxsize):
+    with pytest.raises(ValueError):
+        ExpressionCache(maxsize=maxsize)
+
+
+def test_parsers_share_compiled_expression(monkeypatch):
+    test_cache = ExpressionCache()
+    monkeypatch.setattr(expression_cache, 'compiled_expressions', test_cache)
+
+    first_parser = Parser('x^2')
+    second_parser = Parser('x**2')
+
+    assert first_parser.plot(-1, 1) == second_parser.plot(-1, 1)
+    assert first_parser._compiled is second_parser._compiled
+    assert test_cache.info().hits == 1
+    assert test_cache.info().misses == 1
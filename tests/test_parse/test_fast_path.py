@@ -0,0 +1,147 @@
+"""Test fast_path.py, differentially against plusminus."""
+import math
+import pickle
+import random
+
+import pytest
+
+from src.parseplot.parse import compiled as compiled_module
+from src.parseplot.parse.compiled import CompiledExpression
+from src.parseplot.parse.fast_path import round_to_epsilon
+from src.parseplot.parse.pre_parse import pre_parse_translate
+
+XS = [-1e6, -2.5, -1, -0.5, 0, 1e-9, 0.5, 1, 2, 3, 7.25, 100, 1e6]
+
+
+def outcome(compiled, x):
+    """Returns result of evaluating compiled at x, or the exception type raised, comparably."""
+    try:
+        value = compiled.evaluate(x)
+    except Exception as error:
+        return 'raises', type(error)
+    return type(value), repr(value)  # repr, so nan and -0.0 compare.
+
+
+def assert_same_as_plusminus(expression, xs=XS):
+    fast = CompiledExpression(expression, fast_path=True, horner=False)
+    reference = CompiledExpression(expression, fast_path=False, horner=False)
+    assert not reference.is_fast
+    for x in xs:
+        assert outcome(fast, x) == outcome(reference, x), f"{expression} at x={x}"
+
+
+@pytest.mark.parametrize(
+    'expression',
+    ['3', '-4.5', 'x', '-x', '--x', '+x', '−x',
+     'x+2', 'x-2', 'x−2', '2*x', '2×x', 'x/3', 'x÷3', '1/x', 'x//2', 'x mod 3',
+     'x**2', '2**x', 'x**0.5', '-x**2', '2**3**x', 'x**-1', '(x+1)**(x-1)',
+     '10**x', 'x**x',  # Overflow, complex results.
+     'x²', 'x³', 'x°', '√x', '3!', 'x!',
+     'sin(x)', 'cos(x)**2', 'tan(x)', 'asin(x)', 'acos(x)', 'atan(x)', 'sin²(x)', 'sin⁻¹(x)',
+     'sinh(x)', 'tanh(x)', 'ln(x)', 'log(x)', 'log(x, 2)', 'log(x, 10)', 'log2(x)', 'log10(x)',
+     'abs(x)', '|x-1|', 'round(x)', 'round(x, 1)', 'trunc(x)', 'floor(x)', 'ceil(x)',
+     'min(x, 1)', 'max(x, 2, 3)', 'hypot(x, 3)', 'sgn(x)', 'gamma(x)', 'deg(x)', 'rad(x)', 'gcd(x, 4)',
+     'pi*x', 'π*x', 'e**x', 'tau*x', 'phi*x',
+     'sin(x)*x - 3/x', '3*x**3 - 2*x**2 + x - 7', '(x+1)*(x-1)/(x-2)',
+     'y=x**2', 'f <- 2*x',
+     ])
+def test_matches_plusminus(expression):
+    assert CompiledExpression(expression, horner=False).is_fast
+    assert_same_as_plusminus(expression)
+
+
+@pytest.mark.parametrize('expression', ['x²', 'x^3', '3*x^2-2*x+1', 'y=x³'])
+def test_matches_plusminus_pre_parsed(expression):
+    assert CompiledExpression(pre_parse_translate(expression), horner=False).is_fast
+    assert_same_as_plusminus(pre_parse_translate(expression))
+
+
+def random_expression(rng, depth):
+    if depth == 0 or rng.random() < 0.25:
+        return rng.choice(['x', 'x', '0', '1', '2', '2.5', '-3', '1e10', 'pi', 'e'])
+    kind = rng.choice(['binary', 'binary', 'unary', 'postfix', 'function', 'function2'])
+    operand = random_expression(rng, depth - 1)
+    if kind == 'binary':
+        operator = rng.choice(['+', '-', '*', '/', '//', ' mod ', '**'])
+        return f"({operand}){operator}({random_expression(rng, depth - 1)})"
+    if kind == 'unary':
+        return f"-({operand})"
+    if kind == 'postfix':
+        return f"({operand}){rng.choice(['²', '³', '°'])}"
+    if kind == 'function':
+        return f"{rng.choice(['sin', 'cos', 'tan', 'ln', 'log10', 'abs', 'floor', 'round'])}({operand})"
+    return f"{rng.choice(['min', 'max', 'hypot', 'log'])}({operand}, {random_expression(rng, depth - 1)})"
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_expressions_match_plusminus(seed):
+    """
+    Random arithmetic, including errors, overflow and complex results,
+    matches plusminus, whether or not it is supported by the fast path.
+    """
+    rng = random.Random(seed)
+    for _ in range(15):
+        expression = random_expression(rng, depth=2)
+        assert_same_as_plusminus(expression, xs=rng.sample(XS, 5))
+
+
+@pytest.mark.parametrize(
+    'expression',
+    ['x < 1',  # Comparison.
+     'x < 1 ? 1 : 2',  # Ternary.
+     'x > 0 and x < 2',  # Logical operator.
+     '(x)-(e)',  # Set difference, to plusminus.
+     'str(x)',  # Non-numeric function.
+     'sin(x, 2)',  # Wrong number of args, raising when evaluated.
+     ])
+def test_unsupported_falls_back_to_plusminus(expression):
+    compiled = CompiledExpression(expression)
+    assert not compiled.is_fast
+    assert outcome(compiled, 0.5) == outcome(CompiledExpression(expression, fast_path=False), 0.5)
+
+
+def test_evaluate_many():
+    compiled = CompiledExpression('x**2+4', horner=False)
+    assert compiled.is_fast
+    assert compiled.evaluate_many(range(-5, 6)) == [x ** 2 + 4 for x in range(-5, 6)]
+
+
+def test_fast_path_default(monkeypatch):
+    assert CompiledExpression('sin(x)').is_fast
+    monkeypatch.setattr(compiled_module, 'FAST_PATH', False)
+    assert not CompiledExpression('sin(x)').is_fast
+    assert CompiledExpression('sin(x)', fast_path=True).is_fast
+
+
+def test_pickle_keeps_fast_path_setting():
+    unpickled = pickle.loads(pickle.dumps(CompiledExpression('sin(x)**3', fast_path=False)))
+    assert not unpickled.is_fast
+    assert unpickled.evaluate(0) == 0
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [(2.0, 2),
+     (2.0000000000000004, 2),
+     (0.5, 0.5),
+     (1e-16, 0),
+     (complex(1.5, 1e-16), 1.5),
+     (complex(1e-16, 2), 2j),
+     (-1e-16, 0),
+     (7.999999999999999, 7.999999999999999),
+     (8.000000000000002, 8),
+     (123456.0000000001, 123456),
+     (2999999999.9999, 2999999999),  # Within relative tolerance.
+     (1e15, 1e15),
+     (math.inf, math.inf),
+     (7, 7),
+     (complex(0, 0), 0),
+     ])
+def test_round_to_epsilon(value, expected):
+    rounded = round_to_epsilon(value)
+    assert rounded == expected
+    assert type(rounded) is type(expected)
+
+
+def test_round_to_epsilon_nan():
+    assert math.isnan(round_to_epsilon(math.nan))
@@ -0,0 +1,52 @@
+"""Test parallel.py"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.parseplot import Parser
+from src.parseplot.parse import parallel
+from src.parseplot.parse.parallel import evaluate_chunk, evaluate_parallel, partition
+
+
+@pytest.mark.parametrize(
+    'length, workers, expected',
+    [(1, 4, [(0, 1)]),  # Single point.
+     (100, 4, [(0, 100)]),  # Too few points to be worth splitting.
+     (4096, 4, [(0, 2048), (2048, 4096)]),
+     (5000, 1, [(0, 2500), (2500, 5000)]),
+     (4097, 2, [(0, 2049), (2049, 4097)]),  # Remainder spread across chunks.
+     (10 ** 6, 2, [(i * 125000, (i + 1) * 125000) for i in range(8)]),  # CHUNKS_PER_WORKER per worker.
+     ])
+def test_partition(length, workers, expected):
+    assert partition(length, workers) == expected
+
+
+def test_evaluate_chunk():
+    xs, ys = evaluate_chunk('x**2', -5, 0.5, 2, 6)
+
+    assert list(xs) == [-4, -3.5, -3, -2.5]
+    assert list(ys) == [16, 12.25, 9, 6.25]
+
+
+def test_evaluate_parallel_ordered(monkeypatch):
+    """Chunks are reassembled in domain order."""
+    monkeypatch.setattr(parallel, 'MIN_CHUNK_SIZE', 3)
+    test_parser = Parser('x**3-x')
+
+    with ThreadPoolExecutor(4) as executor:
+        curve = evaluate_parallel(test_parser._expression, -50, 51, 1, processes=4, executor=executor)
+
+    assert curve.points() == test_parser.plot(-50, 50)
+
+
+@pytest.mark.parametrize(
+    'plot_args',
+    [{'x_min': -5, 'x_max': 5},
+     {'x_min': -5, 'x_max': 5, 'n': 5000},
+     ])
+def test_plot_processes(plot_args):
+    test_parser = Parser('y=sin(x)*x^2')
+    expected = test_parser.plot(**plot_args)
+
+    assert test_parser.plot(**plot_args, processes=2) == expected
+    assert test_parser.plot(**plot_args, processes=2, columnar=True).points() == expected
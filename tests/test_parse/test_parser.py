@@ -1,9 +1,13 @@
 """Test parser.py"""
+import asyncio
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from src.parseplot.parse import parser
 
-from src.parseplot import Parser
+from src.parseplot import Curve, Parser
 
 
 def test__init__(monkeypatch):
@@ -81,3 +85,200 @@ def test_plot_default_args():
 def test_plot_n_smooth_very_smooth_args(test_expression, plot_args, num_points):
     test_parser = Parser(test_expression)
     assert len(test_parser.plot(**plot_args)) == num_points
+
+
+def test_expression_reassignment_recompiles():
+    test_parser = Parser('x+1')
+    assert test_parser.plot(0, 2) == [(0, 1), (1, 2), (2, 3)]
+
+    test_parser.expression = 'x^2'
+    assert test_parser.plot(0, 2) == [(0, 0), (1, 1), (2, 4)]
+
+
+@pytest.mark.parametrize(
+    'plot_args',
+    [{'x_min': -5, 'x_max': 5},
+     {'x_min': -5, 'x_max': 5, 'smooth': True},
+     {'x_min': -5000, 'x_max': 5000},  # Spans several evaluation chunks.
+     ])
+def test_plot_columnar(plot_args):
+    test_parser = Parser('x**2-4')
+    curve = test_parser.plot(**plot_args, columnar=True)
+
+    assert isinstance(curve, Curve)
+    assert isinstance(curve.xs, array)
+    assert isinstance(curve.ys, array)
+    assert curve.points() == test_parser.plot(**plot_args)
+
+
+class CountingEvaluations:
+    """Wraps a Parser's compiled expression, counting points evaluated."""
+    def __init__(self, test_parser):
+        self.compiled = test_parser._compiled
+        self.evaluated = 0
+        test_parser._compiled_expression = self
+
+    def evaluate_many(self, xs):
+        self.evaluated += len(xs)
+        return self.compiled.evaluate_many(xs)
+
+
+@pytest.mark.parametrize(
+    'first_args, second_args, evaluated',
+    [({'x_min': -100, 'x_max': 100}, {'x_min': -90, 'x_max': 110}, 10),  # Pan right.
+     ({'x_min': -100, 'x_max': 100}, {'x_min': -120, 'x_max': 80}, 20),  # Pan left.
+     ({'x_min': -100, 'x_max': 100}, {'x_min': -150, 'x_max': 150}, 100),  # Zoom out.
+     ({'x_min': -100, 'x_max': 100}, {'x_min': -50, 'x_max': 50}, 0),  # Zoom in.
+     ({'x_min': -100, 'x_max': 100}, {'x_min': -100, 'x_max': 100}, 0),  # Same domain.
+     ({'x_min': -100, 'x_max': 100}, {'x_min': 200, 'x_max': 300}, 101),  # Disjoint.
+     ({'x_min': -100, 'x_max': 100}, {'x_min': -99.5, 'x_max': 100.5}, 201),  # Off grid.
+     ({'x_min': -100, 'x_max': 100}, {'x_min': -100, 'x_max': 100, 'n': 101}, 101),  # Different step.
+     # Fractional step: shared x values rounded differently are evaluated again.
+     ({'x_min': -5, 'x_max': 5, 'n': 1001}, {'x_min': -4, 'x_max': 6, 'n': 1001}, 254),
+     ({'x_min': -5, 'x_max': 5, 'n': 1001}, {'x_min': -4.9, 'x_max': 5.1, 'n': 1001}, 480),
+     ])
+@pytest.mark.parametrize('columnar', [False, True])
+def test_plot_incremental(first_args, second_args, evaluated, columnar):
+    test_parser = Parser('sin(x) * x**2')
+    test_parser.plot(**first_args, columnar=columnar)
+    counter = CountingEvaluations(test_parser)
+
+    points = test_parser.plot(**second_args, columnar=columnar)
+
+    assert counter.evaluated == evaluated
+    fresh = Parser('sin(x) * x**2').plot(**second_args, columnar=columnar, incremental=False)
+    assert [x for x, _ in points] == [x for x, _ in fresh]
+    assert [y for _, y in points] == [y for _, y in fresh]
+
+
+@pytest.mark.parametrize('expression', ['x^2', 'x>0', 'x^0.5'])
+@pytest.mark.parametrize('first_columnar', [False, True])
+def test_plot_incremental_same_types(expression, first_columnar):
+    """Points are as evaluated, whatever was plotted before, eg ints and bools rather than floats."""
+    test_parser = Parser(expression)
+    try:
+        test_parser.plot(-2, 2, columnar=first_columnar)
+    except TypeError:  # Complex y values can't be plotted columnar.
+        pass
+
+    points = test_parser.plot(-2, 2)
+
+    fresh = Parser(expression).plot(-2, 2, incremental=False)
+    assert points == fresh
+    assert [type(y) for _, y in points] == [type(y) for _, y in fresh]
+
+
+def test_plot_incremental_disabled():
+    test_parser = Parser('x**2')
+    test_parser.plot(-100, 100, incremental=False)
+    counter = CountingEvaluations(test_parser)
+
+    test_parser.plot(-90, 110)
+
+    assert counter.evaluated == 201
+
+
+def test_plot_incremental_expression_reassigned():
+    test_parser = Parser('x**2')
+    test_parser.plot(-10, 10)
+    test_parser.expression = 'x**3'
+
+    assert test_parser.plot(-10, 10) == Parser('x**3').plot(-10, 10)
+
+
+def test_plot_incremental_retained_not_shared():
+    test_parser = Parser('x**2')
+    curve = test_parser.plot(-10, 10, columnar=True)
+    curve.ys[10] = 12345.0
+
+    assert test_parser.plot(-10, 10, columnar=True) == Parser('x**2').plot(-10, 10, columnar=True)
+
+
+@pytest.mark.parametrize(
+    'plot_args',
+    [{'x_min': -5, 'x_max': 5},
+     {'x_min': -5, 'x_max': 5, 'n': 7},
+     {'x_min': -5, 'x_max': 5, 'columnar': True},
+     ])
+def test_aplot(plot_args):
+    test_parser = Parser('x**2-4')
+
+    assert asyncio.run(test_parser.aplot(**plot_args)) == test_parser.plot(**plot_args)
+
+
+def test_aplot_executor():
+    test_parser = Parser('x**2-4')
+
+    with ThreadPoolExecutor(1, thread_name_prefix='test_aplot') as test_executor:
+        points = asyncio.run(test_parser.aplot(-5, 5, executor=test_executor))
+
+    assert points == test_parser.plot(-5, 5)
+
+
+@pytest.mark.parametrize(
+    'plot_args',
+    [{'x_min': -5, 'x_max': 5},
+     {'x_min': -5, 'x_max': 5, 'n': 7},
+     {'x_min': -5, 'x_max': 5, 'very_smooth': True},
+     {'x_min': -5000, 'x_max': 5000},  # Spans several evaluation chunks.
+     ])
+def test_iter_points(plot_args):
+    test_parser = Parser('x**2-4')
+    points = test_parser.iter_points(**plot_args)
+
+    assert not isinstance(points, list)
+    assert list(points) == test_parser.plot(**plot_args)
+
+
+@pytest.mark.parametrize(
+    'chunk_size, chunk_lengths',
+    [(1, [1] * 11),
+     (4, [4, 4, 3]),
+     (11, [11]),
+     (100, [11]),
+     ])
+def test_iter_points_chunked(chunk_size, chunk_lengths):
+    test_parser = Parser('x**2-4')
+    chunks = list(test_parser.iter_points(-5, 5, chunk_size=chunk_size))
+
+    assert all(isinstance(chunk, Curve) for chunk in chunks)
+    assert [len(chunk) for chunk in chunks] == chunk_lengths
+    assert [point for chunk in chunks for point in chunk] == test_parser.plot(-5, 5)
+
+
+def test_iter_points_lazy(monkeypatch):
+    """Points are only evaluated as they are consumed."""
+    test_parser = Parser('x')
+    evaluated = []
+    evaluate_many = test_parser._compiled.evaluate_many
+
+    def mock_evaluate_many(xs):
+        evaluated.extend(xs)
+        return evaluate_many(xs)
+
+    monkeypatch.setattr(test_parser._compiled, 'evaluate_many', mock_evaluate_many)
+
+    chunks = test_parser.iter_points(0, 10 ** 9, chunk_size=10)
+    assert next(chunks).points() == [(x, x) for x in range(10)]
+    assert len(evaluated) == 10
+
+
+@pytest.mark.parametrize('chunk_size', [0, -1])
+def test_iter_points_bad_chunk_size(chunk_size):
+    with pytest.raises(ValueError):
+        list(Parser('x').iter_points(chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize(
+    'start, end, step',
+    [(-2, 3, 1),
+     (-5, 5 + 10 / 6, 10 / 6),
+     (0, 1 + 1 / 4999, 1 / 4999),
+     (-500, 501, 1),
+     (0.1, 0.7, 0.1),
+     (3, 2, 1),  # End before start.
+     (3, 3, 0),  # Zero step.
+     (5, -6, -1),  # Negative step.
+     ])
+def test_float_range_length(start, end, step):
+    assert Parser.float_range_length(start, end, step) == len(list(Parser.float_range(start, end, step)))
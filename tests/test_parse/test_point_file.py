@@ -0,0 +1,111 @@
+"""Test point_file.py"""
+import math
+from array import array
+
+import numpy as np
+import pytest
+
+from src.parseplot import Curve, Parser
+from src.parseplot.parse.point_file import (PointFileHeader,
+                                            read_point_file,
+                                            read_point_file_header,
+                                            write_point_file,
+                                            )
+
+
+@pytest.mark.parametrize(
+    'test_curve',
+    [Curve(array('d', [1, 2, 3]), array('d', [1, 4, 9])),
+     Curve(np.linspace(-1, 1, 10_001), np.linspace(-1, 1, 10_001) ** 3),
+     Curve(np.arange(10.0)[::2], np.arange(5.0)),  # Non-contiguous.
+     Curve([0, 1], [math.nan, math.inf]),  # Not buffers.
+     Curve(array('d'), array('d')),  # Empty.
+     ])
+def test_round_trip(tmp_path, test_curve):
+    filepath = write_point_file(tmp_path / 'curve.pplt', test_curve)
+    header, curve = read_point_file(filepath)
+
+    assert header.length == len(test_curve)
+    assert np.array_equal(np.asarray(curve.xs), np.asarray(test_curve.xs, dtype=float))
+    assert np.array_equal(np.asarray(curve.ys), np.asarray(test_curve.ys, dtype=float), equal_nan=True)
+
+
+@pytest.mark.parametrize('expression', ['', 'x**2', 'y=sin(x) * π', 'x' * 1001])
+def test_header(tmp_path, expression):
+    test_curve = Curve(array('d', [1, 2]), array('d', [3, 4]))
+    filepath = write_point_file(tmp_path / 'curve.pplt', test_curve,
+                                expression=expression, start=1, end=3, step=1)
+
+    expected = PointFileHeader(expression, 1.0, 3.0, 1.0, 2, 'd')
+    assert read_point_file_header(filepath) == expected
+    header, curve = read_point_file(filepath)
+    assert header == expected
+    assert curve == test_curve
+
+
+def test_domain_defaults_nan(tmp_path):
+    header = read_point_file_header(write_point_file(tmp_path / 'curve.pplt', Curve([1], [2])))
+
+    assert all(math.isnan(value) for value in (header.start, header.end, header.step))
+
+
+def test_read_memory_mapped(tmp_path):
+    filepath = write_point_file(tmp_path / 'curve.pplt', Curve(np.arange(1000.0), np.arange(1000.0)))
+    _, curve = read_point_file(filepath)
+
+    assert isinstance(curve.xs, memoryview)
+    assert curve.xs.readonly
+    assert np.asarray(curve.ys).base is not None  # A view, not a copy.
+
+
+def test_size_compact(tmp_path):
+    filepath = write_point_file(tmp_path / 'curve.pplt', Curve(np.arange(1000.0), np.arange(1000.0)),
+                                expression='x')
+
+    assert filepath.stat().st_size < 1000 * 16 + 64
+
+
+@pytest.mark.parametrize('contents',
+                         [b'',
+                          b'not a point file' * 10,
+                          ])
+def test_not_point_file(tmp_path, contents):
+    filepath = tmp_path / 'curve.pplt'
+    filepath.write_bytes(contents)
+
+    with pytest.raises(ValueError):
+        read_point_file(filepath)
+    with pytest.raises(ValueError):
+        read_point_file_header(filepath)
+
+
+def test_truncated(tmp_path):
+    filepath = write_point_file(tmp_path / 'curve.pplt', Curve(np.arange(100.0), np.arange(100.0)))
+    filepath.write_bytes(filepath.read_bytes()[:-8])
+
+    with pytest.raises(ValueError):
+        read_point_file(filepath)
+
+
+def test_overwrite(tmp_path):
+    filepath = tmp_path / 'curve.pplt'
+    write_point_file(filepath, Curve([1], [1]))
+    write_point_file(filepath, Curve([1, 2], [1, 2]))
+
+    assert read_point_file_header(filepath).length == 2
+    assert list(tmp_path.iterdir()) == [filepath]  # No temporary files left.
+
+
+@pytest.mark.parametrize('filename, saved_filename',
+                         [('plot', 'plot.pplt'),
+                          ('plot.pplt', 'plot.pplt'),
+                          ])
+def test_parser_save_plot(tmp_path, filename, saved_filename):
+    test_parser = Parser('x**2 - 4')
+
+    filepath = test_parser.save_plot(tmp_path / filename, -5, 5, n=11)
+
+    assert filepath == tmp_path / saved_filename
+    header, curve = read_point_file(filepath)
+    assert header == PointFileHeader('x**2 - 4', -5.0, 6.0, 1.0, 11, 'd')
+    assert curve == test_parser.plot(-5, 5, n=11, columnar=True)
@@ -0,0 +1,154 @@
+"""Test polynomial.py"""
+import math
+import pickle
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from src.parseplot.parse.compiled import CompiledExpression
+from src.parseplot.parse.expression_cache import compile_expression
+from src.parseplot.parse.parser import Parser
+from src.parseplot.parse.polynomial import MAX_DEGREE, Polynomial, detect_polynomial
+from src.parseplot.parse.pre_parse import pre_parse_translate
+from src.parseplot.parse.vectorize import VectorizedExpression
+
+
+def detected(expression):
+    return detect_polynomial(CompiledExpression(pre_parse_translate(expression), horner=False)._tree)
+
+
+@pytest.mark.parametrize(
+    'expression, coefficients',
+    [('3*x^3 - 2*x^2 + x - 7', [-7, 1, -2, 3]),
+     ('5', [5]),
+     ('x', [0, 1]),
+     ('-x', [0, -1]),
+     ('x/2 + 1', [1, 0.5]),
+     ('2*x*x', [0, 0, 2]),
+     ('x²+x³', [0, 0, 1, 1]),
+     ('(2*x)^3', [0, 0, 0, 8]),
+     ('x^2^2', [0, 0, 0, 0, 1]),
+     ('x^2.0', [0, 0, 1]),
+     ('x**0', [1]),
+     ('-(x+1)', [-1, -1]),
+     ('(x + 1)/4', [0.25, 0.25]),
+     ('2*(x + 1)', [2, 2]),
+     ('sin(pi/2)*x^2', [0, 0, 1.0]),
+     ('pi*x', [0, math.pi]),
+     ('x - x', [0]),
+     ('y=x^2', [0, 0, 1]),
+     ])
+def test_detect_polynomial(expression, coefficients):
+    assert detected(expression) == Polynomial(coefficients)
+
+
+@pytest.mark.parametrize(
+    'expression',
+    ['sin(x)',
+     '1/x',
+     'x^-1',
+     'x^0.5',
+     '2^x',
+     'x^x',
+     f'x^{MAX_DEGREE + 1}',
+     'x*(x+1)',  # Products and powers of sums aren't expanded.
+     '(x-1)^10',
+     'x mod 2',
+     'x // 2',
+     'x < 1',
+     'x/0',
+     'rnd()*x',  # Random, not constant.
+     ])
+def test_not_polynomial(expression):
+    assert detected(expression) is None
+
+
+def test_polynomial_trims_zero_leading_coefficients():
+    polynomial = Polynomial([1, 2, 0, 0])
+    assert polynomial.coefficients == (1, 2)
+    assert polynomial.degree == 1
+    assert Polynomial([]).coefficients == (0,)
+
+
+@pytest.mark.parametrize(
+    'coefficients, x, expected',
+    [([-7, 1, -2, 3], 2, 11),
+     ([-7, 1, -2, 3], 0.5, -6.625),
+     ([0, 0, 1], -3, 9),
+     ([4], 10, 4),
+     ([0, -1], 2.5, -2.5),
+     ])
+def test_evaluate(coefficients, x, expected):
+    assert Polynomial(coefficients).evaluate(x) == expected
+
+
+def test_evaluate_array():
+    polynomial = Polynomial([-7, 1, -2, 3])
+    xs = np.linspace(-10, 10, 101)
+    np.testing.assert_array_equal(polynomial.evaluate(xs), [polynomial.evaluate(x) for x in xs])
+
+
+def test_evaluate_accuracy():
+    """Horner's scheme is accurate to a few ulps of the exact value."""
+    coefficients = [-7, 1.5, -2.25, 3.125, 0.0625]
+    polynomial = Polynomial(coefficients)
+    for x in np.linspace(-50, 50, 1001):
+        exact = sum(Fraction(c) * Fraction(x) ** power for power, c in enumerate(coefficients))
+        assert math.isclose(polynomial.evaluate(x), exact, rel_tol=1e-14, abs_tol=1e-12)
+
+
+@pytest.mark.parametrize('expression', ['3*x^3 - 2*x^2 + x - 7', 'x^2', 'x/3 - 0.1', '2.5*x^4 + x^2'])
+def test_compiled_matches_plusminus(expression):
+    translated = pre_parse_translate(expression)
+    compiled = CompiledExpression(translated)
+    reference = CompiledExpression(translated, fast_path=False, horner=False)
+    assert compiled.polynomial is not None
+    for x in np.linspace(-100, 100, 201):
+        assert math.isclose(compiled.evaluate(x), reference.evaluate(x), rel_tol=1e-12, abs_tol=1e-12)
+
+
+def test_compiled_rounds_to_epsilon():
+    compiled = CompiledExpression('x*3')
+    assert compiled.polynomial is not None
+    assert compiled.evaluate(0.1) == 0.3  # Not 0.30000000000000004.
+    assert type(compiled.evaluate(2.0)) is int
+
+
+def test_compiled_large_values_inf_not_overflow_error():
+    assert CompiledExpression('x**2').evaluate(1e200) == math.inf
+    with pytest.raises(OverflowError):
+        CompiledExpression('x**2', horner=False).evaluate(1e200)
+
+
+def test_horner_disabled():
+    compiled = CompiledExpression('x**2', horner=False)
+    assert compiled.polynomial is None
+    unpickled = pickle.loads(pickle.dumps(compiled))
+    assert unpickled.polynomial is None
+
+
+def test_detection_cached_per_expression():
+    first = compile_expression('x**3 + x')
+    assert first.polynomial == Polynomial([0, 1, 0, 1])
+    assert compile_expression('x**3 + x').polynomial is first.polynomial
+
+
+def test_vectorized_polynomial():
+    compiled = CompiledExpression('3*x**3 - 2*x**2 + x - 7')
+    xs = np.linspace(-10, 10, 1001)
+    ys = VectorizedExpression(compiled).evaluate(xs)
+    tree_ys = VectorizedExpression(CompiledExpression(compiled.expression, horner=False)).evaluate(xs)
+    np.testing.assert_allclose(ys, tree_ys, rtol=1e-12, atol=1e-12)
+    scalar_ys = np.array(compiled.evaluate_many(xs.tolist()), dtype=float)  # Floats, as Parser evaluates.
+    unrounded = np.abs(scalar_ys) >= 8
+    np.testing.assert_array_equal(ys[unrounded], scalar_ys[unrounded])
+    # Rounded to 15 places by NumPy rather than Python, within an ulp.
+    np.testing.assert_allclose(ys, scalar_ys, rtol=1e-15, atol=0)
+
+
+def test_parser_plot_polynomial():
+    parser = Parser('3*x^2-2*x+1')
+    assert parser._compiled.polynomial == Polynomial([1, -2, 3])
+    xs, ys = parser.plot_arrays(-5, 5)
+    assert ys.tolist() == [y for _, y in parser.plot(-5, 5)] == [3 * x ** 2 - 2 * x + 1 for x in range(-5, 6)]
@@ -0,0 +1,83 @@
+"""Test result_cache.py"""
+from array import array
+
+import numpy as np
+import pytest
+
+from src.parseplot import Curve, Parser
+from src.parseplot.parse.result_cache import ResultCache
+
+
+def test_key_normalised():
+    assert ResultCache.key('x**2', -5, 5, 1) == ResultCache.key(' x**2', -5.0, 5.0, 1.0)
+    assert ResultCache.key('x**2', -5, 5, 1) != ResultCache.key('x**3', -5, 5, 1)
+    assert ResultCache.key('x**2', -5, 5, 1) != ResultCache.key('x**2', -5, 5, 0.5)
+
+
+def test_get_put():
+    test_cache = ResultCache()
+    test_curve = Curve(array('d', [1, 2]), array('d', [3, 4]))
+
+    assert test_cache.get('key') is None
+    cached = test_cache.put('key', test_curve)
+
+    assert cached == test_curve
+    assert test_cache.get('key') is cached
+    assert test_cache.info().hits == 1
+    assert test_cache.info().misses == 1
+    assert test_cache.info().currbytes == 32
+
+
+def test_cached_curves_read_only():
+    test_cache = ResultCache()
+    cached = test_cache.put('key', Curve(array('d', [1, 2]), array('d', [3, 4])))
+
+    with pytest.raises(ValueError):
+        cached.ys[0] = 10
+
+
+def test_eviction_by_bytes():
+    test_cache = ResultCache(max_bytes=100)
+    for key in ('a', 'b', 'c'):
+        test_cache.put(key, Curve(array('d', [0] * 3), array('d', [0] * 3)))  # 48 bytes each.
+
+    assert test_cache.get('a') is None
+    assert test_cache.get('b') is not None
+    assert test_cache.get('c') is not None
+    assert test_cache.info().evictions == 1
+    assert test_cache.info().currbytes == 96
+
+
+def test_disk_tier(tmp_path):
+    test_curve = Curve(array('d', [1, 2, 3]), array('d', [4, 5, 6]))
+    ResultCache(directory=tmp_path).put('key', test_curve)
+    assert [path.name for path in tmp_path.iterdir()] == ['key.npy']  # No temporary files left.
+
+    restarted_cache = ResultCache(directory=tmp_path)
+    cached = restarted_cache.get('key')
+
+    assert cached == test_curve
+    assert isinstance(cached.xs.base, np.memmap)
+    assert restarted_cache.info().disk_hits == 1
+    assert restarted_cache.get('key') is cached  # Promoted to memory.
+
+
+def test_disk_tier_unreadable_file(tmp_path):
+    (tmp_path / 'key.npy').write_bytes(b'not an npy file')
+
+    assert ResultCache(directory=tmp_path).get('key') is None
+
+
+def test_plot_cache(monkeypatch, tmp_path):
+    test_cache = ResultCache(directory=tmp_path)
+    test_parser = Parser('x**2-4')
+    expected = test_parser.plot(-5, 5, n=500)
+
+    assert test_parser.plot(-5, 5, n=500, cache=test_cache) == expected
+
+    # Second plot served from cache, with equivalent sampling args.
+    monkeypatch.setattr(test_parser, '_plot_curve', None)
+    assert test_parser.plot(-5, 5, smooth=True, cache=test_cache) == expected
+    assert test_parser.plot(-5, 5, n=500, cache=test_cache, columnar=True).points() == expected
+    assert Parser('x^2-4').plot(-5, 5, n=500, cache=test_cache) == expected
+    assert test_cache.info().hits == 3
@@ -0,0 +1,70 @@
+"""Test simplify.py"""
+import ast
+
+import pytest
+
+from src.parseplot.parse.compiled import CompiledExpression
+from src.parseplot.parse.fast_path import lower_fast_path
+from src.parseplot.parse.pre_parse import pre_parse_translate
+
+XS = [-1e6, -2.5, -1, 0, 0.5, 1, 3, 1e6]
+
+
+def simplified(expression):
+    """Returns source of expression's simplified fast path lambda body, without rounding call."""
+    compiled = CompiledExpression(pre_parse_translate(expression), fast_path=False)
+    lambda_expression, namespace = lower_fast_path(compiled._tree, compiled._parser.vars())
+    body = lambda_expression.body.body
+    names = {name: getattr(value, '__name__', name) for name, value in namespace.items()}
+    for node in ast.walk(body):
+        if isinstance(node, ast.Name) and node.id in names:
+            node.id = names[node.id]
+    return ast.unparse(body.args[0])
+
+
+@pytest.mark.parametrize(
+    'expression, expected',
+    [('2*3*x^2 + 0*x + (4-4)', '6 * safe_pow(x, 2) + 0 * x'),  # Folded, identities removed.
+     ('pi*2*x', '6.283185307179586 * x'),  # Variables folded.
+     ('sin(pi/2)*x', '1.0 * x'),
+     ('x*1 + 0', 'x'),
+     ('1*x - 0', 'x'),
+     ('0 + x**1', 'x'),
+     ('--x', 'x'),
+     ('x*2*3', 'x * 2 * 3'),  # Not reordered.
+     ('x*1.0', 'x * 1.0'),  # Would change int x's type.
+     ('bool(x) + 0', '<lambda>(x) + 0'),  # Would change result type.
+     ('1/0 + x', '1 / 0 + x'),  # Raises for every x.
+     ('sin(x)*sin(x) + cos(x)', '(_t0 := sin(x)) * _t0 + cos(x)'),
+     ('(x+1)**2 + 3*(x+1)', 'safe_pow((_t0 := (x + 1)), 2) + 3 * _t0'),
+     ('sin(x)*2 + sin(x)*2', '(_t0 := (sin(x) * 2)) + _t0'),
+     ('rnd()*x + rnd()*x', 'random() * x + random() * x'),  # Impure.
+     ])
+def test_simplify(expression, expected):
+    assert simplified(expression) == expected
+
+
+@pytest.mark.parametrize(
+    'expression',
+    ['2*3*x^2 + 0*x + (4-4)', 'x*1 + 0 - 0', '--x + 1*x', 'sin(x)*sin(x) + sin(x)',
+     '(x+1)**2 + 3*(x+1) - (x+1)**2', 'ln(x)*ln(x) + 2**1', '1/(x-1) + 1/(x-1)', 'sin(pi)*x + 0',
+     '(2**0.5)**x', '0 + ceil(x) + 0', 'x**1**2', 'y=x^2+0*1'])
+def test_simplified_matches_plusminus(expression):
+    translated = pre_parse_translate(expression)
+    fast = CompiledExpression(translated, fast_path=True, horner=False)
+    reference = CompiledExpression(translated, fast_path=False, horner=False)
+    assert fast.is_fast
+    for x in XS:
+        try:
+            expected = reference.evaluate(x)
+        except Exception as error:
+            with pytest.raises(type(error)):
+                fast.evaluate(x)
+        else:
+            assert repr(fast.evaluate(x)) == repr(expected)
+
+
+def test_constant_expression_folded():
+    lambda_expression, _ = lower_fast_path(CompiledExpression('2*3+4')._tree, {})
+    assert isinstance(lambda_expression.body.body, ast.Constant)
+    assert lambda_expression.body.body.value == 10
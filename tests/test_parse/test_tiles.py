@@ -0,0 +1,145 @@
+"""Test tiles.py"""
+import numpy as np
+import pytest
+
+from src.parseplot import Parser
+from src.parseplot.parse.tiles import Tile, TilePyramid, tiles_curve
+
+
+@pytest.fixture(scope='module')
+def pyramid():
+    return TilePyramid('sin(x) * x', -100, 100, levels=6, tile_size=16)
+
+
+def test_levels(pyramid):
+    assert pyramid.levels == 6
+    assert [pyramid.tile_count(level) for level in range(6)] == [32, 16, 8, 4, 2, 1]
+
+
+def test_level_0_full_resolution(pyramid):
+    xs = np.linspace(-100, 100, 16 * 2 ** 5)
+    tile = pyramid.tile(0, 3)
+
+    assert np.array_equal(tile.xs, xs[48:64])
+    assert np.allclose(tile.y_min, np.sin(xs[48:64]) * xs[48:64])
+    assert np.array_equal(tile.y_min, tile.y_max)
+
+
+@pytest.mark.parametrize('level', [1, 3, 5])
+def test_envelopes(pyramid, level):
+    xs = np.linspace(-100, 100, 16 * 2 ** 5)
+    ys = np.sin(xs) * xs
+    tile = pyramid.tile(level, 0)
+    bins = ys[:16 * 2 ** level].reshape(16, 2 ** level)
+
+    assert np.array_equal(tile.xs, xs[:16 * 2 ** level:2 ** level])
+    assert np.allclose(tile.y_min, bins.min(axis=1))
+    assert np.allclose(tile.y_max, bins.max(axis=1))
+
+
+def test_extremes_preserved(pyramid):
+    top = pyramid.tile(pyramid.levels - 1, 0)
+    level_0 = pyramid.tile(0, 0).y_min.base  # Whole level 0.
+
+    assert top.y_min.min() == np.nanmin(level_0)
+    assert top.y_max.max() == np.nanmax(level_0)
+
+
+def test_nan_ignored():
+    tile = TilePyramid('x**0.5', -1, 1, levels=3, tile_size=4).tile(2, 0)
+
+    assert np.isnan(tile.y_min[:2]).all()  # Bins wholly < 0.
+    assert not np.isnan(tile.y_max[2:]).any()  # Bins partly >= 0.
+
+
+def test_large_magnitudes():
+    tile = TilePyramid('10**x', 295, 300, levels=2, tile_size=3).tile(1, 0)
+
+    assert tile.y_max.tolist() == [Parser('10**x').plot(x, x)[0][1] for x in (296, 298, 300)]
+
+
+def test_tiles_are_views(pyramid):
+    assert pyramid.tile(2, 1).y_max.base is not None
+
+
+@pytest.mark.parametrize('level, index', [(6, 0), (-1, 0), (0, 32), (5, 1), (0, -1)])
+def test_tile_index_error(pyramid, level, index):
+    with pytest.raises(IndexError):
+        pyramid.tile(level, index)
+
+
+@pytest.mark.parametrize(
+    'x_start, x_end, resolution, level',
+    [(-100, 100, 1, 5),  # Coarsest.
+     (-100, 100, 32, 4),
+     (-100, 100, 10_000, 0),  # Finer than level 0.
+     (0, 10, 4, 2),
+     (-10, 10, 16, 1),
+     (-150, -90, 8, 4),  # Window partly outside domain.
+     ])
+def test_query(pyramid, x_start, x_end, resolution, level):
+    tiles = pyramid.query(x_start, x_end, resolution)
+
+    assert {tile.level for tile in tiles} == {level}
+    indices = [tile.position for tile in tiles]
+    assert indices == list(range(indices[0], indices[-1] + 1))
+    # Tiles cover the window, within the domain, and no more.
+    assert tiles[0].xs[0] <= max(x_start, -100)
+    if indices[0] > 0:
+        assert pyramid.tile(level, indices[0] - 1).xs[-1] < x_start
+    if indices[-1] + 1 < pyramid.tile_count(level):
+        assert pyramid.tile(level, indices[-1] + 1).xs[0] > x_end
+
+
+def test_query_outside_domain(pyramid):
+    assert pyramid.query(200, 300, 8) == []
+
+
+@pytest.mark.parametrize('resolution', [10, 50, 100])
+def test_query_resolution(pyramid, resolution):
+    """Coarsest level with at least resolution bins in the window."""
+    def bins_in_window(level):
+        xs = np.linspace(-100, 100, 16 * 2 ** 5)[::2 ** level]
+        return ((-50 <= xs) & (xs <= 50)).sum()
+
+    level = pyramid.query(-50, 50, resolution)[0].level
+
+    assert bins_in_window(level) >= resolution
+    assert bins_in_window(level + 1) < resolution
+
+
+def test_tiles_curve_level_0(pyramid):
+    tiles = [pyramid.tile(0, 0), pyramid.tile(0, 1)]
+    curve = tiles_curve(tiles)
+
+    assert np.array_equal(curve.xs, np.concatenate([tile.xs for tile in tiles]))
+    assert np.array_equal(curve.ys, np.concatenate([tile.y_min for tile in tiles]))
+
+
+def test_tiles_curve_envelope():
+    tile = Tile(1, 0, np.array([0., 2., 4.]), np.array([-1., -2., -3.]), np.array([1., 2., 3.]))
+    curve = tile.curve()
+
+    assert list(curve.xs) == [0, 0, 2, 2, 4, 4]
+    assert list(curve.ys) == [-1, 1, 2, -2, -3, 3]
+
+
+def test_tiles_curve_empty():
+    assert len(tiles_curve([])) == 0
+
+
+def test_parser_expression():
+    assert np.array_equal(TilePyramid(Parser('x**2'), 0, 1, levels=2, tile_size=2).tile(0, 0).y_min,
+                          TilePyramid('x**2', 0, 1, levels=2, tile_size=2).tile(0, 0).y_min)
+
+
+@pytest.mark.parametrize('kwargs',
+                         [{'levels': 0},
+                          {'tile_size': 0},
+                          {'levels': 1, 'tile_size': 1},  # A single level 0 point.
+                          {'x_min': 1, 'x_max': 1},
+                          ])
+def test_bad_args(kwargs):
+    args = {'x_min': -1, 'x_max': 1} | kwargs
+    with pytest.raises(ValueError):
+        TilePyramid('x', **args)
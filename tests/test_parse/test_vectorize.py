@@ -0,0 +1,105 @@
+"""Test vectorize.py"""
+import math
+
+import numpy as np
+import pytest
+
+from src.parseplot import Parser
+from src.parseplot.parse.compiled import CompiledExpression
+from src.parseplot.parse.vectorize import float_range_array, VectorizedExpression
+
+
+@pytest.mark.parametrize(
+    'expression',
+    ['3',  # Constant.
+     'y=3',  # Constant, y=
+     'x+2',  # Linear
+     'y=x-2',
+     'x**2+4',  # Quadratic
+     '2**(x+5)**0.5',  # Right associative exponent.
+     '-x**2 + 3*x - 7/2',
+     '10 - x - 2 - 1',  # Left associative subtraction.
+     'x // 3 + x mod 4',
+     'sin(x)*cos(x)**2',
+     'sin²(x) + cos²(x)',
+     'e**(x/10)',
+     'ln(x**2+1) + log(x**2+1, 2) + log10(x**2 + 1)',
+     'abs(x) + |x-1| + sgn(x)',
+     'hypot(x, 3)',
+     'min(x, 0) + max(x, 1, 2)',
+     'floor(x/3) + ceil(x/3) + trunc(x/3)',
+     'pi*x + tau + phi',
+     'rad(x) + deg(x) + x°',
+     'x² + x³',
+     '√(x**2+1) + 2√(x**2+4)',
+     'x < 0 ? -x : x**2',
+     'x >= 0 and x < 3',
+     'not x > 2',
+     '-5 < x <= 2',
+     'x**2 == 4',
+     'gamma(x/10 + 2)',  # Evaluated elementwise via math.gamma.
+     'x!',  # Elementwise, undefined except at non-negative integers.
+     '10**(x + 295)',  # Too large to round to 15 decimal places.
+     'x**2 * 1e300',  # Polynomial, too large to round.
+     ])
+def test_matches_scalar_evaluation(expression):
+    """Vectorized evaluation gives the same values as .plot, and nan where it raises."""
+    test_parser = Parser(expression)
+    xs, ys = test_parser.plot_arrays(-5, 5, n=101)
+
+    def scalar(x):
+        try:
+            return float(test_parser.plot(x, x)[0][1])
+        except (ArithmeticError, TypeError, ValueError):
+            return math.nan
+
+    assert list(xs) == list(Parser.float_range(-5, 5 + 0.1, 0.1))
+    np.testing.assert_allclose(ys, [scalar(x) for x in xs], rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    'plot_args',
+    [{'x_min': -5, 'x_max': 5},
+     {'x_min': 10, 'x_max': 25},
+     {'x_min': -5, 'x_max': 5, 'n': 7},
+     {'x_min': -5, 'x_max': 5, 'smooth': True},
+     {'x_min': -5, 'x_max': 5, 'very_smooth': True},
+     {'x_min': -500, 'x_max': 500},
+     ])
+def test_plot_arrays_domain(plot_args):
+    test_parser = Parser('x**2')
+    xs, ys = test_parser.plot_arrays(**plot_args)
+
+    assert list(xs) == [x for x, _ in test_parser.plot(**plot_args)]
+    assert len(xs) == len(ys)
+
+
+def test_undefined_points_are_nan():
+    xs, ys = Parser('1/x + ln(x)').plot_arrays(-1, 1)
+
+    assert list(xs) == [-1, 0, 1]
+    assert math.isnan(ys[0])
+    assert ys[2] == 1
+
+
+@pytest.mark.parametrize('expression', ['"a string"', '{1, 2, 3}', 'rnd()'])
+def test_unsupported_syntax_raises(expression):
+    with pytest.raises(TypeError):
+        VectorizedExpression(CompiledExpression(expression))
+
+
+@pytest.mark.parametrize(
+    'start, end, step',
+    [(-2, 3, 1),
+     (-5, 5 + 10 / 6, 10 / 6),
+     (0, 1 + 1 / 4999, 1 / 4999),
+     (-500, 501, 1),
+     (0.1, 0.7, 0.1),
+     (3, 2, 1),  # End before start.
+     (3, 3, 0),  # Zero step.
+     (5, -6, -1),  # Negative step.
+     ])
+def test_float_range_array(start, end, step):
+    expected = list(Parser.float_range(start, end, step))
+
+    assert list(float_range_array(start, end, step)) == expected
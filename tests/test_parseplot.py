@@ -0,0 +1,126 @@
+"""Test parseplot.py"""
+import io
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.parseplot.parse.parser import Parser
+from src.parseplot.parse.point_file import read_point_file
+from src.parseplot.parseplot import (Job,
+                                     PlotOptions,
+                                     main,
+                                     output_name,
+                                     plot_job,
+                                     plot_jobs,
+                                     read_jobs,
+                                     )
+
+SRC_DIR = Path(__file__).parents[1] / 'src'
+
+
+def test_read_jobs():
+    lines = ['x^2\n', '\n', '  # comment\n', ' sin(x) \n']
+    assert list(read_jobs(lines)) == [Job(1, 'x^2'), Job(4, 'sin(x)')]
+
+
+@pytest.mark.parametrize(
+    'job, name',
+    [(Job(3, 'sin(x)'), '000003_sin_x'),
+     (Job(12, 'y = 3*x^3 - x'), '000012_y_3_x_3_-_x'),
+     (Job(1, '**'), '000001'),
+     (Job(1, 'x+' * 50), '000001_' + ('x+' * 20)),
+     ])
+def test_output_name(job, name):
+    assert output_name(job) == name
+
+
+def test_plot_job(tmp_path):
+    options = PlotOptions(tmp_path, formats=('pplt', 'svg'), x_min=-2, x_max=2)
+    result = plot_job(Job(1, 'x^2'), options)
+    assert result.error is None
+    assert [path.name for path in result.paths] == ['000001_x_2.pplt', '000001_x_2.svg']
+    assert all(path.exists() for path in result.paths)
+    assert read_point_file(result.paths[0])[1].ys.tolist() == [4, 1, 0, 1, 4]
+
+
+def test_plot_job_evaluated_once(tmp_path, monkeypatch):
+    evaluated = []
+    plot_curve = Parser._plot_curve
+
+    def counting_plot_curve(self, *args, **kwargs):
+        evaluated.append(args)
+        return plot_curve(self, *args, **kwargs)
+
+    monkeypatch.setattr(Parser, '_plot_curve', counting_plot_curve)
+    result = plot_job(Job(1, 'x^2'), PlotOptions(tmp_path, formats=('pplt', 'svg', 'html'), x_min=-2, x_max=2))
+
+    assert result.error is None
+    assert len(evaluated) == 1
+
+
+def test_plot_job_error(tmp_path):
+    result = plot_job(Job(2, '1/(x*0)'), PlotOptions(tmp_path, formats=('svg',)))
+    assert result.paths == []
+    assert result.error.startswith('ZeroDivisionError')
+
+
+def test_plot_jobs_in_order_with_bounded_pending(tmp_path):
+    consumed = 0
+
+    def jobs():
+        nonlocal consumed
+        for line in range(1, 11):
+            consumed += 1
+            yield Job(line, f'x+{line}')
+
+    options = PlotOptions(tmp_path, formats=('pplt',), x_min=0, x_max=1)
+    with ThreadPoolExecutor(2) as executor:
+        results = plot_jobs(jobs(), options, executor, max_pending=3)
+        first = next(results)
+        assert consumed == 3
+        assert [first.job.line] + [result.job.line for result in results] == list(range(1, 11))
+
+
+def test_main(tmp_path, capsys):
+    expressions = tmp_path / 'expressions.txt'
+    expressions.write_text('x^2\n1/(x*0)\nsin(x)\n', encoding='utf-8')
+    out_dir = tmp_path / 'plots'
+    status = main([str(expressions), '-o', str(out_dir), '-f', 'pplt,svg', '--x-min', '-5', '--x-max', '5',
+                   '-n', '11'])
+    out, err = capsys.readouterr()
+    assert status == 1
+    assert out.split() == [str(out_dir / name) for name in ('000001_x_2.pplt', '000001_x_2.svg',
+                                                            '000003_sin_x.pplt', '000003_sin_x.svg')]
+    assert 'line 2: 1/(x*0): ZeroDivisionError' in err
+    assert len(read_point_file(out_dir / '000001_x_2.pplt')[1]) == 11
+
+
+def test_main_stdin_jobs(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO('x\nx^3\n'))
+    status = main(['-o', str(tmp_path), '-f', 'pplt', '--jobs', '2', '--x-min', '0', '--x-max', '10'])
+    assert status == 0
+    assert not sys.stdin.closed
+    assert capsys.readouterr().out.split() == [str(tmp_path / '000001_x.pplt'), str(tmp_path / '000002_x_3.pplt')]
+    assert read_point_file(tmp_path / '000002_x_3.pplt')[1].ys.tolist() == [x ** 3 for x in range(11)]
+
+
+@pytest.mark.parametrize('arguments', [['-f', 'gif'], ['--jobs', '0'], ['-n', '1'], ['-n', '5', '--smooth']])
+def test_main_bad_arguments(tmp_path, arguments):
+    with pytest.raises(SystemExit):
+        main(['-o', str(tmp_path), *arguments])
+
+
+def test_installed_package(tmp_path):
+    """Runs as the parseplot package, as installed, outside the repository."""
+    (tmp_path / 'expressions.txt').write_text('x^2\n', encoding='utf-8')
+    environment = {**os.environ, 'PYTHONPATH': str(SRC_DIR)}
+    result = subprocess.run([sys.executable, '-m', 'parseplot.parseplot', 'expressions.txt', '-o', 'plots',
+                             '-f', 'pplt,svg,html,png', '--x-min', '-2', '--x-max', '2'],
+                            cwd=tmp_path, env=environment, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert sorted(path.name for path in (tmp_path / 'plots').iterdir()) == [
+        '000001_x_2.html', '000001_x_2.png', '000001_x_2.pplt', '000001_x_2.svg']
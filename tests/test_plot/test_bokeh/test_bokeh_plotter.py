@@ -1,10 +1,29 @@
 """Test bokeh_plotter.py"""
+import asyncio
+import os
+import subprocess
+import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import PIL.Image
 import pytest
 
+from src.parseplot.parse.curve import Curve
+from src.parseplot.parse.point_file import write_point_file
+from src.parseplot.parse.tiles import TilePyramid, tiles_curve
 from src.parseplot.plot.bokeh import bokeh_plotter
 from src.parseplot.plot.bokeh.bokeh_plotter import BokehPlotter
+from src.parseplot.plot.bokeh.webdriver_pool import WebdriverPool
+from src.parseplot.plot.native_renderer import Line
+
+SRC_DIR = Path(__file__).parents[3] / 'src'
+
+
+def browser_not_started():
+    raise AssertionError("Native renderer should not start a browser.")
 
 
 @pytest.mark.parametrize(
@@ -13,12 +32,31 @@ from src.parseplot.plot.bokeh.bokeh_plotter import BokehPlotter
      ([[(1, 2), (3, 4)], [(5, 6), (7, 8)], [(9, 10), (11, 12)]],
       [[(1, 2), (3, 4)], [(5, 6), (7, 8)], [(9, 10), (11, 12)]]),  # Two lines.
      (None, list()),  # Default argument
+     (Curve(array('d', [1, 3]), array('d', [2, 4])),
+      [Curve(array('d', [1, 3]), array('d', [2, 4]))]),  # Curve passed.
+     ([Curve(array('d', [1]), array('d', [2])), Curve(array('d', [3]), array('d', [4]))],
+      [Curve(array('d', [1]), array('d', [2])), Curve(array('d', [3]), array('d', [4]))]),  # Two Curves.
      ])
 def test__init__(test_points, points_attr):
     test_plotter = BokehPlotter(test_points)
     assert test_plotter.points == points_attr
 
 
+def test_from_point_files(tmp_path):
+    test_curves = [Curve(np.linspace(0, 1, 100), np.linspace(0, 1, 100) ** power) for power in (1, 2)]
+    filepaths = [write_point_file(tmp_path / 'line.pplt', test_curves[0], expression='x'),
+                 write_point_file(tmp_path / 'square.pplt', test_curves[1]),
+                 ]
+
+    test_plotter = BokehPlotter.from_point_files(*filepaths, title='test title')
+
+    assert test_plotter.title == 'test title'
+    assert test_plotter.points == test_curves
+    plotted_x = test_plotter._plot.renderers[0].data_source.data['x']
+    assert np.shares_memory(plotted_x, np.asarray(test_plotter.points[0].xs))  # Not copied.
+    assert [style['legend_label'] for style in test_plotter._line_styles] == ['x', None]
+
+
 class TestBokehPlotterAttrs:
     def test_title(self):
         test_title = 'some title'
@@ -77,6 +115,89 @@ class TestAddLine:
                               )
 
 
+    def test_add_line_curve_not_copied(self):
+        """Curve buffers are forwarded as arrays sharing the Curve's memory."""
+        test_curve = Curve(array('d', [1, 3, 5]), array('d', [2, 4, 6]))
+
+        test_plotter = BokehPlotter()
+
+        # patch _plot.line
+        line_args = {}
+
+        class TestPlotLine:
+            def line(self, **args):
+                line_args.update(args)
+
+        test_plotter._plot = TestPlotLine()
+
+        test_plotter.add_line(test_curve)
+
+        assert test_plotter.points == [test_curve]
+        assert np.shares_memory(line_args['x'], np.frombuffer(test_curve.xs))
+        assert np.shares_memory(line_args['y'], np.frombuffer(test_curve.ys))
+        assert list(line_args['x']) == [1, 3, 5]
+        assert list(line_args['y']) == [2, 4, 6]
+
+    def test_add_line_curve_plotted(self):
+        test_plotter = BokehPlotter()
+        test_plotter.add_line(Curve(np.array([1., 3., 5.]), np.array([2., 4., 6.])))
+
+        assert list(test_plotter._plot.renderers[0].data_source.data['y']) == [2, 4, 6]
+
+    def test_add_line_parser_curve(self, tmp_path):
+        """Curves plotted by the installed parseplot package are plotted as Curves."""
+        code = ("import numpy as np\n"
+                "import parseplot\n"
+                "plotter = parseplot.BokehPlotter()\n"
+                "plotter.add_line(parseplot.Parser('x^2').plot(-2, 2, columnar=True))\n"
+                "data = plotter._plot.renderers[0].data_source.data\n"
+                "assert isinstance(data['y'], np.ndarray), type(data['y'])\n"
+                "assert list(data['y']) == [4, 1, 0, 1, 4]\n")
+        subprocess.run([sys.executable, '-c', code], cwd=tmp_path, check=True,
+                       env={**os.environ, 'PYTHONPATH': str(SRC_DIR)})
+
+
+    @pytest.mark.parametrize('decimation', ['lttb', 'minmax'])
+    def test_add_line_decimated(self, decimation):
+        test_curve = Curve(np.linspace(-10, 10, 10_000), np.sin(np.linspace(-10, 10, 10_000)))
+        test_plotter = BokehPlotter(decimation=decimation, decimation_points=100)
+
+        test_plotter.add_line(test_curve)
+
+        assert test_plotter.points == [test_curve]  # Full resolution retained.
+        assert len(test_plotter._plot.renderers[0].data_source.data['x']) <= 100
+
+    def test_add_line_decimated_to_plot_width(self):
+        test_points = [(x / 100, x ** 2) for x in range(10_000)]
+        test_plotter = BokehPlotter(decimation='lttb')
+        test_plotter._plot.width = 300
+
+        test_plotter.add_line(test_points)
+
+        assert len(test_plotter._plot.renderers[0].data_source.data['x']) == 600
+
+    def test_add_tiles(self):
+        test_pyramid = TilePyramid('x**2', -10, 10, levels=4, tile_size=8)
+        test_tiles = test_pyramid.query(-5, 5, 8)
+        test_plotter = BokehPlotter()
+
+        test_plotter.add_tiles(test_tiles, legend_label='tiles')
+
+        assert test_plotter.points == [tiles_curve(test_tiles)]
+        assert test_plotter._line_styles[0]['legend_label'] == 'tiles'
+        assert len(test_plotter._plot.renderers) == 1
+
+    def test_decimated_html_smaller(self, tmp_path):
+        test_curve = Curve(np.linspace(-10, 10, 100_000), np.sin(np.linspace(-10, 10, 100_000)))
+        full_plotter = BokehPlotter(test_curve)
+        decimated_plotter = BokehPlotter(test_curve, decimation='minmax')
+
+        full_plotter.save_html_to_file(tmp_path / 'full.html')
+        decimated_plotter.save_html_to_file(tmp_path / 'decimated.html')
+
+        assert (tmp_path / 'decimated.html').stat().st_size * 10 < (tmp_path / 'full.html').stat().st_size
+
+
 class TestPlot:
     @pytest.mark.parametrize(
         'points',  # points/new line added
@@ -118,7 +239,7 @@ class TestPlotPILImagePNG:
             nonlocal mocked_get_screenshot_as_png
             mocked_get_screenshot_as_png = True
             assert test_plotter._plot in args
-            assert kwargs['driver'] == test_plotter._BokehPlotter__initialise_webdriver()
+            assert kwargs['driver'] == mock___initialise_webdriver_return
             return mock_get_screenshot_as_png_return
 
         monkeypatch.setattr(bokeh_plotter, 'get_screenshot_as_png', mock_get_screenshot_as_png)
@@ -132,13 +253,18 @@ class TestPlotPILImagePNG:
             mocked__initialise_webdriver_called = True
             return mock___initialise_webdriver_return
 
-        test_plotter._BokehPlotter__initialise_webdriver = mock___initialise_webdriver
+        test_plotter.webdriver_pool = WebdriverPool(mock___initialise_webdriver, health_check=lambda driver: True)
 
         assert test_plotter.plot_PIL_Image_png() == mock_get_screenshot_as_png_return
         # Ensure expected calls
         assert mocked_get_screenshot_as_png
         assert mocked__initialise_webdriver_called
 
+    def test_plot_PIL_Image_png_native(self):
+        test_plotter = BokehPlotter([(0, 0), (1, 1)], webdriver_pool=WebdriverPool(browser_not_started))
+
+        assert test_plotter.plot_PIL_Image_png(renderer='native').size == (600, 600)
+
 
 class TestSaveHtmlToFile:
     @pytest.mark.parametrize(
@@ -214,7 +340,7 @@ class TestSaveAsPng:
             mocked__initialise_webdriver_called = True
             return mock___initialise_webdriver_return
 
-        test_plotter._BokehPlotter__initialise_webdriver = mock___initialise_webdriver
+        test_plotter.webdriver_pool = WebdriverPool(mock___initialise_webdriver, health_check=lambda driver: True)
 
         # Mock bokeh.io.save
         mocked_export_png = False
@@ -234,6 +360,37 @@ class TestSaveAsPng:
         assert mocked_export_png
         assert mocked__initialise_webdriver_called
 
+    def test_save_as_png_reuses_webdriver(self, monkeypatch):
+        started_drivers = []
+
+        def stub_driver_factory():
+            started_drivers.append(object())
+            return started_drivers[-1]
+
+        used_drivers = []
+        monkeypatch.setattr(bokeh_plotter, 'export_png',
+                            lambda plot, filename, webdriver: used_drivers.append(webdriver))
+
+        with WebdriverPool(stub_driver_factory, health_check=lambda driver: True) as test_pool:
+            for i in range(20):
+                BokehPlotter(webdriver_pool=test_pool).save_as_png(f'plot_{i}')
+
+        assert len(started_drivers) == 1
+        assert used_drivers == started_drivers * 20
+
+    @pytest.mark.parametrize('plotter_renderer, call_renderer',
+                             [('native', None),  # Default renderer.
+                              ('bokeh', 'native'),  # Per call.
+                              ])
+    def test_save_as_png_native(self, tmp_path, plotter_renderer, call_renderer):
+        test_plotter = BokehPlotter([(0, 0), (1, 1)], renderer=plotter_renderer,
+                                    webdriver_pool=WebdriverPool(browser_not_started))
+
+        saved = test_plotter.save_as_png(tmp_path / 'plot', renderer=call_renderer)
+
+        assert saved == tmp_path / 'plot.png'
+        assert PIL.Image.open(saved).size == (600, 600)
+
 
 class TestSaveAsSvg:
     @pytest.mark.parametrize(
@@ -268,7 +425,7 @@ class TestSaveAsSvg:
             mocked__initialise_webdriver_called = True
             return mock___initialise_webdriver_return
 
-        test_plotter._BokehPlotter__initialise_webdriver = mock___initialise_webdriver
+        test_plotter.webdriver_pool = WebdriverPool(mock___initialise_webdriver, health_check=lambda driver: True)
 
         # Mock bokeh.io.save
         mocked_export_svg = False
@@ -289,6 +446,115 @@ class TestSaveAsSvg:
         assert mocked__initialise_webdriver_called
 
 
+    @pytest.mark.parametrize('plotter_renderer, call_renderer',
+                             [('native', None),  # Default renderer.
+                              ('bokeh', 'native'),  # Per call.
+                              ])
+    def test_save_as_svg_native(self, tmp_path, plotter_renderer, call_renderer):
+        test_plotter = BokehPlotter([(0, 0), (1, 1)], title='native title', renderer=plotter_renderer,
+                                    webdriver_pool=WebdriverPool(browser_not_started))
+
+        saved = test_plotter.save_as_svg(tmp_path / 'plot', renderer=call_renderer)
+
+        assert saved == tmp_path / 'plot.svg'
+        svg = saved.read_text(encoding='utf-8')
+        assert svg.startswith('<svg')
+        assert 'native title' in svg
+
+
+class TestRenderer:
+    def test_default_renderer(self):
+        assert BokehPlotter().renderer == 'bokeh'
+
+    def test_unknown_renderer(self):
+        with pytest.raises(ValueError):
+            BokehPlotter(renderer='unknown')
+
+    @pytest.mark.parametrize('kwargs', [{'decimation': 'bogus'},
+                                        {'decimation': 'lttb', 'decimation_points': 0},
+                                        {'decimation_points': -1},
+                                        ])
+    def test_bad_decimation(self, kwargs):
+        with pytest.raises(ValueError):
+            BokehPlotter(**kwargs)
+
+    def test_add_line_failure_not_added(self):
+        test_plotter = BokehPlotter()
+        test_plotter.decimation = 'bogus'
+
+        with pytest.raises(ValueError):
+            test_plotter.add_line([(0, 0), (1, 1)])
+        assert test_plotter.points == []
+        assert test_plotter._plot.renderers == []
+
+    def test_unknown_renderer_per_call(self, tmp_path):
+        with pytest.raises(ValueError):
+            BokehPlotter().save_as_svg(tmp_path / 'plot', renderer='unknown')
+
+    def test_native_chart(self):
+        test_curve = Curve(array('d', [1, 3]), array('d', [2, 4]))
+        test_plotter = BokehPlotter(title='test title',
+                                    x_axis_label='x', y_axis_label='y',
+                                    x_axis_location=0, y_axis_location=1)
+        test_plotter.add_line([(1, 2), (3, 4)], legend_label='label', line_color='red', line_width=3)
+        test_plotter.add_line(test_curve)
+
+        chart = test_plotter.native_chart()
+
+        assert (chart.title, chart.x_axis_label, chart.y_axis_label) == ('test title', 'x', 'y')
+        assert (chart.x_axis_location, chart.y_axis_location) == (0, 1)
+        first, second = chart.lines
+        assert list(first.xs) == [1, 3] and list(first.ys) == [2, 4]
+        assert (first.colour, first.width, first.legend_label) == ('red', 3, 'label')
+        assert second == Line(test_curve.xs, test_curve.ys)
+
+    def test_native_chart_undecimated(self):
+        test_plotter = BokehPlotter(decimation='lttb', decimation_points=10)
+        test_plotter.add_line([(x, x ** 2) for x in range(1000)])
+
+        assert len(test_plotter.native_chart().lines[0].xs) == 1000
+
+
+class TestAsync:
+    def test_asave_as_png(self, tmp_path):
+        test_plotter = BokehPlotter([(0, 0), (1, 1)], webdriver_pool=WebdriverPool(browser_not_started))
+
+        saved = asyncio.run(test_plotter.asave_as_png(tmp_path / 'plot', renderer='native'))
+
+        assert saved == tmp_path / 'plot.png'
+        assert PIL.Image.open(saved).size == (600, 600)
+
+    def test_asave_as_svg(self, tmp_path):
+        test_plotter = BokehPlotter([(0, 0), (1, 1)], renderer='native')
+
+        saved = asyncio.run(test_plotter.asave_as_svg(tmp_path / 'plot'))
+
+        assert saved.read_text(encoding='utf-8') == Path(test_plotter.save_as_svg(tmp_path / 'sync')).read_text(
+            encoding='utf-8')
+
+    def test_asave_html_to_file(self, tmp_path):
+        saved = asyncio.run(BokehPlotter([(0, 0), (1, 1)]).asave_html_to_file(tmp_path / 'plot'))
+
+        assert Path(saved).exists()
+
+    def test_aplot_PIL_Image_png(self):
+        test_plotter = BokehPlotter([(0, 0), (1, 1)])
+
+        with ThreadPoolExecutor(1) as test_executor:
+            image = asyncio.run(test_plotter.aplot_PIL_Image_png('native', executor=test_executor))
+
+        assert image.size == (600, 600)
+
+    def test_concurrent_exports(self, tmp_path):
+        test_plotters = [BokehPlotter([(0, 0), (1, i)], renderer='native') for i in range(10)]
+
+        async def export_all():
+            return await asyncio.gather(*(test_plotter.asave_as_svg(tmp_path / str(i))
+                                          for i, test_plotter in enumerate(test_plotters)))
+
+        assert asyncio.run(export_all()) == [tmp_path / f'{i}.svg' for i in range(10)]
+
+
 class TestShowInBrowser:
     def test_show_in_browser(self, monkeypatch):
         test_plotter = BokehPlotter()
@@ -340,36 +606,3 @@ class TestAddLines:
 
         assert test_plotter._BokehPlotter__add_lines(lines) is None
         assert len(mocked_add_line_calls) == number_of_lines
-
-
-class TestInitialiseWebdriver:
-    def test___initialise_webdriver(self, monkeypatch):
-        testing_plotter = BokehPlotter()
-        test_initialised_driver = 'initialised driver'
-
-        # mock geckodriver.install
-        mocked_geckodriver_install_called = False
-
-        def mock_install():
-            nonlocal mocked_geckodriver_install_called
-            mocked_geckodriver_install_called = True
-
-        import geckodriver_autoinstaller
-        monkeypatch.setattr(geckodriver_autoinstaller, 'install', mock_install)
-
-        # mock webdriver.Firefox
-        mocked_webdriver_Firefox_called = False
-
-        def mock_Firefox(options):
-            nonlocal mocked_webdriver_Firefox_called
-            mocked_webdriver_Firefox_called = True
-            assert options
-            return test_initialised_driver
-
-        from selenium import webdriver
-        monkeypatch.setattr(webdriver, 'Firefox', mock_Firefox)
-
-        assert testing_plotter._BokehPlotter__initialise_webdriver() == test_initialised_driver
-
-        assert mocked_geckodriver_install_called
-        assert mocked_webdriver_Firefox_called
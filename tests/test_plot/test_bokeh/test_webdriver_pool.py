@@ -0,0 +1,176 @@
+"""Test webdriver_pool.py"""
+import threading
+
+import pytest
+
+from src.parseplot.plot.bokeh import webdriver_pool
+from src.parseplot.plot.bokeh.webdriver_pool import (default_webdriver_pool,
+                                                     firefox_webdriver,
+                                                     is_alive,
+                                                     WebdriverPool,
+                                                     )
+
+
+class StubDriver:
+    """Local stand-in for a selenium webdriver."""
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def title(self):
+        if not self.alive:
+            raise ConnectionError("browser has died")
+        return ''
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def started_drivers():
+    return []
+
+
+@pytest.fixture
+def stub_pool(started_drivers):
+    def stub_factory():
+        started_drivers.append(StubDriver())
+        return started_drivers[-1]
+
+    with WebdriverPool(stub_factory, max_size=2) as pool:
+        yield pool
+
+
+def test_driver_started_lazily(stub_pool, started_drivers):
+    assert started_drivers == []
+
+    with stub_pool.driver() as driver:
+        assert driver is started_drivers[0]
+
+
+def test_driver_reused(stub_pool, started_drivers):
+    for _ in range(100):
+        with stub_pool.driver():
+            pass
+
+    assert len(started_drivers) == 1
+    assert stub_pool.started == 1
+
+
+def test_dead_driver_replaced(stub_pool, started_drivers):
+    with stub_pool.driver() as driver:
+        driver.alive = False
+
+    with stub_pool.driver() as replacement:
+        assert replacement is not driver
+
+    assert driver.quit_called
+    assert len(started_drivers) == 2
+
+
+def test_max_size(stub_pool, started_drivers):
+    first = stub_pool.acquire()
+    second = stub_pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        stub_pool.acquire(timeout=0.01)
+
+    stub_pool.release(first)
+    assert stub_pool.acquire(timeout=0.01) is first
+    stub_pool.release(first)
+    stub_pool.release(second)
+    assert len(started_drivers) == 2
+
+
+def test_waits_for_released_driver(stub_pool):
+    first = stub_pool.acquire()
+    stub_pool.acquire()
+    acquired = []
+
+    waiting = threading.Thread(target=lambda: acquired.append(stub_pool.acquire(timeout=5)))
+    waiting.start()
+    stub_pool.release(first)
+    waiting.join()
+
+    assert acquired == [first]
+
+
+def test_failed_start_frees_slot():
+    def failing_factory():
+        raise OSError("Firefox not installed")
+
+    pool = WebdriverPool(failing_factory, max_size=1)
+    for _ in range(2):  # Slot freed, so second attempt not blocked.
+        with pytest.raises(OSError):
+            pool.acquire(timeout=0.01)
+
+
+def test_close(stub_pool, started_drivers):
+    idle = stub_pool.acquire()
+    in_use = stub_pool.acquire()
+    stub_pool.release(idle)
+    stub_pool.close()
+
+    assert idle.quit_called
+    assert not in_use.quit_called  # Not quit while in use,
+    stub_pool.release(in_use)
+    assert in_use.quit_called  # but once released.
+
+    with pytest.raises(RuntimeError):
+        stub_pool.acquire()
+
+
+def test_bad_max_size():
+    with pytest.raises(ValueError):
+        WebdriverPool(StubDriver, max_size=0)
+
+
+def test_is_alive():
+    driver = StubDriver()
+    assert is_alive(driver)
+    driver.alive = False
+    assert not is_alive(driver)
+
+
+def test_default_webdriver_pool(monkeypatch):
+    monkeypatch.setattr(webdriver_pool, '_default_pool', None)
+    registered = []
+    monkeypatch.setattr(webdriver_pool.atexit, 'register', registered.append)
+
+    pool = default_webdriver_pool()
+
+    assert default_webdriver_pool() is pool
+    assert pool.factory is firefox_webdriver
+    assert registered == [pool.close]
+
+
+def test_firefox_webdriver(monkeypatch):
+    test_initialised_driver = 'initialised driver'
+
+    # mock geckodriver.install
+    mocked_geckodriver_install_called = False
+
+    def mock_install():
+        nonlocal mocked_geckodriver_install_called
+        mocked_geckodriver_install_called = True
+
+    import geckodriver_autoinstaller
+    monkeypatch.setattr(geckodriver_autoinstaller, 'install', mock_install)
+
+    # mock webdriver.Firefox
+    mocked_webdriver_Firefox_called = False
+
+    def mock_Firefox(options):
+        nonlocal mocked_webdriver_Firefox_called
+        mocked_webdriver_Firefox_called = True
+        assert options
+        return test_initialised_driver
+
+    from selenium import webdriver
+    monkeypatch.setattr(webdriver, 'Firefox', mock_Firefox)
+
+    assert firefox_webdriver() == test_initialised_driver
+
+    assert mocked_geckodriver_install_called
+    assert mocked_webdriver_Firefox_called
@@ -0,0 +1,84 @@
+"""Test decimate.py"""
+import numpy as np
+import pytest
+
+from src.parseplot.plot.decimate import decimate, lttb, min_max
+
+
+@pytest.fixture
+def noisy_line():
+    xs = np.linspace(-10, 10, 100_001)
+    ys = np.sin(xs) + np.where(np.arange(len(xs)) == 31_415, 5.0, 0.0)  # With a one point spike.
+    return xs, ys
+
+
+@pytest.mark.parametrize('method', [lttb, min_max])
+def test_peaks_preserved(noisy_line, method):
+    xs, ys = noisy_line
+    decimated_xs, decimated_ys = method(xs, ys, 1200)
+
+    assert len(decimated_xs) <= 1200
+    assert decimated_xs[0] == xs[0]
+    assert decimated_xs[-1] == xs[-1]
+    assert np.all(np.diff(decimated_xs) > 0)
+    assert decimated_ys.max() == ys.max()  # Spike kept.
+    assert set(decimated_xs) <= set(xs)  # Only original points kept.
+
+
+def test_lttb_exact_count(noisy_line):
+    assert len(lttb(*noisy_line, 500)[0]) == 500
+
+
+def test_min_max_keeps_bucket_extrema():
+    xs = np.arange(8.0)
+    ys = np.array([0., 3., 1., 2., 5., 4., 7., 6.])
+
+    decimated_xs, decimated_ys = min_max(xs, ys, 6)  # 2 buckets.
+
+    assert list(decimated_xs) == [0, 1, 5, 6, 7]
+    assert list(decimated_ys) == [0, 3, 4, 7, 6]
+
+
+def test_min_max_unsorted_xs():
+    xs = np.array([3., 2., 1., 0., 4., 5., 6., 7.])
+    ys = np.array([0., 3., 1., 2., 5., 4., 7., 6.])
+
+    decimated_xs, decimated_ys = min_max(xs, ys, 6)
+
+    assert list(decimated_ys) == [0, 3, 4, 7, 6]
+
+
+def test_min_max_nan_bucket():
+    xs = np.arange(8.0)
+    ys = np.array([1., 2., 3., 4., np.nan, np.nan, np.nan, np.nan])
+
+    decimated_xs, _ = min_max(xs, ys, 6)
+
+    assert list(decimated_xs) == [0, 3, 4, 7]
+
+
+@pytest.mark.parametrize('points', [4, 5, 10, 11, 12, 1200])
+def test_min_max_at_most_points(noisy_line, points):
+    assert len(min_max(*noisy_line, points)[0]) <= points
+
+
+@pytest.mark.parametrize('method', [lttb, min_max])
+@pytest.mark.parametrize('points', [10, 11, 1000])
+def test_short_lines_unchanged(method, points):
+    xs, ys = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10], [1, 4, 9, 16, 25, 36, 49, 64, 81, 100]
+    decimated_xs, decimated_ys = method(xs, ys, points)
+
+    assert list(decimated_xs) == xs
+    assert list(decimated_ys) == ys
+
+
+def test_decimate_methods(noisy_line):
+    assert all(np.array_equal(a, b) for a, b in zip(decimate(*noisy_line, 'lttb', 100),
+                                                    lttb(*noisy_line, 100)))
+    assert all(np.array_equal(a, b) for a, b in zip(decimate(*noisy_line, 'minmax', 100),
+                                                    min_max(*noisy_line, 100)))
+
+
+def test_decimate_unknown_method(noisy_line):
+    with pytest.raises(ValueError):
+        decimate(*noisy_line, 'unknown', 100)
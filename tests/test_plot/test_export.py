@@ -0,0 +1,138 @@
+"""Test export.py"""
+import threading
+
+import pytest
+from PIL import Image
+
+from src.parseplot.plot.bokeh import bokeh_plotter
+from src.parseplot.plot.bokeh.bokeh_plotter import BokehPlotter
+from src.parseplot.plot.bokeh.webdriver_pool import WebdriverPool
+from src.parseplot.plot.export import export_many
+
+
+def plotters(count):
+    return [BokehPlotter([(x, x ** power) for x in range(-10, 11)], title=f'x ** {power}')
+            for power in range(count)]
+
+
+def test_export_many_native(tmp_path):
+    report = export_many(plotters(5), tmp_path / 'out', renderer='native', workers=2)
+
+    assert not report.failed
+    assert sorted(report.saved) == [f'plot_{i:05}' for i in range(5)]
+    for name, paths in report.saved.items():
+        assert paths == [tmp_path / 'out' / f'{name}.png', tmp_path / 'out' / f'{name}.svg']
+        assert Image.open(paths[0]).size == (600, 600)
+        assert paths[1].read_text(encoding='utf-8').startswith('<svg')
+    assert report.charts_per_second > 0
+
+
+def test_export_many_named(tmp_path):
+    report = export_many({'square': plotters(3)[2]}, tmp_path, formats=['svg'], renderer='native')
+
+    assert report.saved == {'square': [tmp_path / 'square.svg']}
+
+
+def test_export_many_streams_generator(tmp_path):
+    report = export_many((plotter for plotter in plotters(4)), tmp_path, formats=['svg'], renderer='native')
+
+    assert len(report.saved) == 4
+
+
+def test_export_many_failures_reported(tmp_path):
+    test_plotters = {'good': BokehPlotter([(0, 0), (1, 1)]),
+                     'bad': BokehPlotter([(0, 0), (1, 1)]),
+                     'also good': BokehPlotter([(0, 0), (1, 1)]),
+                     }
+    test_error = OSError("disk full")
+
+    def failing_save(filepath, renderer=None, webdriver_pool=None):
+        raise test_error
+
+    test_plotters['bad'].save_as_svg = failing_save
+
+    report = export_many(test_plotters, tmp_path, formats=['svg'], renderer='native')
+
+    assert sorted(report.saved) == ['also good', 'good']
+    assert report.failed == {'bad': test_error}
+
+
+def test_export_many_one_session_per_worker(tmp_path, monkeypatch):
+    started_drivers = []
+
+    def stub_driver_factory():
+        started_drivers.append(object())
+        return started_drivers[-1]
+
+    used = []
+    export_barrier = threading.Barrier(2)
+
+    def mock_export_png(plot, filename, webdriver):
+        export_barrier.wait(timeout=5)  # Both workers export at once.
+        used.append(webdriver)
+
+    monkeypatch.setattr(bokeh_plotter, 'export_png', mock_export_png)
+
+    with WebdriverPool(stub_driver_factory, max_size=2, health_check=lambda driver: True) as test_pool:
+        report = export_many(plotters(20), tmp_path, formats=['png'], workers=2, webdriver_pool=test_pool)
+
+    assert not report.failed
+    assert len(started_drivers) == 2
+    assert len(used) == 20
+    assert set(used) == set(started_drivers)
+
+
+def test_export_many_plotter_pool_restored(tmp_path):
+    test_plotter, = plotters(1)
+
+    export_many([test_plotter], tmp_path, formats=['svg'], renderer='native')
+
+    assert test_plotter.webdriver_pool is None
+
+
+def test_export_many_plotter_not_mutated(tmp_path, monkeypatch):
+    """The batch's pool is passed to plotters, so a plotter may be exported twice at once."""
+    test_plotter, = plotters(1)
+    plotter_pools = []
+    export_barrier = threading.Barrier(2)
+
+    def mock_export_png(plot, filename, webdriver):
+        export_barrier.wait(timeout=5)  # Both workers export at once.
+        plotter_pools.append(test_plotter.webdriver_pool)
+
+    monkeypatch.setattr(bokeh_plotter, 'export_png', mock_export_png)
+
+    with WebdriverPool(object, max_size=2, health_check=lambda driver: True) as test_pool:
+        report = export_many({'a': test_plotter, 'b': test_plotter}, tmp_path, formats=['png'], workers=2,
+                             webdriver_pool=test_pool)
+
+    assert sorted(report.saved) == ['a', 'b']
+    assert plotter_pools == [None, None]
+
+
+def test_export_many_plotters_error_raised(tmp_path):
+    def failing_plotters():
+        yield from plotters(2)
+        raise RuntimeError("no more plots")
+
+    with pytest.raises(RuntimeError, match="no more plots"):
+        export_many(failing_plotters(), tmp_path, formats=['svg'], renderer='native', workers=2)
+    assert len(list(tmp_path.glob('*.svg'))) == 2
+
+
+def test_export_many_batch_pool_closed(tmp_path, monkeypatch):
+    closed_pools = []
+    monkeypatch.setattr(WebdriverPool, 'close', lambda pool: closed_pools.append(pool))
+
+    export_many(plotters(1), tmp_path, formats=['svg'], renderer='native')
+
+    assert len(closed_pools) == 1
+
+
+@pytest.mark.parametrize('kwargs',
+                         [{'formats': ['png', 'gif']},
+                          {'workers': -1},
+                          ])
+def test_export_many_bad_args(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        export_many(plotters(1), tmp_path, **kwargs)
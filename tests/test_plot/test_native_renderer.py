@@ -0,0 +1,121 @@
+"""Test native_renderer.py"""
+import math
+import time
+import xml.etree.ElementTree as ElementTree
+from array import array
+
+import pytest
+from PIL import Image
+
+from src.parseplot.plot.native_renderer import (Chart,
+                                                format_tick,
+                                                Line,
+                                                nice_ticks,
+                                                PALETTE,
+                                                render_png,
+                                                render_svg,
+                                                )
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def polylines(svg):
+    return ElementTree.fromstring(svg).findall(f'.//{SVG}polyline')
+
+
+def texts(svg):
+    return [text.text for text in ElementTree.fromstring(svg).iter(f'{SVG}text')]
+
+
+@pytest.mark.parametrize(
+    'low, high, ticks',
+    [(0, 1, [0, 0.2, 0.4, 0.6, 0.8, 1]),
+     (-5.5, 5.5, [-5, -2.5, 0, 2.5, 5]),
+     (0, 1000, [0, 200, 400, 600, 800, 1000]),
+     (0.001, 0.0035, [0.001, 0.0015, 0.002, 0.0025, 0.003, 0.0035]),
+     (3, 3, [3]),  # Empty range.
+     ])
+def test_nice_ticks(low, high, ticks):
+    assert nice_ticks(low, high) == pytest.approx(ticks)
+
+
+@pytest.mark.parametrize(
+    'tick, label',
+    [(0, '0'),
+     (2.5, '2.5'),
+     (0.1 + 0.2, '0.3'),
+     (1e9, '1e+09'),
+     ])
+def test_format_tick(tick, label):
+    assert format_tick(tick) == label
+
+
+class TestRenderSvg:
+    def test_annotations(self):
+        svg = render_svg(Chart([Line([0, 1], [0, 1], legend_label='a & b')],
+                               title='<title>', x_axis_label='x axis', y_axis_label='y axis'))
+
+        assert {'<title>', 'x axis', 'y axis', 'a & b'} <= set(texts(svg))
+
+    def test_lines(self):
+        svg = render_svg(Chart([Line([0, 1, 2], [0, 1, 4]),
+                                Line(array('d', [0, 1]), array('d', [4, 0]), colour='red', width=3),
+                                ]))
+
+        first, second = polylines(svg)
+        assert len(first.get('points').split()) == 3
+        assert first.get('stroke') == PALETTE[0]
+        assert second.get('stroke') == 'red'
+        assert second.get('stroke-width') == '3'
+
+    def test_line_scaled_to_frame(self):
+        svg = render_svg(Chart([Line([0, 10], [0, 10])], width=200, height=100))
+
+        (start, end), = [[tuple(map(float, point.split(','))) for point in line.get('points').split()]
+                         for line in polylines(svg)]
+        assert start[0] < end[0] <= 200  # Left to right,
+        assert 100 >= start[1] > end[1]  # bottom to top.
+
+    def test_line_broken_at_non_finite(self):
+        svg = render_svg(Chart([Line([0, 1, 2, 3, 4, 5], [0, 1, math.nan, math.inf, 4, 5])]))
+
+        assert [len(line.get('points').split()) for line in polylines(svg)] == [2, 2]
+
+    def test_large_line_downsampled(self):
+        xs = [x / 1000 for x in range(1_000_000)]
+        svg = render_svg(Chart([Line(xs, [math.sin(x) for x in xs])], width=600))
+
+        line, = polylines(svg)
+        assert len(line.get('points').split()) <= 2 * 600
+
+    def test_multi_line_chart_fast(self):
+        xs = [x / 100 for x in range(-1000, 1000)]
+        chart = Chart([Line(xs, [x ** power for x in xs]) for power in range(5)],
+                      title='powers', x_axis_label='x', y_axis_label='y')
+
+        start = time.perf_counter()
+        render_svg(chart)
+        assert time.perf_counter() - start < 0.5
+
+    def test_no_lines(self):
+        assert polylines(render_svg(Chart())) == []
+
+
+class TestRenderPng:
+    def test_size(self):
+        image = render_png(Chart([Line([0, 1], [0, 1])], width=300, height=200))
+
+        assert isinstance(image, Image.Image)
+        assert image.size == (300, 200)
+
+    def test_line_drawn(self):
+        image = render_png(Chart([Line([0, 1], [0, 1], colour='#ff0000', width=3)]))
+
+        assert (255, 0, 0) in {colour for _, colour in image.getcolors(maxcolors=2 ** 16)}
+
+    def test_annotations_drawn(self):
+        plain = render_png(Chart([Line([0, 1], [0, 1])]))
+        annotated = render_png(Chart([Line([0, 1], [0, 1])],
+                                     title='title', x_axis_label='x axis', y_axis_label='y axis'))
+
+        assert plain.tobytes() != annotated.tobytes()
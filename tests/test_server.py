@@ -0,0 +1,199 @@
+"""Test server.py"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode
+
+import pytest
+
+from src.parseplot.parse.expression_cache import compiled_expressions
+from src.parseplot.server import PlotError, PlotServer, PlotService
+
+SRC_DIR = Path(__file__).parents[1] / 'src'
+
+
+@pytest.fixture
+def service():
+    with ThreadPoolExecutor(2) as executor:
+        service = PlotService(executor=executor)
+        yield service
+        service.close()
+
+
+@pytest.fixture
+def server(service):
+    server = PlotServer(('127.0.0.1', 0), service, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def get(server, path, **parameters):
+    url = f'{server.url}{path}?{urlencode(parameters)}' if parameters else f'{server.url}{path}'
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, response.headers['Content-Type'], response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers['Content-Type'], error.read()
+
+
+def post(server, path, body):
+    request = urllib.request.Request(f'{server.url}{path}', data=body, method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.read()
+
+
+def test_plot_json(service):
+    body, content_type = service.plot({'expression': 'x^2', 'x_min': -2, 'x_max': 2})
+    assert content_type == 'application/json'
+    assert json.loads(body) == {'expression': 'x^2', 'x': [-2, -1, 0, 1, 2], 'y': [4, 1, 0, 1, 4]}
+
+
+def test_plot_infinite_points_null(service):
+    body, _ = service.plot({'expression': 'x^2', 'x_min': '0', 'x_max': '1e200', 'n': '3'})
+    assert json.loads(body)['y'] == [0, None, None]
+
+
+def test_plot_cached(service):
+    parameters = {'expression': 'x*3', 'x_min': 0, 'x_max': 5}
+    first, _ = service.plot(parameters)
+    second, _ = service.plot(parameters)
+    assert first == second
+    info = service.cache.info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    'parameters, message',
+    [({}, 'expression is required'),
+     ({'expression': 'x', 'format': 'gif'}, 'format must be one of'),
+     ({'expression': 'x', 'renderer': 'pdf'}, 'renderer must be one of'),
+     ({'expression': 'x', 'x_min': 'a'}, 'x_min must be a number'),
+     ({'expression': 'x', 'x_max': 'inf'}, 'x_max must be finite'),
+     ({'expression': 'x', 'x_min': 5, 'x_max': 1}, 'x_min must be less than x_max'),
+     ({'expression': 'x', 'n': 1}, 'n must be at least 2'),
+     ({'expression': 'x', 'n': 10 ** 7}, 'more than'),
+     ({'expression': 'x +* 2'}, 'invalid expression'),
+     ({'expression': '1/(x*0)'}, 'ZeroDivisionError'),
+     ])
+def test_plot_invalid(service, parameters, message):
+    with pytest.raises(PlotError, match=message):
+        service.plot(parameters)
+
+
+def test_plot_compiled_by_worker(service, monkeypatch):
+    compiling_threads = []
+    compile_expression = compiled_expressions.get
+
+    def recording_compile_expression(expression):
+        compiling_threads.append(threading.current_thread())
+        return compile_expression(expression)
+
+    monkeypatch.setattr(compiled_expressions, 'get', recording_compile_expression)
+    service.plot({'expression': 'x^2 + 12345'})
+    with pytest.raises(PlotError, match='invalid expression'):
+        service.plot({'expression': 'x +* 12345'})
+
+    assert compiling_threads
+    assert threading.current_thread() not in compiling_threads
+
+
+def test_get_plot(server):
+    status, content_type, body = get(server, '/plot', expression='sin(x)', n=50)
+    assert (status, content_type) == (200, 'application/json')
+    assert len(json.loads(body)['x']) == 50
+
+
+@pytest.mark.parametrize('plot_format, content_type, start',
+                         [('svg', 'image/svg+xml', b'<svg'),
+                          ('png', 'image/png', b'\x89PNG'),
+                          ('html', 'text/html; charset=utf-8', b'<!DOCTYPE html>'),
+                          ])
+def test_get_plot_formats(server, plot_format, content_type, start):
+    status, response_type, body = get(server, '/plot', expression='x^3', format=plot_format, smooth='true')
+    assert (status, response_type) == (200, content_type)
+    assert body.lstrip().startswith(start)
+
+
+def test_post_plot(server):
+    status, body = post(server, '/plot', json.dumps({'expression': 'x+1', 'x_min': 0, 'x_max': 2}).encode())
+    assert status == 200
+    assert json.loads(body)['y'] == [1, 2, 3]
+
+
+@pytest.mark.parametrize('body', [b'not json', b'[1, 2]'])
+def test_post_invalid_body(server, body):
+    status, response = post(server, '/plot', body)
+    assert status == 400
+    assert json.loads(response) == {'error': 'body must be a JSON object'}
+
+
+def test_get_invalid_plot(server):
+    status, _, body = get(server, '/plot', expression='x', format='gif')
+    assert status == 400
+    assert 'format must be one of' in json.loads(body)['error']
+
+
+def test_not_found(server):
+    assert get(server, '/missing')[0] == 404
+
+
+def test_health(server):
+    assert get(server, '/health')[:2] == (200, 'application/json')
+
+
+def test_stats(server):
+    get(server, '/plot', expression='x', n=10)
+    get(server, '/plot', expression='x', n=10)
+    get(server, '/plot', expression='x', format='gif')
+    status, _, body = get(server, '/stats')
+    stats = json.loads(body)
+    assert status == 200
+    assert stats['requests'] == 3
+    assert stats['paths']['/plot']['requests'] == 3
+    assert stats['paths']['/plot']['errors'] == 1
+    assert 0 < stats['paths']['/plot']['p50_seconds'] <= stats['paths']['/plot']['max_seconds']
+    assert stats['result_cache']['hits'] == 1
+    assert stats['requests_per_second'] > 0
+    assert set(stats) >= {'expression_cache', 'metrics', 'uptime_seconds'}
+
+
+def test_process_pool():
+    with PlotServer(('127.0.0.1', 0), processes=1, quiet=True) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            status, _, body = get(server, '/plot', expression='x^2', x_min=0, x_max=3, format='json')
+            assert status == 200
+            assert json.loads(body)['y'] == [0, 1, 4, 9]
+            assert get(server, '/plot', expression='x^2', format='svg')[0] == 200
+            assert get(server, '/plot', expression='1/(x*0)')[0] == 400
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+def test_installed_package(tmp_path):
+    """Serves as the parseplot package, as installed, outside the repository."""
+    environment = {**os.environ, 'PYTHONPATH': str(SRC_DIR)}
+    with subprocess.Popen([sys.executable, '-m', 'parseplot.server', '--port', '0', '--processes', '1', '--quiet'],
+                          cwd=tmp_path, env=environment, stdout=subprocess.PIPE, text=True) as process:
+        try:
+            url = process.stdout.readline().split()[-1]
+            with urllib.request.urlopen(f'{url}/plot?expression=x%5E2&format=svg') as response:
+                assert response.status == 200
+                assert response.read().lstrip().startswith(b'<svg')
+        finally:
+            process.terminate()
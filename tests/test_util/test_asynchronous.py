@@ -0,0 +1,90 @@
+"""Test asynchronous.py"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.parseplot.util import asynchronous
+from src.parseplot.util.asynchronous import (run_blocking,
+                                             set_executor,
+                                             set_max_concurrency,
+                                             )
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    yield
+    set_executor(None)
+    set_max_concurrency(asynchronous.DEFAULT_MAX_CONCURRENCY)
+
+
+def test_run_blocking_result():
+    assert asyncio.run(run_blocking(divmod, 7, 2)) == (3, 1)
+    assert asyncio.run(run_blocking(int, '11', base=2)) == 3
+
+
+def test_run_blocking_exception():
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(run_blocking(divmod, 1, 0))
+
+
+def test_run_blocking_doesnt_block_loop():
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        await run_blocking(time.sleep, 0.2)
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 5
+
+
+def test_run_blocking_executor():
+    def thread_name():
+        return threading.current_thread().name
+
+    with ThreadPoolExecutor(1, thread_name_prefix='per_call') as per_call, \
+            ThreadPoolExecutor(1, thread_name_prefix='configured') as configured:
+        set_executor(configured)
+        assert asyncio.run(run_blocking(thread_name)).startswith('configured')
+        assert asyncio.run(run_blocking(thread_name, executor=per_call)).startswith('per_call')
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 3])
+def test_max_concurrency(max_concurrency):
+    set_max_concurrency(max_concurrency)
+    running = 0
+    most_running = 0
+    lock = threading.Lock()
+
+    def blocking_call():
+        nonlocal running, most_running
+        with lock:
+            running += 1
+            most_running = max(most_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    async def burst():
+        await asyncio.gather(*(run_blocking(blocking_call) for _ in range(12)))
+
+    with ThreadPoolExecutor(12) as executor:
+        set_executor(executor)
+        asyncio.run(burst())
+
+    assert most_running == max_concurrency
+
+
+def test_bad_max_concurrency():
+    with pytest.raises(ValueError):
+        set_max_concurrency(0)
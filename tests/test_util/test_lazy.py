@@ -0,0 +1,59 @@
+"""Test lazy.py"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import src.parseplot
+from src.parseplot.plot.bokeh.bokeh_plotter import BokehPlotter
+from src.parseplot.plot.export import export_many
+from src.parseplot.util.lazy import lazy_attributes
+
+REPO_ROOT = Path(__file__).parents[2]
+
+
+def imported_modules(code):
+    """Returns top level modules imported by running code in a fresh interpreter."""
+    result = subprocess.run([sys.executable, '-c', f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return {module.split('.')[0] for module in result.stdout.split()}
+
+
+def test_lazy_attributes():
+    namespace = {}
+    __getattr__, __dir__ = lazy_attributes('src.parseplot', {'sqrt': ('math', 'sqrt'),
+                                                             'Curve': ('.parse.curve', 'Curve'),
+                                                             }, namespace)
+    assert __getattr__('sqrt')(4) == 2
+    assert namespace['sqrt'] is __getattr__('sqrt')
+    assert __getattr__('Curve') is src.parseplot.Curve
+    assert __dir__() == ['Curve', 'sqrt']
+
+
+def test_lazy_attributes_missing():
+    __getattr__, _ = lazy_attributes('package', {}, {})
+    with pytest.raises(AttributeError, match="module 'package' has no attribute 'missing'"):
+        __getattr__('missing')
+
+
+def test_package_attributes():
+    assert src.parseplot.BokehPlotter is src.parseplot.Plotter is BokehPlotter
+    assert src.parseplot.export_many is export_many
+    assert set(src.parseplot.__all__) <= set(dir(src.parseplot))
+    with pytest.raises(AttributeError):
+        src.parseplot.missing
+
+
+@pytest.mark.parametrize('code', ['import src.parseplot',
+                                  'from src.parseplot import Parser; Parser("x^2").plot(-5, 5)',
+                                  'from src.parseplot import plot_many; plot_many(["x"], x_min=0, x_max=3)',
+                                  'import src.parseplot.plot.bokeh.webdriver_pool',
+                                  ])
+def test_parsing_doesnt_import_plotting(code):
+    assert not imported_modules(code) & {'bokeh', 'PIL', 'numpy', 'selenium'}
+
+
+def test_plotter_imported_on_use():
+    assert 'bokeh' in imported_modules('from src.parseplot import Plotter')
+    assert 'bokeh' in imported_modules('from src.parseplot import *')
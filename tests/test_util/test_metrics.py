@@ -0,0 +1,182 @@
+"""Test metrics.py"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.parseplot.parse.expression_cache import ExpressionCache
+from src.parseplot.parse.parser import Parser
+from src.parseplot.parse.result_cache import ResultCache
+from src.parseplot.plot.bokeh.bokeh_plotter import BokehPlotter
+from src.parseplot.plot.bokeh.webdriver_pool import WebdriverPool
+from src.parseplot.util.metrics import Metrics, StageEvent, StageStats, metrics
+
+SRC_DIR = Path(__file__).parents[2] / 'src'
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_records_nothing():
+    registry = Metrics()
+    with registry.stage('stage') as span:
+        span.points = 10
+    registry.count('counter')
+    assert registry.stages() == {}
+    assert registry.counters() == {}
+
+
+def test_stage():
+    registry = Metrics(enabled=True)
+    with registry.stage('stage', 3):
+        pass
+    with registry.stage('stage') as span:
+        span.points = 5
+    stats = registry.stages()['stage']
+    assert (stats.calls, stats.errors, stats.points) == (2, 0, 8)
+    assert 0 <= stats.max_seconds <= stats.seconds
+
+
+def test_stage_error():
+    registry = Metrics(enabled=True)
+    with pytest.raises(ZeroDivisionError):
+        with registry.stage('stage'):
+            1 / 0
+    assert registry.stages()['stage'].errors == 1
+
+
+def test_count():
+    registry = Metrics(enabled=True)
+    registry.count('counter')
+    registry.count('counter', 2)
+    assert registry.counters() == {'counter': 3}
+
+
+def test_listener():
+    registry = Metrics(enabled=True)
+    events = []
+    registry.add_listener(events.append)
+    with registry.stage('stage', 2):
+        pass
+    registry.remove_listener(events.append)
+    with registry.stage('stage'):
+        pass
+    assert len(events) == 1
+    assert isinstance(events[0], StageEvent)
+    assert (events[0].stage, events[0].points, events[0].error) == ('stage', 2, None)
+
+
+def test_reset():
+    registry = Metrics(enabled=True)
+    with registry.stage('stage'):
+        registry.count('counter')
+    registry.reset()
+    assert registry.to_dict() == {'stages': {}, 'counters': {}}
+
+
+def test_stages_are_copies():
+    registry = Metrics(enabled=True)
+    registry.record(StageEvent('stage', 1.0, 0, None))
+    registry.stages()['stage'].calls = 100
+    assert registry.stages()['stage'] == StageStats(calls=1, seconds=1.0, max_seconds=1.0)
+
+
+def test_to_json():
+    registry = Metrics(enabled=True)
+    registry.record(StageEvent('stage', 0.5, 4, None))
+    registry.count('counter')
+    assert json.loads(registry.to_json()) == {
+        'stages': {'stage': {'calls': 1, 'errors': 0, 'seconds': 0.5, 'max_seconds': 0.5, 'points': 4}},
+        'counters': {'counter': 1},
+    }
+
+
+def test_to_text():
+    registry = Metrics(enabled=True)
+    registry.record(StageEvent('parse.evaluate', 0.5, 4, ValueError()))
+    registry.count('expression_cache.hits', 2)
+    lines = registry.to_text().splitlines()
+    assert 'parseplot_stage_calls_total{stage="parse.evaluate"} 1' in lines
+    assert 'parseplot_stage_errors_total{stage="parse.evaluate"} 1' in lines
+    assert 'parseplot_stage_seconds_total{stage="parse.evaluate"} 0.5' in lines
+    assert 'parseplot_stage_points_total{stage="parse.evaluate"} 4' in lines
+    assert 'parseplot_counter_total{counter="expression_cache.hits"} 2' in lines
+    assert '# TYPE parseplot_stage_seconds_max gauge' in lines
+
+
+def test_parser_stages(enabled_metrics):
+    parser = Parser('x^2')
+    parser.plot(-5, 5)
+    parser.plot_arrays(-5, 5)
+    parser.plot_adaptive(-5, 5, max_points=50)
+    stages = enabled_metrics.stages()
+    assert stages['parse.pre_parse'].calls == 1
+    assert stages['parse.evaluate'].points == 11
+    assert stages['parse.evaluate_vectorized'].points == 11
+    assert 0 < stages['parse.evaluate_adaptive'].points <= 50
+
+
+def test_evaluation_errors(enabled_metrics):
+    with pytest.raises(ZeroDivisionError):
+        Parser('1/(x*0)').plot(-1, 1, incremental=False)
+    assert enabled_metrics.stages()['parse.evaluate'].errors == 1
+
+
+def test_expression_cache_counters(enabled_metrics):
+    cache = ExpressionCache()
+    cache.get('x+1')
+    cache.get('x+1')
+    assert enabled_metrics.counters() == {'expression_cache.hits': 1, 'expression_cache.misses': 1}
+    assert enabled_metrics.stages()['parse.compile'].calls == 1
+
+
+def test_result_cache_counters(enabled_metrics, tmp_path):
+    parser = Parser('x*2')
+    parser.plot(0, 10, cache=ResultCache(directory=tmp_path))
+    parser.plot(0, 10, cache=ResultCache(directory=tmp_path))
+    counters = enabled_metrics.counters()
+    assert (counters['result_cache.misses'], counters['result_cache.disk_hits']) == (1, 1)
+
+
+def test_plot_stages(enabled_metrics, tmp_path):
+    plotter = BokehPlotter()
+    plotter.add_line([(0, 0), (1, 1), (2, 4)])
+    plotter.save_as_svg(tmp_path / 'plot', renderer='native')
+    stages = enabled_metrics.stages()
+    assert stages['plot.add_line'].points == 3
+    assert stages['plot.export_svg.native'].calls == 1
+
+
+def test_webdriver_start(enabled_metrics):
+    with WebdriverPool(object) as pool:
+        with pool.driver():
+            pass
+    assert enabled_metrics.stages()['plot.webdriver_start'].calls == 1
+
+
+def test_installed_package_single_registry(tmp_path):
+    """Stages of the installed parseplot package are all recorded in parseplot.util.metrics."""
+    code = ("import parseplot\n"
+            "from parseplot.plot.bokeh.webdriver_pool import WebdriverPool\n"
+            "from parseplot.util.metrics import metrics\n"
+            "metrics.enable()\n"
+            "plotter = parseplot.BokehPlotter()\n"
+            "plotter.add_line(parseplot.Parser('x^2').plot(-2, 2, columnar=True))\n"
+            "plotter.save_as_svg('plot', renderer='native')\n"
+            "with WebdriverPool(object) as pool:\n"
+            "    with pool.driver():\n"
+            "        pass\n"
+            "print(' '.join(metrics.stages()))\n")
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, capture_output=True, text=True, check=True,
+                            env={**os.environ, 'PYTHONPATH': str(SRC_DIR)})
+    assert set(result.stdout.split()) >= {'parse.evaluate', 'plot.add_line', 'plot.export_svg.native',
+                                          'plot.webdriver_start'}